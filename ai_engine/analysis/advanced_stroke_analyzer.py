@@ -11,12 +11,13 @@ import cv2
 import numpy as np
 from scipy import ndimage
 from scipy.signal import find_peaks
-from skimage.morphology import skeletonize, medial_axis
+from skeleton_backend import medial_axis_transform, thin
 from skimage.measure import label, regionprops
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib import font_manager
 import warnings
+from phase_alignment import estimate_similarity
 warnings.filterwarnings('ignore')
 
 # 한글 폰트 설정
@@ -71,36 +72,51 @@ class AdvancedStrokeAnalyzer:
         
         return (img.shape[1]//2, img.shape[0]//2)
     
-    def align_images(self, reference_img, user_img):
-        """시작점과 중심점을 기준으로 이미지 정렬"""
+    def align_images(self, reference_img, user_img, method='heuristic'):
+        """시작점과 중심점을 기준으로 이미지 정렬
+        
+        method: 'heuristic'      - 중심점 이동 + 시작점 기준 회전
+                'fourier_mellin' - 로그-극좌표 스펙트럼 상관으로 회전/크기/이동 추정
+        두 방식 모두 변환을 하나의 행렬로 합성하여 warpAffine을 한 번만 적용
+        """
         # 중심점 찾기
         ref_center = self.find_center_point(reference_img)
         user_center = self.find_center_point(user_img)
         
         # 시작점 찾기
         ref_start = self.detect_starting_point(reference_img)
-        user_start = self.detect_starting_point(user_img)
-        
-        # 이동 벡터 계산
-        dx = ref_center[0] - user_center[0]
-        dy = ref_center[1] - user_center[1]
-        
-        # 회전 각도 계산 (시작점 기준)
-        angle_ref = np.arctan2(ref_start[1] - ref_center[1], 
-                               ref_start[0] - ref_center[0])
-        angle_user = np.arctan2(user_start[1] - user_center[1], 
-                                user_start[0] - user_center[0])
-        rotation = np.degrees(angle_ref - angle_user)
         
-        # 변환 행렬 생성
-        M_translate = np.float32([[1, 0, dx], [0, 1, dy]])
-        M_rotate = cv2.getRotationMatrix2D(user_center, rotation, 1)
+        if method == 'fourier_mellin':
+            # 흰 배경/검은 글씨 → 글자 마스크로 정합
+            _, ref_binary = cv2.threshold(reference_img, 127, 255, cv2.THRESH_BINARY_INV)
+            _, user_binary = cv2.threshold(user_img, 127, 255, cv2.THRESH_BINARY_INV)
+            registration = estimate_similarity(user_binary, ref_binary)
+            M = registration['matrix']
+        elif method == 'heuristic':
+            user_start = self.detect_starting_point(user_img)
+            
+            # 이동 벡터 계산
+            dx = ref_center[0] - user_center[0]
+            dy = ref_center[1] - user_center[1]
+            
+            # 회전 각도 계산 (시작점 기준)
+            angle_ref = np.arctan2(ref_start[1] - ref_center[1], 
+                                   ref_start[0] - ref_center[0])
+            angle_user = np.arctan2(user_start[1] - user_center[1], 
+                                    user_start[0] - user_center[0])
+            rotation = np.degrees(angle_ref - angle_user)
+            
+            # 이동 후 회전 → 3x3 행렬 곱으로 합성
+            M_translate = np.float32([[1, 0, dx], [0, 1, dy], [0, 0, 1]])
+            M_rotate = np.vstack([cv2.getRotationMatrix2D(user_center, rotation, 1), [0, 0, 1]])
+            M = (M_rotate @ M_translate)[:2].astype(np.float32)
+        else:
+            raise ValueError(f"알 수 없는 정렬 방식: {method}")
         
-        # 이미지 변환 적용
-        aligned = cv2.warpAffine(user_img, M_translate, 
-                                 (user_img.shape[1], user_img.shape[0]))
-        aligned = cv2.warpAffine(aligned, M_rotate,
-                                 (aligned.shape[1], aligned.shape[0]))
+        # 이미지 변환 적용 (한 번, 바깥 영역은 종이색으로)
+        aligned = cv2.warpAffine(user_img, M,
+                                 (user_img.shape[1], user_img.shape[0]),
+                                 borderValue=255)
         
         return aligned, ref_center, ref_start
     
@@ -109,11 +125,8 @@ class AdvancedStrokeAnalyzer:
         # 이진화
         _, binary = cv2.threshold(img, 127, 255, cv2.THRESH_BINARY_INV)
         
-        # 거리 변환으로 굵기 맵 생성
-        dist_transform = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
-        
-        # 스켈레톤 추출
-        skeleton = skeletonize(binary > 0)
+        # 스켈레톤과 거리 변환(굵기 맵)을 함께 계산
+        skeleton, dist_transform = medial_axis_transform(binary)
         
         # 스켈레톤 따라 굵기 샘플링
         skel_points = np.argwhere(skeleton)
@@ -147,7 +160,7 @@ class AdvancedStrokeAnalyzer:
         """꺾임 부분 검출 및 붓 움직임 분석"""
         # 스켈레톤 추출
         _, binary = cv2.threshold(img, 127, 255, cv2.THRESH_BINARY_INV)
-        skeleton = skeletonize(binary > 0)
+        skeleton = thin(binary)
         
         # 스켈레톤 포인트 추출
         skel_points = np.argwhere(skeleton)
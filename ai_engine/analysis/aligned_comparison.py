@@ -10,6 +10,8 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import os
+from border_rectifier import compute_border_homography, rectify
+import overlay_compositor as oc
 
 
 def process_aligned_comparison():
@@ -35,19 +37,18 @@ def process_aligned_comparison():
     output_dir = "aligned_output"
     os.makedirs(output_dir, exist_ok=True)
     
-    # 크기 통일 (가이드 크기로)
+    # 빨간 테두리 검출 (원본 해상도)
+    guide_border = detect_red_border(guide_img)
+    
+    # 테두리 정렬 - 가이드 해상도로 한 번만 워프 (리사이즈 후 워프 하지 않음)
+    aligned_ref = align_borders(ref_img, detect_red_border(ref_img), guide_border, guide_img.shape[:2])
+    aligned_user = align_borders(user_img, detect_red_border(user_img), guide_border, guide_img.shape[:2])
+    
+    # 시각화용 원본 (가이드 크기)
     h, w = guide_img.shape[:2]
     ref_resized = cv2.resize(ref_img, (w, h))
     user_resized = cv2.resize(user_img, (w, h))
     
-    # 빨간 테두리 검출
-    ref_border = detect_red_border(ref_resized)
-    guide_border = detect_red_border(guide_img)
-    
-    # 테두리 정렬
-    aligned_ref = align_borders(ref_resized, ref_border, guide_border, guide_img.shape[:2])
-    aligned_user = align_borders(user_resized, detect_red_border(user_resized), guide_border, guide_img.shape[:2])
-    
     # 글자 추출
     ref_char = extract_character(aligned_ref)
     guide_char = extract_character(guide_img)
@@ -90,38 +91,15 @@ def detect_red_border(img):
 
 
 def align_borders(img, img_border, target_border, target_shape):
-    """테두리를 기준으로 정렬"""
-    
-    # 테두리 컨투어 찾기
-    img_contours, _ = cv2.findContours(img_border, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    target_contours, _ = cv2.findContours(target_border, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    if not img_contours or not target_contours:
-        return img
-    
-    # 가장 큰 컨투어 (테두리)
-    img_rect = max(img_contours, key=cv2.contourArea)
-    target_rect = max(target_contours, key=cv2.contourArea)
+    """테두리 네 모서리를 기준으로 원근 보정하여 정렬"""
     
-    # 바운딩 박스
-    ix, iy, iw, ih = cv2.boundingRect(img_rect)
-    tx, ty, tw, th = cv2.boundingRect(target_rect)
+    homography = compute_border_homography(img_border, target_border)
     
-    # 변환 계산
-    scale_x = tw / iw if iw > 0 else 1
-    scale_y = th / ih if ih > 0 else 1
-    translate_x = tx - ix * scale_x
-    translate_y = ty - iy * scale_y
+    if homography is None:
+        # 테두리를 찾을 수 없으면 목표 크기로 리사이즈만
+        return cv2.resize(img, (target_shape[1], target_shape[0]))
     
-    # 변환 행렬
-    M = np.array([[scale_x, 0, translate_x],
-                  [0, scale_y, translate_y]], dtype=np.float32)
-    
-    # 적용
-    aligned = cv2.warpAffine(img, M, (target_shape[1], target_shape[0]),
-                            borderValue=(255, 255, 255))
-    
-    return aligned
+    return rectify(img, homography, target_shape)
 
 
 def extract_character(img):
@@ -162,21 +140,13 @@ def create_overlay(base_img, overlay_img, label):
 
 def create_triple_overlay(base_img, ref_char, user_char):
     """3중 오버레이 (가이드 + 교본 + 사용자)"""
-    result = base_img.copy()
-    
-    # 교본: 초록
-    ref_mask = ref_char > 0
-    result[ref_mask, 1] = np.minimum(255, result[ref_mask, 1] + 100)
-    
-    # 사용자: 파랑
-    user_mask = user_char > 0
-    result[user_mask, 0] = np.minimum(255, result[user_mask, 0] + 100)
-    
-    # 겹치는 부분: 보라
-    overlap = np.logical_and(ref_mask, user_mask)
-    result[overlap] = [128, 0, 128]
-    
-    return result
+    # 교본 코드 자리에 교본 마스크를 넣어 한 번에 렌더링
+    codes = oc.encode(ref_char, user_char)
+    return oc.render(codes, {
+        oc.GUIDE_ONLY: oc.add([0, 100, 0]),    # 교본: 초록
+        oc.USER_ONLY: oc.add([100, 0, 0]),     # 사용자: 파랑
+        oc.BOTH: oc.replace([128, 0, 128])     # 겹치는 부분: 보라
+    }, base_img)
 
 
 def calculate_scores(user_char, guide_char, ref_char):
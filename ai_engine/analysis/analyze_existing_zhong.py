@@ -233,8 +233,9 @@ def create_master_analysis():
     colored = np.zeros((*aligned_user.shape, 3))
     colors_stroke = [[1,0,0], [0,1,0], [0,0,1], [1,1,0]]
     for i, stroke in enumerate(strokes[:4]):
+        stroke_mask = stroke.mask / 255
         for c in range(3):
-            colored[:,:,c] += stroke/255 * colors_stroke[i%4][c]
+            colored[stroke.slices + (c,)] += stroke_mask * colors_stroke[i%4][c]
     ax16.imshow(colored)
     ax16.set_title('획 분리', fontsize=12)
     ax16.axis('off')
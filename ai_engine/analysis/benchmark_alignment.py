@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+AdvancedStrokeAnalyzer.align_images 정렬 방식 벤치마크
+- IntegratedZhongAnalyzer.create_user_zhong으로 만든 글자에 알려진 회전/크기/이동 적용
+  (variation_level=0: 획 굵기만 다르고 구조는 같아 정답 변환이 명확)
+- 방식별 1회 정렬 시간(ms)과 정렬 후 교본과의 겹침도(IoU) 비교
+- Fourier-Mellin은 추정 회전/크기 오차도 함께 보고
+"""
+
+import time
+import cv2
+import numpy as np
+from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+from advanced_stroke_analyzer import AdvancedStrokeAnalyzer
+from phase_alignment import estimate_similarity
+
+
+# (회전 각도, 크기, 이동 x, 이동 y)
+TRANSFORMS = [
+    (0, 1.0, 0, 0),
+    (5, 1.0, 8, -5),
+    (-10, 1.0, -6, 4),
+    (0, 1.15, 5, 5),
+    (0, 0.85, -4, 6),
+    (12, 1.1, 10, -8),
+    (-8, 0.9, -10, 3),
+]
+
+
+def make_sample(base_img, angle, scale, tx, ty):
+    """알려진 변환을 적용한 사용자 글자 (흰 배경)"""
+    h, w = base_img.shape
+    M = cv2.getRotationMatrix2D((w / 2, h / 2), angle, scale)
+    M[:, 2] += (tx, ty)
+    return cv2.warpAffine(base_img, M, (w, h), borderValue=255)
+
+
+def ink_iou(img_a, img_b):
+    """두 흰 배경 이미지의 글자 겹침도"""
+    a = img_a < 128
+    b = img_b < 128
+    union = np.logical_or(a, b).sum()
+    return np.logical_and(a, b).sum() / union if union > 0 else 0.0
+
+
+def run_benchmark(repeats=5, variation_level=0.0):
+    zhong_analyzer = IntegratedZhongAnalyzer()
+    stroke_analyzer = AdvancedStrokeAnalyzer()
+    
+    reference = zhong_analyzer.create_reference_zhong()
+    user_base = zhong_analyzer.create_user_zhong(variation_level=variation_level)
+    
+    results = {'heuristic': [], 'fourier_mellin': []}
+    
+    for angle, scale, tx, ty in TRANSFORMS:
+        user = make_sample(user_base, angle, scale, tx, ty)
+        
+        for method in results:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                aligned, _, _ = stroke_analyzer.align_images(reference, user, method=method)
+            elapsed_ms = (time.perf_counter() - start) / repeats * 1000
+            
+            entry = {
+                'transform': (angle, scale, tx, ty),
+                'ms': elapsed_ms,
+                'iou': ink_iou(aligned, reference)
+            }
+            
+            if method == 'fourier_mellin':
+                _, ref_binary = cv2.threshold(reference, 127, 255, cv2.THRESH_BINARY_INV)
+                _, user_binary = cv2.threshold(user, 127, 255, cv2.THRESH_BINARY_INV)
+                reg = estimate_similarity(user_binary, ref_binary)
+                # 사용자 → 교본 변환은 적용한 변환의 역
+                entry['angle_error'] = abs(reg['angle'] + angle)
+                entry['scale_error'] = abs(reg['scale'] * scale - 1)
+            
+            results[method].append(entry)
+    
+    return results
+
+
+def main():
+    print("="*72)
+    print("⏱  정렬 방식 벤치마크 (합성 中자, 알려진 회전/크기/이동)")
+    print("="*72)
+    
+    results = run_benchmark()
+    
+    print(f"{'변환 (각도, 크기, dx, dy)':28s} {'방식':16s} {'시간(ms)':>9s} {'IoU':>7s} {'각도오차':>8s} {'크기오차':>8s}")
+    print("-"*72)
+    for i in range(len(TRANSFORMS)):
+        for method, entries in results.items():
+            e = entries[i]
+            angle_err = f"{e['angle_error']:.2f}°" if 'angle_error' in e else '-'
+            scale_err = f"{e['scale_error']*100:.1f}%" if 'scale_error' in e else '-'
+            print(f"{str(e['transform']):28s} {method:16s} {e['ms']:9.2f} {e['iou']:7.3f} {angle_err:>8s} {scale_err:>8s}")
+    
+    print("-"*72)
+    for method, entries in results.items():
+        print(f"{method:16s} 평균 {np.mean([e['ms'] for e in entries]):7.2f}ms, "
+              f"평균 IoU {np.mean([e['iou'] for e in entries]):.3f}")
+    print("="*72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+합성 글자 기반 재현 가능한 성능 벤치마크
+- IntegratedZhongAnalyzer.create_reference_zhong / create_user_zhong으로 말뭉치 생성
+  (변형 정도 × 크기 256~4000px × 증강(없음/잡음/회전), 시드 고정 → 항상 같은 이미지)
+- 분석기별 시간 + 백엔드 API(/analyze/upload) 전체 경로 시간
+- stage_timing으로 단계별(decode, preprocess, score.* ...) 시간도 기록
+- 결과는 git 커밋을 키로 하는 JSON 한 파일에 누적, 기준 커밋과 비교해 느려지면 실패(종료 코드 1)
+
+사용법:
+    python benchmark_suite.py                       # 실행 + 직전 커밋과 비교
+    python benchmark_suite.py --quick               # 작은 말뭉치
+    python benchmark_suite.py --baseline <커밋> --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+from char_comparison import CharacterComparator
+from advanced_stroke_analyzer import AdvancedStrokeAnalyzer
+from real_calligraphy_analyzer import RealCalligraphyAnalyzer
+from quality_gate import measure_quality
+from skeleton_backend import get_backend
+from stage_timing import collect, summarize
+
+
+SIZES = (256, 512, 1024, 2000, 4000)
+VARIATION_LEVELS = (0.0, 0.2, 0.5)
+AUGMENTATIONS = ('clean', 'noise', 'rotate')
+
+QUICK_SIZES = (256, 1024)
+QUICK_VARIATION_LEVELS = (0.2,)
+
+RESULTS_PATH = "benchmark_output/results.json"
+
+# 대상별 최대 크기 (px) - 획 궤적 비교는 크기의 제곱보다 빨리 느려져 큰 이미지는 제외
+TARGET_MAX_SIZE = {'stroke_comparison': 1024}
+
+# 이보다 짧은 측정은 잡음이 커서 회귀 판정에서 제외 (ms)
+MIN_COMPARABLE_MS = 2.0
+
+
+def _resize(img, size):
+    interpolation = cv2.INTER_AREA if size < img.shape[0] else cv2.INTER_LINEAR
+    resized = cv2.resize(img, (size, size), interpolation=interpolation)
+    # 보간으로 생긴 회색 가장자리를 원래처럼 흑백으로
+    _, resized = cv2.threshold(resized, 127, 255, cv2.THRESH_BINARY)
+    return resized
+
+
+def augment(img, augmentation, rng):
+    """사용자 글자 증강 - rng가 같으면 결과도 같음"""
+    if augmentation == 'noise':
+        noisy = img.astype(np.float32) + rng.normal(0, 12, img.shape)
+        return np.clip(noisy, 0, 255).astype(np.uint8)
+    if augmentation == 'rotate':
+        h, w = img.shape
+        angle = rng.uniform(-8, 8)
+        M = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        return cv2.warpAffine(img, M, (w, h), borderValue=255)
+    return img
+
+
+def build_corpus(sizes=SIZES, variation_levels=VARIATION_LEVELS,
+                 augmentations=AUGMENTATIONS, seed=0):
+    """(교본, 작성본) 쌍 목록 - 같은 인자면 항상 같은 이미지
+
+    Returns:
+        [{'key', 'size', 'variation', 'augmentation', 'reference', 'user'}]
+    """
+    analyzer = IntegratedZhongAnalyzer()
+    reference_base = analyzer.create_reference_zhong()
+
+    corpus = []
+    for variation in variation_levels:
+        user_base = analyzer.create_user_zhong(variation_level=variation)
+        for size in sizes:
+            reference = _resize(reference_base, size)
+            user_resized = _resize(user_base, size)
+            for augmentation in augmentations:
+                # 경우마다 독립된 시드 (목록 일부만 돌려도 같은 이미지)
+                case_seed = [seed, size, int(variation * 100), AUGMENTATIONS.index(augmentation)]
+                rng = np.random.default_rng(case_seed)
+                corpus.append({
+                    'key': f"{size}px/v{variation}/{augmentation}",
+                    'size': size,
+                    'variation': variation,
+                    'augmentation': augmentation,
+                    'reference': reference,
+                    'user': augment(user_resized, augmentation, rng)
+                })
+    return corpus
+
+
+def _api_client():
+    """백엔드 앱을 프로세스 안에서 호출하는 클라이언트 (네트워크 없음)"""
+    backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend')
+    sys.path.insert(0, os.path.normpath(backend_dir))
+    from fastapi.testclient import TestClient
+    import main as backend_main
+    return TestClient(backend_main.app)
+
+
+def make_targets(include_api=True):
+    """벤치마크 대상 {이름: (교본, 작성본) → 실행 함수 만드는 함수}
+
+    준비(인코딩 등)는 시간 측정 밖에서 한 번만 하도록 함수를 돌려줌
+    """
+    comparator = CharacterComparator()
+    zhong = IntegratedZhongAnalyzer()
+    stroke = AdvancedStrokeAnalyzer()
+    real = RealCalligraphyAnalyzer()
+
+    targets = {
+        'quality_gate': lambda ref, user: (lambda: measure_quality(user)),
+        'char_comparison': lambda ref, user: (lambda: comparator.compare_images(ref, user, output_dir=None)),
+        'zhong_score': lambda ref, user: (lambda: zhong.calculate_zhong_score(ref, user)),
+        'align_heuristic': lambda ref, user: (lambda: stroke.align_images(ref, user)),
+        'stroke_comparison': lambda ref, user: (lambda: real.compare_strokes(ref, user)),
+    }
+
+    if include_api:
+        client = _api_client()
+
+        def api_target(ref, user):
+            files = {'reference_image': ('reference.png', cv2.imencode('.png', ref)[1].tobytes()),
+                     'user_image': ('user.png', cv2.imencode('.png', user)[1].tobytes())}
+
+            def run():
+                response = client.post('/analyze/upload', files=files)
+                if response.status_code != 200:
+                    raise RuntimeError(f"API 오류 {response.status_code}: {response.text[:200]}")
+            return run
+
+        targets['api_upload'] = api_target
+    return targets
+
+
+def time_call(func, repeats):
+    """반복 실행 시간 (ms) 목록과 단계별 시간 (반복 간 중앙값, ms)"""
+    func()  # 워밍업 (백엔드 선택, 캐시 등 처음 한 번 비용 제외)
+    times, stage_runs = [], []
+    for _ in range(repeats):
+        with collect() as records:
+            start = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - start) * 1000)
+        stage_runs.append(summarize(records)['totals'])
+
+    stages = {}
+    for name in {name for run in stage_runs for name in run}:
+        stages[name] = statistics.median(run[name]['wall_ms'] if name in run else 0.0
+                                         for run in stage_runs)
+    return times, stages
+
+
+def run_benchmarks(corpus, targets, repeats=3, verbose=True):
+    """말뭉치 × 대상 전체 측정
+
+    Returns:
+        {'<대상>/<경우 키>': {'median_ms', 'min_ms', 'max_ms', 'repeats', 'stages'}}
+    """
+    results = {}
+    for case in corpus:
+        for name, make in targets.items():
+            if case['size'] > TARGET_MAX_SIZE.get(name, case['size']):
+                continue
+            key = f"{name}/{case['key']}"
+            try:
+                times, stages = time_call(make(case['reference'], case['user']), repeats)
+            except Exception as e:
+                results[key] = {'error': f"{type(e).__name__}: {e}"}
+                if verbose:
+                    print(f"❌ {key:45s} {results[key]['error']}")
+                continue
+
+            results[key] = {
+                'median_ms': statistics.median(times),
+                'min_ms': min(times),
+                'max_ms': max(times),
+                'repeats': repeats,
+                'stages': stages
+            }
+            if verbose:
+                print(f"   {key:45s} {results[key]['median_ms']:10.2f}ms")
+    return results
+
+
+def git_commit():
+    """(현재 커밋 해시, 작업 트리 변경 여부) - git이 없으면 ('unknown', True)"""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', True
+    return commit, bool(status)
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'skeleton_backend': get_backend()
+    }
+
+
+def load_results(path=RESULTS_PATH):
+    """{커밋: 실행 결과} (파일이 없으면 빈 딕셔너리)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_run(run, path=RESULTS_PATH):
+    """실행 결과를 커밋 키로 저장 (같은 커밋은 덮어씀)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    results = load_results(path)
+    results[run['commit']] = run
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def pick_baseline(results, current_commit, baseline=None):
+    """비교 기준 실행 - 지정한 커밋(앞부분만 써도 됨) 또는 현재 커밋이 아닌 가장 최근 실행"""
+    if baseline is not None:
+        matches = [run for commit, run in results.items() if commit.startswith(baseline)]
+        return matches[0] if matches else None
+    others = [run for commit, run in results.items() if commit != current_commit]
+    return max(others, key=lambda run: run['timestamp']) if others else None
+
+
+def find_regressions(baseline, current, threshold=0.2, min_ms=MIN_COMPARABLE_MS):
+    """기준보다 threshold 비율 이상 느려진 측정 (전체 시간과 단계별 시간)
+
+    Returns:
+        [{'key', 'stage', 'baseline_ms', 'current_ms', 'change'}] - 변화율이 큰 순서
+    """
+    regressions = []
+
+    def check(key, stage, before, after):
+        if before is None or after is None or max(before, after) < min_ms:
+            return
+        change = after / before - 1 if before > 0 else float('inf')
+        if change > threshold:
+            regressions.append({'key': key, 'stage': stage, 'baseline_ms': before,
+                                'current_ms': after, 'change': change})
+
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None or 'error' in base or 'error' in result:
+            continue
+        check(key, None, base['median_ms'], result['median_ms'])
+        for stage, ms in result['stages'].items():
+            check(key, stage, base['stages'].get(stage), ms)
+
+    return sorted(regressions, key=lambda r: -r['change'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 中자 말뭉치 성능 벤치마크")
+    parser.add_argument('--quick', action='store_true', help="작은 말뭉치 (256/1024px, 변형 0.2)")
+    parser.add_argument('--sizes', type=int, nargs='+', help="이미지 크기 목록 (px)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--targets', nargs='+', help="측정할 대상만 (기본: 전체)")
+    parser.add_argument('--no-api', action='store_true', help="API 경로 제외")
+    parser.add_argument('--results', default=RESULTS_PATH)
+    parser.add_argument('--baseline', help="비교할 커밋 (기본: 가장 최근의 다른 커밋)")
+    parser.add_argument('--threshold', type=float, default=0.2, help="허용 감속 비율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    variations = QUICK_VARIATION_LEVELS if args.quick else VARIATION_LEVELS
+
+    print("=" * 72)
+    print("⏱  합성 中자 벤치마크")
+    print("=" * 72)
+
+    corpus = build_corpus(sizes, variations, seed=args.seed)
+    targets = make_targets(include_api=not args.no_api)
+    if args.targets:
+        targets = {name: make for name, make in targets.items() if name in args.targets}
+    print(f"말뭉치 {len(corpus)}쌍 × 대상 {len(targets)}개, 반복 {args.repeats}회\n")
+
+    commit, dirty = git_commit()
+    run = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'config': {'sizes': list(sizes), 'variation_levels': list(variations),
+                   'augmentations': list(AUGMENTATIONS), 'seed': args.seed,
+                   'repeats': args.repeats, 'targets': list(targets)},
+        'results': run_benchmarks(corpus, targets, args.repeats)
+    }
+
+    results = load_results(args.results)
+    baseline = pick_baseline(results, commit, args.baseline)
+    save_run(run, args.results)
+    print(f"\n💾 결과 저장: {args.results} (커밋 {commit[:10]}{', 변경 있음' if dirty else ''})")
+
+    if baseline is None:
+        print("비교할 기준 실행이 없습니다.")
+        return 0
+
+    regressions = find_regressions(baseline, run, args.threshold)
+    print(f"\n기준 커밋 {baseline['commit'][:10]} 대비 {args.threshold*100:.0f}% 이상 느려진 항목: {len(regressions)}개")
+    for r in regressions:
+        stage = f" [{r['stage']}]" if r['stage'] else ""
+        print(f"  ❌ {r['key']}{stage}: {r['baseline_ms']:.2f}ms → {r['current_ms']:.2f}ms "
+              f"(+{r['change']*100:.0f}%)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
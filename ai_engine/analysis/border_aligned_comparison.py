@@ -10,6 +10,9 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import os
+from border_rectifier import compute_border_homography, rectify, warp_mask
+from chamfer_scoring import symmetric_chamfer_score
+import overlay_compositor as oc
 
 
 class BorderAlignedComparison:
@@ -36,18 +39,20 @@ class BorderAlignedComparison:
         user_border = self.detect_red_border(user_img)
         guide_border = self.detect_red_border(guide_img)
         
-        # 테두리 기준으로 정렬
-        aligned_user, transform_matrix = self.align_by_borders(user_img, user_border, guide_border, guide_img.shape[:2])
+        # 테두리 기준으로 정렬 (호모그래피, 한 번의 워프)
+        target_shape = guide_img.shape[:2]
+        aligned_user, transform_matrix = self.align_by_borders(user_img, user_border, guide_border, target_shape)
         
-        # 글자 추출
-        user_char = self.extract_character(aligned_user)
-        guide_char = self.extract_character(guide_img)
+        # 글자 추출 - 사용자 마스크는 같은 변환으로 워프 (정렬 이미지에서 재추출하지 않음)
+        user_char = warp_mask(self.extract_character(user_img, user_border), transform_matrix, target_shape)
+        aligned_border = warp_mask(user_border, transform_matrix, target_shape)
+        guide_char = self.extract_character(guide_img, guide_border)
         
         # 오버레이 생성 (여러 버전)
-        overlays = self.create_multiple_overlays(guide_img, aligned_user, user_char)
+        overlays = self.create_multiple_overlays(guide_img, aligned_user, user_char, aligned_border)
         
         # 점수 계산
-        scores = self.calculate_alignment_scores(user_char, guide_char, user_border, guide_border)
+        scores = self.calculate_alignment_scores(user_char, guide_char, aligned_border, guide_border)
         
         # 시각화
         output_dir = "border_aligned_output"
@@ -78,106 +83,81 @@ class BorderAlignedComparison:
         return red_mask
     
     def align_by_borders(self, user_img, user_border, guide_border, target_shape):
-        """테두리를 기준으로 이미지 정렬"""
-        
-        # 테두리의 외곽선 찾기
-        user_contours, _ = cv2.findContours(user_border, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        guide_contours, _ = cv2.findContours(guide_border, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        if not user_contours or not guide_contours:
-            # 테두리를 찾을 수 없으면 단순 리사이즈
-            return cv2.resize(user_img, (target_shape[1], target_shape[0])), np.eye(3)
-        
-        # 가장 큰 컨투어 선택 (테두리)
-        user_rect_contour = max(user_contours, key=cv2.contourArea)
-        guide_rect_contour = max(guide_contours, key=cv2.contourArea)
-        
-        # 바운딩 박스 추출
-        user_x, user_y, user_w, user_h = cv2.boundingRect(user_rect_contour)
-        guide_x, guide_y, guide_w, guide_h = cv2.boundingRect(guide_rect_contour)
-        
-        # 스케일 계산
-        scale_x = guide_w / user_w if user_w > 0 else 1
-        scale_y = guide_h / user_h if user_h > 0 else 1
-        
-        # 평행이동 계산
-        translate_x = guide_x - user_x * scale_x
-        translate_y = guide_y - user_y * scale_y
-        
-        # 변환 행렬 생성
-        transform_matrix = np.array([
-            [scale_x, 0, translate_x],
-            [0, scale_y, translate_y],
-            [0, 0, 1]
-        ])
-        
-        # 이미지 변환 적용
-        aligned_img = cv2.warpAffine(
-            user_img, 
-            transform_matrix[:2], 
-            (target_shape[1], target_shape[0]),
-            flags=cv2.INTER_LINEAR,
-            borderMode=cv2.BORDER_CONSTANT,
-            borderValue=(255, 255, 255)
-        )
+        """테두리 네 모서리를 기준으로 원근 보정하여 정렬
+        
+        Returns:
+            (정렬된 이미지, 3x3 변환 행렬) - 행렬은 마스크 워프에 재사용
+        """
+        # 사용자 테두리 모서리 → 가이드 테두리 모서리 호모그래피
+        transform_matrix = compute_border_homography(user_border, guide_border)
+        
+        if transform_matrix is None:
+            # 테두리를 찾을 수 없으면 단순 리사이즈와 같은 변환
+            h, w = user_img.shape[:2]
+            transform_matrix = np.array([
+                [target_shape[1] / w, 0, 0],
+                [0, target_shape[0] / h, 0],
+                [0, 0, 1]
+            ])
+        
+        # 목표 해상도로 한 번만 워프
+        aligned_img = rectify(user_img, transform_matrix, target_shape)
         
         return aligned_img, transform_matrix
     
-    def extract_character(self, img):
-        """이미지에서 글자 부분만 추출"""
+    def extract_character(self, img, red_mask=None):
+        """이미지에서 글자 부분만 추출 (red_mask를 이미 구했으면 재사용)"""
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         _, binary = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY_INV)
         
         # 빨간 테두리 제거 (빨간색 부분을 배경으로)
-        red_mask = self.detect_red_border(img)
+        if red_mask is None:
+            red_mask = self.detect_red_border(img)
         binary = cv2.bitwise_and(binary, cv2.bitwise_not(red_mask))
         
         return binary
     
-    def create_multiple_overlays(self, guide_img, aligned_user, user_char):
-        """여러 종류의 오버레이 생성"""
-        overlays = {}
-        
-        # 1. 기본 오버레이 (가이드 + 정렬된 사용자 글자)
-        basic_overlay = guide_img.copy()
-        mask = user_char > 0
-        basic_overlay[mask] = cv2.addWeighted(
-            basic_overlay[mask], 0.5,
-            np.array([255, 100, 0]), 0.5, 0  # 파란색
-        )
-        overlays['basic'] = basic_overlay
+    def create_multiple_overlays(self, guide_img, aligned_user, user_char, user_border=None,
+                                 encode_format=None):
+        """여러 종류의 오버레이 생성
         
-        # 2. 투명 오버레이 (전체 이미지 블렌딩)
-        transparent_overlay = cv2.addWeighted(guide_img, 0.6, aligned_user, 0.4, 0)
-        overlays['transparent'] = transparent_overlay
-        
-        # 3. 차이 강조 오버레이
-        diff_overlay = guide_img.copy()
+        가이드/사용자 글자를 코드 맵으로 한 번 인코딩하고 종류별 색상표로 렌더링
+        encode_format: 'png' 또는 'webp'이면 이미지 대신 인코딩된 바이트 반환
+        """
+        overlays = {}
         guide_char = self.extract_character(guide_img)
+        codes = oc.encode(guide_char, user_char)
         
-        # 공통 부분: 보라색
-        common = cv2.bitwise_and(guide_char, user_char)
-        # 가이드만: 빨간색
-        guide_only = cv2.bitwise_and(guide_char, cv2.bitwise_not(user_char))
-        # 사용자만: 파란색
-        user_only = cv2.bitwise_and(user_char, cv2.bitwise_not(guide_char))
-        
-        diff_overlay[common > 0] = [128, 0, 128]  # 보라색
-        diff_overlay[guide_only > 0] = [0, 0, 255]  # 빨간색
-        diff_overlay[user_only > 0] = [255, 0, 0]  # 파란색
-        
-        overlays['difference'] = diff_overlay
+        # 1. 기본 오버레이 (가이드 + 정렬된 사용자 글자, 파란색 반투명)
+        user_blend = oc.blend([255, 100, 0], 0.5)
+        overlays['basic'] = oc.render(codes, {oc.USER_ONLY: user_blend, oc.BOTH: user_blend},
+                                      guide_img)
         
-        # 4. 테두리 정렬 확인용
-        border_check = guide_img.copy()
-        user_border = self.detect_red_border(aligned_user)
-        border_check[user_border > 0] = [0, 255, 0]  # 초록색으로 표시
-        overlays['border_check'] = border_check
-        
-        return overlays
+        # 2. 투명 오버레이 (전체 이미지 블렌딩)
+        overlays['transparent'] = cv2.addWeighted(guide_img, 0.6, aligned_user, 0.4, 0)
+        
+        # 3. 차이 강조 오버레이 (공통: 보라, 가이드만: 빨강, 사용자만: 파랑)
+        overlays['difference'] = oc.render(codes, {
+            oc.BOTH: oc.replace([128, 0, 128]),
+            oc.GUIDE_ONLY: oc.replace([0, 0, 255]),
+            oc.USER_ONLY: oc.replace([255, 0, 0])
+        }, guide_img)
+        
+        # 4. 테두리 정렬 확인용 (사용자 테두리: 초록)
+        if user_border is None:
+            user_border = self.detect_red_border(aligned_user)
+        overlays['border_check'] = oc.render(oc.encode(user_char=user_border),
+                                             {oc.USER_ONLY: oc.replace([0, 255, 0])}, guide_img)
+        
+        return oc.finalize(overlays, encode_format)
     
-    def calculate_alignment_scores(self, user_char, guide_char, user_border, guide_border):
-        """정렬 기반 점수 계산"""
+    def calculate_alignment_scores(self, user_char, guide_char, user_border, guide_border,
+                                   stroke_mode='chamfer', tolerance=3.0):
+        """정렬 기반 점수 계산
+        
+        stroke_mode: 'chamfer' - 스켈레톤 거리 기반 (tolerance 픽셀 이내 어긋남 허용)
+                     'edge'    - Canny 엣지가 정확히 겹치는 비율 (기존 방식)
+        """
         scores = {}
         
         # 1. 테두리 정렬도
@@ -215,15 +195,18 @@ class BorderAlignedComparison:
             scores['position_accuracy'] = 0
         
         # 4. 획 일치도
-        # 엣지 비교
-        user_edges = cv2.Canny(user_char.astype(np.uint8), 50, 150)
-        guide_edges = cv2.Canny(guide_char.astype(np.uint8), 50, 150)
-        
-        edge_match = np.logical_and(user_edges > 0, guide_edges > 0)
-        if np.sum(guide_edges > 0) > 0:
-            scores['stroke_match'] = (np.sum(edge_match) / np.sum(guide_edges > 0)) * 100
+        if stroke_mode == 'chamfer':
+            scores['stroke_match'] = symmetric_chamfer_score(user_char, guide_char, tolerance)['score']
         else:
-            scores['stroke_match'] = 0
+            # 엣지 비교
+            user_edges = cv2.Canny(user_char.astype(np.uint8), 50, 150)
+            guide_edges = cv2.Canny(guide_char.astype(np.uint8), 50, 150)
+            
+            edge_match = np.logical_and(user_edges > 0, guide_edges > 0)
+            if np.sum(guide_edges > 0) > 0:
+                scores['stroke_match'] = (np.sum(edge_match) / np.sum(guide_edges > 0)) * 100
+            else:
+                scores['stroke_match'] = 0
         
         # 5. 크기 일치도
         user_area = np.sum(user_char > 0)
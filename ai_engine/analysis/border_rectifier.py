@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+빨간 테두리 기반 원근 보정 (호모그래피)
+- 가장 큰 빨간 컨투어를 approxPolyDP로 근사해 네 모서리 추출
+- 사용자 테두리 모서리 → 가이드 테두리 모서리 호모그래피 계산
+- 목표 해상도로 한 번만 warpPerspective (리사이즈 + 워프 이중 리샘플링 제거)
+- 같은 변환을 마스크에 적용해 글자 재추출 없이 정렬
+"""
+
+import cv2
+import numpy as np
+
+
+def order_corners(points):
+    """네 점을 좌상, 우상, 우하, 좌하 순서로 정렬"""
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    ordered = np.zeros((4, 2), dtype=np.float32)
+
+    s = points.sum(axis=1)
+    d = np.diff(points, axis=1).ravel()  # y - x
+    ordered[0] = points[np.argmin(s)]  # 좌상
+    ordered[2] = points[np.argmax(s)]  # 우하
+    ordered[1] = points[np.argmin(d)]  # 우상
+    ordered[3] = points[np.argmax(d)]  # 좌하
+
+    return ordered
+
+
+def find_border_corners(border_mask, epsilon_ratio=0.02):
+    """테두리 마스크에서 네 모서리 찾기 (없으면 None)"""
+    contours, _ = cv2.findContours(border_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    largest = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(largest) < 100:
+        return None
+
+    perimeter = cv2.arcLength(largest, True)
+    approx = cv2.approxPolyDP(largest, epsilon_ratio * perimeter, True)
+
+    if len(approx) == 4:
+        return order_corners(approx)
+
+    # 네 꼭짓점으로 근사되지 않으면 최소 외접 사각형으로 대체 (기울기는 유지)
+    return order_corners(cv2.boxPoints(cv2.minAreaRect(largest)))
+
+
+def compute_border_homography(src_border, dst_border):
+    """src 테두리를 dst 테두리에 맞추는 3x3 호모그래피 (모서리를 못 찾으면 None)"""
+    src_corners = find_border_corners(src_border)
+    dst_corners = find_border_corners(dst_border)
+
+    if src_corners is None or dst_corners is None:
+        return None
+
+    return cv2.getPerspectiveTransform(src_corners, dst_corners)
+
+
+def rectify(img, homography, target_shape, border_value=(255, 255, 255)):
+    """호모그래피로 목표 해상도에 한 번만 워프"""
+    return cv2.warpPerspective(img, homography, (target_shape[1], target_shape[0]),
+                               flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_CONSTANT,
+                               borderValue=border_value)
+
+
+def warp_mask(mask, homography, target_shape):
+    """이진 마스크에 같은 변환 적용 (최근접 보간으로 이진값 유지)"""
+    return cv2.warpPerspective(mask, homography, (target_shape[1], target_shape[0]),
+                               flags=cv2.INTER_NEAREST,
+                               borderMode=cv2.BORDER_CONSTANT,
+                               borderValue=0)
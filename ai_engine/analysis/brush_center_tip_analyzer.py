@@ -10,13 +10,14 @@ import cv2
 import numpy as np
 from scipy import ndimage
 from scipy.signal import find_peaks, savgol_filter
-from skimage.morphology import skeletonize, medial_axis
+from skeleton_backend import medial_axis_transform
 from skimage.measure import label, regionprops
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Circle, Arrow
 from matplotlib import font_manager
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings('ignore')
 
 # 한글 폰트 설정
@@ -29,15 +30,29 @@ class BrushCenterTipAnalyzer:
         self.brush_trajectory = None
         self.deviation_map = None
         
-    def analyze_stroke_symmetry(self, stroke_img):
-        """획의 좌우 대칭성 분석 - 중봉의 핵심 지표"""
+    def prepare_stroke(self, stroke_img):
+        """획 분석에 공통으로 쓰는 이진화/스켈레톤/거리변환/엣지를 한 번만 계산"""
         _, binary = cv2.threshold(stroke_img, 127, 255, cv2.THRESH_BINARY_INV)
+        skeleton, dist_transform = medial_axis_transform(binary)
         
-        # 스켈레톤 (중심선) 추출
-        skeleton = skeletonize(binary > 0)
+        return {
+            'binary': binary,
+            'skeleton': skeleton,
+            'dist_transform': dist_transform,
+            'edges': cv2.Canny(binary.astype(np.uint8), 50, 150)
+        }
+    
+    def analyze_stroke_symmetry(self, stroke_img, artifacts=None):
+        """획의 좌우 대칭성 분석 - 중봉의 핵심 지표"""
+        if artifacts is None:
+            artifacts = self.prepare_stroke(stroke_img)
+        binary = artifacts['binary']
+        
+        # 스켈레톤 (중심선)
+        skeleton = artifacts['skeleton']
         
         # 거리 변환으로 각 점의 두께 측정
-        dist_transform = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+        dist_transform = artifacts['dist_transform']
         
         # 스켈레톤 상의 각 점에서 좌우 대칭성 검사
         skel_points = np.argwhere(skeleton)
@@ -92,15 +107,16 @@ class BrushCenterTipAnalyzer:
         
         return symmetry_scores
     
-    def detect_brush_angle(self, stroke_img):
+    def detect_brush_angle(self, stroke_img, artifacts=None):
         """붓의 각도 추정 - 선의 가장자리 분석"""
-        _, binary = cv2.threshold(stroke_img, 127, 255, cv2.THRESH_BINARY_INV)
+        if artifacts is None:
+            artifacts = self.prepare_stroke(stroke_img)
         
-        # 엣지 검출
-        edges = cv2.Canny(binary.astype(np.uint8), 50, 150)
+        # 엣지
+        edges = artifacts['edges']
         
-        # 스켈레톤 추출
-        skeleton = skeletonize(binary > 0)
+        # 스켈레톤
+        skeleton = artifacts['skeleton']
         skel_points = np.argwhere(skeleton)
         
         brush_angles = []
@@ -145,15 +161,16 @@ class BrushCenterTipAnalyzer:
         
         return brush_angles
     
-    def analyze_ink_distribution(self, stroke_img):
+    def analyze_ink_distribution(self, stroke_img, artifacts=None):
         """먹의 분포 분석 - 중봉일 때 균일함"""
-        _, binary = cv2.threshold(stroke_img, 127, 255, cv2.THRESH_BINARY_INV)
+        if artifacts is None:
+            artifacts = self.prepare_stroke(stroke_img)
         
         # 거리 변환으로 농도 맵 생성
-        dist_map = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+        dist_map = artifacts['dist_transform']
         
-        # 스켈레톤 추출
-        skeleton = skeletonize(binary > 0)
+        # 스켈레톤
+        skeleton = artifacts['skeleton']
         
         # 스켈레톤을 따라 농도 프로파일 생성
         skel_points = np.argwhere(skeleton)
@@ -243,10 +260,11 @@ class BrushCenterTipAnalyzer:
     
     def visualize_center_tip_analysis(self, stroke_img, output_path):
         """중봉 분석 시각화"""
-        # 분석 수행
-        symmetry_scores = self.analyze_stroke_symmetry(stroke_img)
-        brush_angles = self.detect_brush_angle(stroke_img)
-        ink_profiles = self.analyze_ink_distribution(stroke_img)
+        # 분석 수행 (공통 전처리는 한 번만)
+        artifacts = self.prepare_stroke(stroke_img)
+        symmetry_scores = self.analyze_stroke_symmetry(stroke_img, artifacts)
+        brush_angles = self.detect_brush_angle(stroke_img, artifacts)
+        ink_profiles = self.analyze_ink_distribution(stroke_img, artifacts)
         
         # 점수 계산
         scores = self.calculate_center_tip_score(symmetry_scores, brush_angles, ink_profiles)
@@ -259,8 +277,7 @@ class BrushCenterTipAnalyzer:
         ax1.imshow(stroke_img, cmap='gray')
         
         # 스켈레톤 오버레이
-        _, binary = cv2.threshold(stroke_img, 127, 255, cv2.THRESH_BINARY_INV)
-        skeleton = skeletonize(binary > 0)
+        skeleton = artifacts['skeleton']
         skeleton_overlay = np.zeros_like(stroke_img)
         skeleton_overlay[skeleton] = 255
         ax1.imshow(skeleton_overlay, cmap='Reds', alpha=0.5)
@@ -309,7 +326,7 @@ class BrushCenterTipAnalyzer:
         ax4 = plt.subplot(2, 4, 4)
         
         # 거리 변환 히트맵
-        dist_map = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+        dist_map = artifacts['dist_transform']
         im4 = ax4.imshow(dist_map, cmap='hot')
         ax4.set_title(f'먹 농도 분포 ({scores["ink_distribution"]:.1f}점)')
         plt.colorbar(im4, ax=ax4, label='농도')
@@ -421,20 +438,42 @@ class BrushCenterTipAnalyzer:
         
         return scores
     
-    def analyze_stroke_sequence(self, strokes_list):
-        """여러 획의 중봉 일관성 분석"""
-        consistency_scores = []
+    def analyze_single_stroke(self, stroke):
+        """획 하나의 중봉 점수 (analyze_stroke_sequence의 작업 단위)"""
+        # StrokeRegion은 bbox 크롭 이미지로만 분석 (전체 크기 마스크 불필요)
+        bbox = getattr(stroke, 'bbox', None)
+        if hasattr(stroke, 'to_stroke_image'):
+            stroke = stroke.to_stroke_image()
+        
+        artifacts = self.prepare_stroke(stroke)
+        symmetry = self.analyze_stroke_symmetry(stroke, artifacts)
+        angles = self.detect_brush_angle(stroke, artifacts)
+        ink = self.analyze_ink_distribution(stroke, artifacts)
+        
+        return self.calculate_center_tip_score(symmetry, angles, ink), bbox
+    
+    def analyze_stroke_sequence(self, strokes_list, max_workers=None):
+        """여러 획의 중봉 일관성 분석
+        
+        strokes_list: 획 이미지(흰 배경, 검은 획) 또는 
+                      IntegratedZhongAnalyzer.extract_strokes()의 StrokeRegion 목록
+        max_workers: 1이면 순차 실행, 그 외에는 스레드 풀로 획별 병렬 분석
+                     (OpenCV/NumPy가 GIL을 해제하므로 스레드로 충분)
+        """
+        if max_workers == 1 or len(strokes_list) < 2:
+            results = [self.analyze_single_stroke(stroke) for stroke in strokes_list]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map은 입력 순서를 유지하므로 획 번호가 순차 실행과 동일
+                results = list(executor.map(self.analyze_single_stroke, strokes_list))
         
-        for i, stroke in enumerate(strokes_list):
-            symmetry = self.analyze_stroke_symmetry(stroke)
-            angles = self.detect_brush_angle(stroke)
-            ink = self.analyze_ink_distribution(stroke)
-            
-            score = self.calculate_center_tip_score(symmetry, angles, ink)
+        consistency_scores = []
+        for i, (score, bbox) in enumerate(results):
             consistency_scores.append({
                 'stroke_num': i + 1,
                 'score': score['total'],
-                'details': score
+                'details': score,
+                'bbox': bbox
             })
         
         # 일관성 계산 (표준편차가 작을수록 좋음)
@@ -15,9 +15,10 @@ import matplotlib.patches as patches
 import matplotlib.font_manager as fm
 from scipy import ndimage
 from scipy.interpolate import interp1d
-from skimage.morphology import skeletonize
+from skeleton_backend import thin
 import os
 import platform
+from profile_dtw import banded_dtw
 
 # 한글 폰트 설정
 def setup_korean_font():
@@ -48,8 +49,8 @@ class BrushComparisonAnnotator:
         self.setup_korean_font = setup_korean_font
         
     def extract_skeleton(self, binary_img):
-        """스켈레톤 추출"""
-        skeleton = skeletonize(binary_img > 0)
+        """스켈레톤 추출 (기본 세선화 백엔드 - skeleton_backend.get_backend())"""
+        skeleton = thin(binary_img)
         return skeleton.astype(np.uint8) * 255
     
     def analyze_pressure_along_skeleton(self, binary_img, skeleton):
@@ -90,8 +91,46 @@ class BrushComparisonAnnotator:
         
         return speeds
     
-    def compare_pressure_profiles(self, user_pressure, ref_pressure):
-        """압력 프로파일 비교"""
+    def compare_profiles_dtw(self, user_profile, ref_profile, key, classify, band_ratio=0.1):
+        """획 진행 순서로 정렬된 두 프로파일을 DTW로 정합하여 점별 비교
+        
+        user_profile/ref_profile은 궤적 순서대로 정렬되어 있어야 한다.
+        """
+        if not user_profile or not ref_profile:
+            return []
+        
+        user_values = np.array([p[key] for p in user_profile])
+        ref_values = np.array([p[key] for p in ref_profile])
+        path = banded_dtw(ref_values, user_values, band_ratio=band_ratio)['path']
+        
+        comparisons = []
+        for ref_idx, user_idx in path:
+            user_v = user_values[user_idx]
+            ref_v = ref_values[ref_idx]
+            diff = user_v - ref_v
+            diff_percent = (diff / ref_v * 100) if ref_v > 0 else 0
+            
+            comparisons.append({
+                'position': user_profile[user_idx]['position'],
+                f'user_{key}': user_v,
+                f'ref_{key}': ref_v,
+                'difference': diff,
+                'diff_percent': diff_percent,
+                'status': classify(diff_percent)
+            })
+        
+        return comparisons
+    
+    def compare_pressure_profiles(self, user_pressure, ref_pressure, method='nearest'):
+        """압력 프로파일 비교
+        
+        method: 'nearest' - 가장 가까운 교본 점과 비교 (점 순서 무관)
+                'dtw'     - 궤적 순서 프로파일을 밴드 제한 DTW로 정합
+        """
+        if method == 'dtw':
+            return self.compare_profiles_dtw(user_pressure, ref_pressure, 'pressure',
+                                             self.classify_pressure_diff)
+        
         comparisons = []
         
         # 가장 가까운 점 매칭
@@ -126,8 +165,12 @@ class BrushComparisonAnnotator:
         
         return comparisons
     
-    def compare_speed_profiles(self, user_speed, ref_speed):
-        """속도 프로파일 비교"""
+    def compare_speed_profiles(self, user_speed, ref_speed, method='nearest'):
+        """속도 프로파일 비교 (method는 compare_pressure_profiles와 동일)"""
+        if method == 'dtw':
+            return self.compare_profiles_dtw(user_speed, ref_speed, 'speed',
+                                             self.classify_speed_diff)
+        
         comparisons = []
         
         for user_point in user_speed:
@@ -14,7 +14,7 @@ import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from scipy import ndimage
 from scipy.interpolate import interp1d
-from skimage.morphology import skeletonize
+from skeleton_backend import thin
 from skimage import measure, graph
 import math
 import os
@@ -50,8 +50,8 @@ class BrushDynamicsAnalyzer:
         self.setup_korean_font = setup_korean_font
         
     def extract_skeleton(self, binary_img):
-        """스켈레톤 추출"""
-        skeleton = skeletonize(binary_img > 0)
+        """스켈레톤 추출 (기본 세선화 백엔드 - skeleton_backend.get_backend())"""
+        skeleton = thin(binary_img)
         return skeleton.astype(np.uint8) * 255
     
     def trace_skeleton_path(self, skeleton):
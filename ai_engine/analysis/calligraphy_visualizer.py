@@ -13,6 +13,7 @@ import seaborn as sns
 from PIL import Image, ImageDraw, ImageFont
 import os
 from datetime import datetime
+from zone_analysis import ZoneAnalyzer, ZONE_LABELS_3X3
 
 # 한글 폰트 설정
 def setup_korean_font():
@@ -77,29 +78,36 @@ class CalligraphyVisualizer:
         
         return output_path
     
-    def create_heatmap_analysis(self, scores_dict, output_path):
-        """구역별 점수 히트맵 생성"""
-        # 3x3 그리드로 점수 매핑
-        grid_scores = np.array([
-            [60, 30, 60],  # 상단
-            [99, 99, 99],  # 중앙  
-            [40, 30, 40]   # 하단
-        ])
+    def create_heatmap_analysis(self, scores_dict, output_path, zone_grid):
+        """구역별 점수 히트맵 생성
+        
+        Args:
+            scores_dict: 항목별 점수 {'guide', 'center', 'size', 'balance', 'shape'}
+            zone_grid: ZoneAnalyzer(user, ref).grid(rows, cols) 결과
+        """
+        grid_scores = zone_grid['accuracy']
+        rows, cols = grid_scores.shape
+        if (rows, cols) == (3, 3):
+            xticklabels, yticklabels = ZONE_LABELS_3X3
+        else:
+            xticklabels, yticklabels = range(1, cols + 1), range(1, rows + 1)
         
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
         
         # 히트맵
-        sns.heatmap(grid_scores, annot=True, fmt='d', cmap='RdYlGn', 
+        sns.heatmap(grid_scores, annot=True, fmt='.0f', cmap='RdYlGn', 
                    vmin=0, vmax=100, cbar_kws={'label': '정확도 (%)'},
-                   xticklabels=['좌', '중', '우'],
-                   yticklabels=['상', '중', '하'],
+                   xticklabels=xticklabels,
+                   yticklabels=yticklabels,
                    ax=ax1, square=True, linewidths=2, linecolor='white')
         ax1.set_title('구역별 정확도 히트맵', fontsize=14, fontweight='bold')
         
         # 막대 그래프
         categories = ['가이드\n준수', '중심\n정렬', '크기\n일치', '균형도', '형태\n유사도']
-        values = [12, 99, 25, 78, 54]
-        colors_list = ['#EF4444', '#10B981', '#EF4444', '#F59E0B', '#F59E0B']
+        values = [scores_dict[key] for key in ('guide', 'center', 'size', 'balance', 'shape')]
+        colors_list = [self.colors['excellent'] if v >= 70 else
+                       self.colors['good'] if v >= 50 else self.colors['poor']
+                       for v in values]
         
         bars = ax2.bar(categories, values, color=colors_list, edgecolor='black', linewidth=2)
         ax2.set_ylim(0, 100)
@@ -109,7 +117,7 @@ class CalligraphyVisualizer:
         # 점수 표시
         for bar, val in zip(bars, values):
             ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2,
-                    f'{val}%', ha='center', fontweight='bold')
+                    f'{val:.0f}%', ha='center', fontweight='bold')
         
         # 기준선 추가
         ax2.axhline(y=70, color='gray', linestyle='--', alpha=0.5, label='목표 기준선')
@@ -349,7 +357,8 @@ def main():
     print("🔥 히트맵 분석 이미지 생성 중...")
     heatmap_path = os.path.join(output_dir, "heatmap_analysis.png")
     scores = {'guide': 12, 'center': 99, 'size': 25, 'balance': 78, 'shape': 54}
-    visualizer.create_heatmap_analysis(scores, heatmap_path)
+    zones = ZoneAnalyzer(user_img < 128, reference_img < 128).grid(3, 3)
+    visualizer.create_heatmap_analysis(scores, heatmap_path, zones)
     print(f"   ✅ 저장됨: {heatmap_path}")
     
     # 3. 벡터 분석
@@ -12,6 +12,9 @@ import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import os
 import platform
+from phase_alignment import estimate_translation, find_center_subpixel, shift_mask
+from chamfer_scoring import symmetric_chamfer_score
+import overlay_compositor as oc
 
 # 한글 폰트 설정
 def setup_korean_font():
@@ -75,13 +78,20 @@ def process_center_aligned_comparison():
     user_char = extract_character(user_img)
     guide_char = extract_character(guide_img)
     
-    # 사용자 글자의 중심 찾기
-    user_center = find_center(user_char)
-    guide_center = find_center(guide_char)
+    # 위상 상관으로 서브픽셀 이동 추정 (신뢰도 낮으면 무게중심으로 대체)
+    shift = estimate_translation(user_char, guide_char)
+    print(f"📐 정렬: ({shift['dx']:.2f}, {shift['dy']:.2f})px "
+          f"[{shift['method']}, 신뢰도 {shift['confidence']:.2f}]")
     
-    # 중심 기준 정렬
+    # 사용자 글자의 중심 (표시용) 및 이동 후 위치
+    user_center = find_center_subpixel(user_char)
+    guide_center = (user_center[0] + shift['dx'], user_center[1] + shift['dy'])
+    
+    # 점수용 마스크는 이동만 적용 (컬러 이미지에서 다시 추출하지 않음)
+    aligned_user_char = shift_mask(user_char, shift['dx'], shift['dy'], guide_char.shape)
+    
+    # 표시용 컬러 이미지 정렬
     aligned_user = align_by_center(user_img, user_center, guide_center, guide_img.shape[:2])
-    aligned_user_char = extract_character(aligned_user)
     
     # 오버레이 생성 (여러 버전)
     overlays = create_multiple_overlays(guide_img, aligned_user, aligned_user_char, guide_char)
@@ -150,36 +160,27 @@ def align_by_center(img, img_center, target_center, target_shape):
     return aligned
 
 
-def create_multiple_overlays(guide_img, aligned_user, user_char, guide_char):
-    """여러 종류의 오버레이 생성"""
+def create_multiple_overlays(guide_img, aligned_user, user_char, guide_char, encode_format=None):
+    """여러 종류의 오버레이 생성 (코드 맵 한 번 + 종류별 색상표 렌더링)
+    
+    encode_format: 'png' 또는 'webp'이면 이미지 대신 인코딩된 바이트 반환
+    """
     overlays = {}
+    codes = oc.encode(guide_char, user_char)
     
     # 1. 기본 오버레이 (가이드 + 사용자)
-    basic = guide_img.copy()
-    mask = user_char > 0
-    basic[mask] = [255, 100, 100]  # 파란빨강 혼합
-    overlays['basic'] = basic
+    user_color = oc.replace([255, 100, 100])  # 파란빨강 혼합
+    overlays['basic'] = oc.render(codes, {oc.USER_ONLY: user_color, oc.BOTH: user_color}, guide_img)
     
     # 2. 투명 오버레이
-    transparent = cv2.addWeighted(guide_img, 0.6, aligned_user, 0.4, 0)
-    overlays['transparent'] = transparent
-    
-    # 3. 차이 분석 오버레이
-    diff = np.ones_like(guide_img) * 255
-    
-    # 공통 부분: 보라색
-    common = cv2.bitwise_and(guide_char, user_char)
-    diff[common > 0] = [200, 100, 200]
-    
-    # 가이드만: 빨간색
-    guide_only = cv2.bitwise_and(guide_char, cv2.bitwise_not(user_char))
-    diff[guide_only > 0] = [100, 100, 255]
+    overlays['transparent'] = cv2.addWeighted(guide_img, 0.6, aligned_user, 0.4, 0)
     
-    # 사용자만: 파란색
-    user_only = cv2.bitwise_and(user_char, cv2.bitwise_not(guide_char))
-    diff[user_only > 0] = [255, 100, 100]
-    
-    overlays['difference'] = diff
+    # 3. 차이 분석 오버레이 (흰 바탕, 공통: 보라, 가이드만: 빨강, 사용자만: 파랑)
+    overlays['difference'] = oc.render(codes, {
+        oc.BOTH: oc.replace([200, 100, 200]),
+        oc.GUIDE_ONLY: oc.replace([100, 100, 255]),
+        oc.USER_ONLY: oc.replace([255, 100, 100])
+    })
     
     # 4. 컨투어 오버레이
     contour_overlay = guide_img.copy()
@@ -187,11 +188,15 @@ def create_multiple_overlays(guide_img, aligned_user, user_char, guide_char):
     cv2.drawContours(contour_overlay, user_contours, -1, (255, 0, 0), 2)
     overlays['contour'] = contour_overlay
     
-    return overlays
+    return oc.finalize(overlays, encode_format)
 
 
-def calculate_scores(user_char, guide_char):
-    """점수 계산 (사용자 vs 가이드만)"""
+def calculate_scores(user_char, guide_char, stroke_mode='chamfer', tolerance=3.0):
+    """점수 계산 (사용자 vs 가이드만)
+    
+    stroke_mode: 'chamfer' - 스켈레톤 거리 기반 (tolerance 픽셀 이내 어긋남 허용)
+                 'edge'    - Canny 엣지가 정확히 겹치는 비율 (기존 방식)
+    """
     scores = {}
     
     # 1. 겹침도 (IoU)
@@ -228,14 +233,17 @@ def calculate_scores(user_char, guide_char):
         scores['size'] = 0
     
     # 4. 획 구조 일치도
-    user_edges = cv2.Canny(user_char.astype(np.uint8), 50, 150)
-    guide_edges = cv2.Canny(guide_char.astype(np.uint8), 50, 150)
-    
-    edge_match = np.logical_and(user_edges > 0, guide_edges > 0)
-    if np.sum(guide_edges > 0) > 0:
-        scores['stroke'] = (np.sum(edge_match) / np.sum(guide_edges > 0)) * 100
+    if stroke_mode == 'chamfer':
+        scores['stroke'] = symmetric_chamfer_score(user_char, guide_char, tolerance)['score']
     else:
-        scores['stroke'] = 0
+        user_edges = cv2.Canny(user_char.astype(np.uint8), 50, 150)
+        guide_edges = cv2.Canny(guide_char.astype(np.uint8), 50, 150)
+        
+        edge_match = np.logical_and(user_edges > 0, guide_edges > 0)
+        if np.sum(guide_edges > 0) > 0:
+            scores['stroke'] = (np.sum(edge_match) / np.sum(guide_edges > 0)) * 100
+        else:
+            scores['stroke'] = 0
     
     # 5. 균형도 (4분면 분석)
     h, w = user_char.shape
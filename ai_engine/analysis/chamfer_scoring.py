@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+챔퍼(chamfer) 기반 획 형태 점수
+- 교본 스켈레톤까지의 거리 맵을 한 번 계산 (교본 저장소에 캐시)
+- 사용자 시도는 스켈레톤 좌표를 거리 맵에서 읽기만 하면 됨 (배열 조회 한 번)
+- 허용 오차(tolerance) 안의 어긋남은 감점하지 않음 → 2px 빗나간 획도 0점이 아님
+"""
+
+import cv2
+import numpy as np
+
+from skeleton_backend import thin
+from stage_timing import stage
+
+
+def skeleton_of(char_mask):
+    """글자 마스크 (글자 > 0)의 스켈레톤 (bool)"""
+    return thin(char_mask)
+
+
+def skeleton_distance_map(char_mask):
+    """각 픽셀에서 가장 가까운 스켈레톤 픽셀까지의 거리 (float32)"""
+    skeleton = skeleton_of(char_mask)
+    if not skeleton.any():
+        return np.full(char_mask.shape[:2], np.inf, dtype=np.float32)
+    # 스켈레톤 = 0, 나머지 = 255 → 스켈레톤까지 거리
+    inverted = np.where(skeleton, 0, 255).astype(np.uint8)
+    with stage('distance_transform', inverted):
+        return cv2.distanceTransform(inverted, cv2.DIST_L2, 5)
+
+
+def chamfer_from_distances(distances, tolerance=3.0):
+    """스켈레톤 점별 거리 → 허용 오차 반영 점수
+
+    tolerance 이내는 1점, 그 이후 3 × tolerance까지 선형 감소 (이후 0점)
+    """
+    distances = np.asarray(distances, dtype=np.float32)
+    if distances.size == 0:
+        return {'mean_distance': np.inf, 'within_tolerance': 0.0, 'score': 0.0}
+
+    point_scores = np.clip(1 - (distances - tolerance) / (2 * tolerance), 0, 1)
+    return {
+        'mean_distance': float(distances.mean()),
+        'within_tolerance': float(np.mean(distances <= tolerance) * 100),
+        'score': float(point_scores.mean() * 100)
+    }
+
+
+def chamfer_score(user_char, reference_distance_map, tolerance=3.0):
+    """사용자 스켈레톤을 교본 거리 맵에 대조한 챔퍼 점수"""
+    ys, xs = np.nonzero(skeleton_of(user_char))
+    return chamfer_from_distances(reference_distance_map[ys, xs], tolerance)
+
+
+def symmetric_chamfer_score(user_char, reference_char, tolerance=3.0):
+    """양방향 챔퍼 점수 (정확성: 사용자→교본, 완성도: 교본→사용자)"""
+    precision = chamfer_score(user_char, skeleton_distance_map(reference_char), tolerance)
+    recall = chamfer_score(reference_char, skeleton_distance_map(user_char), tolerance)
+    return {
+        'precision': precision['score'],
+        'recall': recall['score'],
+        'score': (precision['score'] + recall['score']) / 2
+    }
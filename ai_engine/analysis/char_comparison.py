@@ -11,6 +11,10 @@ matplotlib.use('Agg')  # GUI 없이 실행
 import matplotlib.pyplot as plt
 from pathlib import Path
 import os
+from orientation_histogram import orientation_histogram, orientation_score
+from phase_alignment import normalized_cross_correlation
+from image_loader import load_image
+from stage_timing import stage
 
 
 class CharacterComparator:
@@ -19,8 +23,9 @@ class CharacterComparator:
     def __init__(self):
         self.scores = {}
         self.overlay_image = None
+        self.similarity_offset = (0, 0)
         
-    def compare_char(self, ref_path, user_path, output_dir="output"):
+    def compare_char(self, ref_path, user_path, output_dir="output", target_size=None):
         """
         교본과 사용자 글자를 비교하여 점수 산출
         
@@ -28,44 +33,59 @@ class CharacterComparator:
             ref_path: 교본 이미지 경로
             user_path: 사용자 글자 이미지 경로
             output_dir: 결과 이미지 저장 디렉토리
+            target_size: 분석에 필요한 긴 변 픽셀 수 (주면 축소 디코딩, None이면 원본)
         
         Returns:
             dict: 각 항목별 점수와 최종 점수
         """
-        # 출력 디렉토리 생성
-        os.makedirs(output_dir, exist_ok=True)
-        
         # 1. 이미지 로드
-        ref_img = cv2.imread(ref_path, cv2.IMREAD_GRAYSCALE)
-        user_img = cv2.imread(user_path, cv2.IMREAD_GRAYSCALE)
+        ref_img = load_image(ref_path, target_size=target_size, grayscale=True)
+        user_img = load_image(user_path, target_size=target_size, grayscale=True)
         
-        if ref_img is None or user_img is None:
-            raise ValueError("이미지를 로드할 수 없습니다.")
+        return self.compare_images(ref_img, user_img, output_dir)
+    
+    def compare_images(self, ref_img, user_img, output_dir="output"):
+        """
+        메모리에 있는 그레이스케일 이미지끼리 비교 (파일 저장/재로드 없음)
         
-        # 2. 크기 맞추기
-        user_img_resized = cv2.resize(user_img, (ref_img.shape[1], ref_img.shape[0]))
+        Args:
+            ref_img: 교본 그레이스케일 이미지
+            user_img: 사용자 글자 그레이스케일 이미지
+            output_dir: 결과 이미지 저장 디렉토리 (None이면 저장/시각화 생략)
         
-        # 3. 바이너리 마스크 생성 (적응형 임계값 사용)
-        ref_mask = self._create_binary_mask(ref_img)
-        user_mask = self._create_binary_mask(user_img_resized)
+        Returns:
+            dict: 각 항목별 점수와 최종 점수
+        """
+        with stage('preprocess', ref_img, user_img):
+            # 2. 크기 맞추기
+            user_img_resized = cv2.resize(user_img, (ref_img.shape[1], ref_img.shape[0]))
+            
+            # 3. 바이너리 마스크 생성 (적응형 임계값 사용)
+            ref_mask = self._create_binary_mask(ref_img)
+            user_mask = self._create_binary_mask(user_img_resized)
         
         # 4. 여백 비율 점수 계산
-        margin_score = self._calculate_margin_score(ref_mask, user_mask)
+        with stage('score.margin', ref_mask):
+            margin_score = self._calculate_margin_score(ref_mask, user_mask)
         
         # 5. 획 기울기 점수 계산
-        angle_score = self._calculate_angle_score(ref_mask, user_mask)
+        with stage('score.angle', ref_mask):
+            angle_score = self._calculate_angle_score(ref_mask, user_mask)
         
         # 6. 중심선 점수 계산
-        center_score = self._calculate_center_score(ref_mask, user_mask)
+        with stage('score.center', ref_mask):
+            center_score = self._calculate_center_score(ref_mask, user_mask)
         
         # 7. 형태 유사도 점수 계산
-        similarity_score = self._calculate_similarity_score(ref_mask, user_mask)
+        with stage('score.similarity', ref_mask):
+            similarity_score = self._calculate_similarity_score(ref_mask, user_mask)
         
         # 8. 최종 결구 점수 계산
         final_score = (margin_score + angle_score + center_score + similarity_score) / 4
         
         # 9. 오버레이 이미지 생성
-        self.overlay_image = self._create_overlay(ref_mask, user_mask)
+        with stage('render', ref_mask):
+            self.overlay_image = self._create_overlay(ref_mask, user_mask)
         
         # 10. 결과 저장
         self.scores = {
@@ -76,12 +96,17 @@ class CharacterComparator:
             "final_score": final_score
         }
         
+        if output_dir is None:
+            return self.scores
+        
         # 결과 이미지 저장
+        os.makedirs(output_dir, exist_ok=True)
         overlay_path = os.path.join(output_dir, "overlay_result.png")
         cv2.imwrite(overlay_path, self.overlay_image)
         
         # 시각화
-        self._visualize_results(ref_img, user_img_resized, ref_mask, user_mask, output_dir)
+        with stage('render.figure', ref_img):
+            self._visualize_results(ref_img, user_img_resized, ref_mask, user_mask, output_dir)
         
         return self.scores
     
@@ -114,32 +139,12 @@ class CharacterComparator:
         return round(score, 2)
     
     def _calculate_angle_score(self, ref_mask, user_mask):
-        """획 기울기 점수 계산"""
-        def get_dominant_angle(mask):
-            # 엣지 검출
-            edges = cv2.Canny(mask, 50, 150)
-            
-            # Hough 변환으로 직선 검출
-            lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=50)
-            
-            if lines is None:
-                return 0
-            
-            # 각도 추출 및 평균 계산
-            angles = []
-            for line in lines[:min(10, len(lines))]:  # 상위 10개 직선만 사용
-                rho, theta = line[0]
-                angle = np.degrees(theta)
-                angles.append(angle)
-            
-            return np.mean(angles) if angles else 0
-        
-        ref_angle = get_dominant_angle(ref_mask)
-        user_angle = get_dominant_angle(user_mask)
+        """획 기울기 점수 계산 (기울기 방향 히스토그램의 원형 EMD)"""
+        ref_hist = orientation_histogram(ref_mask)
+        user_hist = orientation_histogram(user_mask)
         
-        # 각도 차이를 점수로 변환
-        angle_diff = abs(ref_angle - user_angle)
-        score = max(0, 100 - angle_diff * 2)  # 45도 차이 = 10점 감점
+        # 방향 분포 차이(도)를 점수로 변환 - 1도당 2점 감점
+        score = orientation_score(ref_hist, user_hist)
         
         return round(score, 2)
     
@@ -168,13 +173,14 @@ class CharacterComparator:
         return round(score, 2)
     
     def _calculate_similarity_score(self, ref_mask, user_mask):
-        """형태 유사도 점수 계산 (템플릿 매칭)"""
-        # 템플릿 매칭으로 유사도 계산
-        result = cv2.matchTemplate(ref_mask, user_mask, cv2.TM_CCOEFF_NORMED)
+        """형태 유사도 점수 계산 (이동 범위 내 최대 정규화 상호상관)"""
+        # 같은 크기끼리 matchTemplate은 한 위치만 비교하므로,
+        # 글자 크기의 10% 이내 이동은 허용하여 위치 어긋남과 형태 차이를 분리
+        result = normalized_cross_correlation(user_mask, ref_mask, max_shift_ratio=0.1)
+        self.similarity_offset = (result['dx'], result['dy'])
         
         # 최대 유사도 값을 점수로 변환
-        max_val = np.max(result)
-        score = max(0, min(100, max_val * 100))
+        score = max(0, min(100, result['score'] * 100))
         
         return round(score, 2)
     
@@ -10,6 +10,7 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import os
+from zone_analysis import ZoneAnalyzer
 
 
 def process_desktop_images():
@@ -163,27 +164,9 @@ def calculate_scores(user_binary, ref_binary, guideline_mask, guide_gray):
     scores['size_match'] = size_score
     
     # 4. 획의 균형도
-    # 상하좌우 4분면으로 나누어 균형 측정
-    h, w = user_binary.shape
-    mid_h, mid_w = h // 2, w // 2
-    
-    quadrants = [
-        user_binary[:mid_h, :mid_w],    # 좌상
-        user_binary[:mid_h, mid_w:],    # 우상
-        user_binary[mid_h:, :mid_w],    # 좌하
-        user_binary[mid_h:, mid_w:]     # 우하
-    ]
-    
-    quad_pixels = [np.sum(q > 0) for q in quadrants]
-    if sum(quad_pixels) > 0:
-        # 균형도: 각 사분면의 픽셀 분포가 얼마나 균등한지
-        mean_pixels = np.mean(quad_pixels)
-        std_pixels = np.std(quad_pixels)
-        balance_score = max(0, 100 * (1 - std_pixels / mean_pixels)) if mean_pixels > 0 else 0
-    else:
-        balance_score = 0
-    
-    scores['balance'] = balance_score
+    # 상하좌우 4분면 픽셀 분포가 얼마나 균등한지 (적분 영상으로 칸별 합 계산)
+    zones = ZoneAnalyzer(user_binary, ref_binary)
+    scores['balance'] = zones.balance(2, 2)
     
     # 5. 형태 유사도 (IoU)
     intersection = np.sum(np.logical_and(ref_binary > 0, user_binary > 0))
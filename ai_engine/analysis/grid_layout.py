@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+교본 페이지 칸(격자) 자동 검출
+- 빨간/검은 안내선 마스크를 한 번 만들고, 굵은 획(글자)을 빼고 긴 직선 커널로 열어 점선 제거
+- 가로/세로 투영(projection) 프로파일의 봉우리 = 안내선 위치
+- 인접한 선 쌍으로 후보 칸을 만들고, 네 변이 실제 선으로 덮인 칸만 채택
+  (칸 사이 여백, 칸마다 따로 그린 테두리도 처리)
+"""
+
+import cv2
+import numpy as np
+
+
+def guide_line_mask(img, colors=('red', 'dark')):
+    """안내선 후보 픽셀 마스크 (빨간선 + 짙은 선)"""
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    if 'red' in colors:
+        mask |= cv2.inRange(hsv, np.array([0, 50, 50]), np.array([10, 255, 255]))
+        mask |= cv2.inRange(hsv, np.array([170, 50, 50]), np.array([180, 255, 255]))
+    if 'dark' in colors:
+        mask |= cv2.inRange(hsv, np.array([0, 0, 0]), np.array([180, 255, 90]))
+    return mask
+
+
+def extract_line_masks(mask, min_line_length, max_line_thickness):
+    """가늘고 긴 가로/세로 직선만 남긴 마스크
+
+    - max_line_thickness보다 굵은 영역(붓 획)은 정사각형 열림으로 찾아 제거
+    - 짧은 조각(점선, 글자 잔여)은 긴 직선 커널 열림으로 제거
+    """
+    k = max_line_thickness + 1
+    thick = cv2.morphologyEx(mask, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (k, k)))
+    # 굵은 영역 가장자리에 남는 얇은 테를 막기 위해 조금 넓혀서 제거
+    mask = cv2.bitwise_and(mask, cv2.bitwise_not(cv2.dilate(thick, np.ones((3, 3), np.uint8))))
+
+    horizontal = cv2.morphologyEx(mask, cv2.MORPH_OPEN,
+                                  cv2.getStructuringElement(cv2.MORPH_RECT, (min_line_length, 1)))
+    vertical = cv2.morphologyEx(mask, cv2.MORPH_OPEN,
+                                cv2.getStructuringElement(cv2.MORPH_RECT, (1, min_line_length)))
+    return horizontal, vertical
+
+
+def find_line_positions(profile, threshold):
+    """투영 프로파일에서 threshold 이상인 연속 구간의 중심 위치"""
+    above = np.concatenate([[False], profile >= threshold, [False]])
+    changes = np.flatnonzero(np.diff(above.astype(np.int8)))
+    starts, ends = changes[::2], changes[1::2]
+    return ((starts + ends - 1) / 2).astype(np.int64)
+
+
+def _edge_coverage(line_mask, x0, x1, y0, y1, axis, tolerance):
+    """선 마스크가 한 변을 얼마나 덮는지 (0~1) - 변 주변 ±tolerance 띠 안에서"""
+    if axis == 0:  # 가로 변 (y0 == y1)
+        band = line_mask[max(y0 - tolerance, 0):y0 + tolerance + 1, x0:x1]
+        return np.mean(band.any(axis=0)) if band.size else 0.0
+    band = line_mask[y0:y1, max(x0 - tolerance, 0):x0 + tolerance + 1]
+    return np.mean(band.any(axis=1)) if band.size else 0.0
+
+
+def detect_grid_cells(img, min_cell_size=40, peak_ratio=0.3, min_coverage=0.6,
+                      max_line_thickness=6, colors=('red', 'dark')):
+    """페이지 이미지에서 칸 목록 검출
+
+    Args:
+        img: BGR 페이지 이미지
+        min_cell_size: 칸 한 변의 최소 길이 (픽셀)
+        peak_ratio: 최대 봉우리 대비 선으로 인정할 투영 비율
+        min_coverage: 칸의 네 변이 각각 선으로 덮여야 하는 최소 비율
+        max_line_thickness: 안내선 최대 두께 (이보다 굵으면 글자 획으로 보고 제외)
+
+    Returns:
+        [{'row', 'col', 'bbox': (x, y, w, h)}] - 행 우선 순서, bbox는 선 중심 기준
+    """
+    mask = guide_line_mask(img, colors)
+    min_line_length = max(min_cell_size // 2, 5)
+    horizontal, vertical = extract_line_masks(mask, min_line_length, max_line_thickness)
+
+    # 한 번의 합으로 가로/세로 투영
+    row_profile = np.count_nonzero(horizontal, axis=1)
+    col_profile = np.count_nonzero(vertical, axis=0)
+
+    return cells_from_lines(row_profile, col_profile, horizontal, vertical,
+                            min_cell_size, peak_ratio, min_coverage)
+
+
+def cells_from_lines(row_profile, col_profile, horizontal, vertical,
+                     min_cell_size=40, peak_ratio=0.3, min_coverage=0.6):
+    """투영 프로파일과 선 마스크로 칸 목록 구성
+
+    horizontal/vertical은 [행 슬라이스, 열 슬라이스]로 2차원 배열을 돌려주면 됨
+    (타일 처리에서는 비트 압축 마스크를 넘김)
+    """
+    if row_profile.max() == 0 or col_profile.max() == 0:
+        return []
+
+    ys = find_line_positions(row_profile, peak_ratio * row_profile.max())
+    xs = find_line_positions(col_profile, peak_ratio * col_profile.max())
+
+    tolerance = max(2, min_cell_size // 20)
+    cells = []
+    row_starts = {}
+    for y0, y1 in zip(ys[:-1], ys[1:]):
+        if y1 - y0 < min_cell_size:
+            continue
+        for x0, x1 in zip(xs[:-1], xs[1:]):
+            if x1 - x0 < min_cell_size:
+                continue
+            edges = (_edge_coverage(horizontal, x0, x1, y0, y0, 0, tolerance),
+                     _edge_coverage(horizontal, x0, x1, y1, y1, 0, tolerance),
+                     _edge_coverage(vertical, x0, x0, y0, y1, 1, tolerance),
+                     _edge_coverage(vertical, x1, x1, y0, y1, 1, tolerance))
+            if min(edges) < min_coverage:
+                continue
+            row = row_starts.setdefault(int(y0), len(row_starts))
+            cells.append({'row': row, 'bbox': (int(x0), int(y0), int(x1 - x0), int(y1 - y0))})
+
+    # 행 안에서 왼쪽부터 열 번호
+    for row in range(len(row_starts)):
+        in_row = sorted((c for c in cells if c['row'] == row), key=lambda c: c['bbox'][0])
+        for col, cell in enumerate(in_row):
+            cell['col'] = col
+
+    return sorted(cells, key=lambda c: (c['row'], c['col']))
+
+
+def crop_cells(img, cells, inset=4):
+    """칸 이미지 목록 (선 두께만큼 inset 픽셀 안쪽을 잘라냄, 원본의 뷰)"""
+    crops = []
+    for cell in cells:
+        x, y, w, h = cell['bbox']
+        crops.append(img[y + inset:y + h - inset, x + inset:x + w - inset])
+    return crops
+
+
+def column_groups(cells):
+    """x 위치가 겹치는 칸끼리 세로 열로 묶음 (왼쪽 열부터, 열 안에서는 위에서부터)"""
+    groups = []
+    for cell in sorted(cells, key=lambda c: c['bbox'][0]):
+        x, _, w, _ = cell['bbox']
+        for group in groups:
+            gx, _, gw, _ = group[0]['bbox']
+            if x < gx + gw and gx < x + w:
+                group.append(cell)
+                break
+        else:
+            groups.append([cell])
+    return [sorted(group, key=lambda c: c['bbox'][1]) for group in groups]
+
+
+def pair_cells_by_row(cells):
+    """행마다 첫 칸을 교본, 나머지 칸을 작성본으로 묶음
+
+    Returns:
+        [(교본 칸, [작성본 칸...])]
+    """
+    rows = {}
+    for cell in cells:
+        rows.setdefault(cell['row'], []).append(cell)
+    return [(row_cells[0], row_cells[1:]) for _, row_cells in sorted(rows.items())
+            if len(row_cells) > 1]
@@ -10,6 +10,7 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import os
+from grid_layout import detect_grid_cells, crop_cells, column_groups
 
 
 class GuideOverlayComparator:
@@ -31,21 +32,11 @@ class GuideOverlayComparator:
         if img is None:
             raise ValueError(f"이미지를 로드할 수 없습니다: {image_path}")
         
-        h, w = img.shape[:2]
-        
-        # 이미지 영역 분할 (대략적인 좌표)
+        # 이미지 영역 분할
         # 왼쪽 위: 교본 글자 (참고용)
         # 왼쪽 아래: 결구 가이드
         # 오른쪽: 사용자가 쓴 글자
-        
-        mid_x = w // 2
-        mid_y = h // 2
-        
-        # 왼쪽 아래 결구 가이드 추출 (빨간 선이 있는 부분)
-        guide_img = img[mid_y:h-50, 50:mid_x-20]
-        
-        # 오른쪽 사용자 글자 추출
-        user_img = img[80:mid_y+100, mid_x+50:w-50]
+        guide_img, user_img = self.locate_regions(img)
         
         # 출력 디렉토리
         output_dir = f"guide_output/{char_name}"
@@ -97,6 +88,30 @@ class GuideOverlayComparator:
         
         return scores
     
+    def locate_regions(self, img):
+        """안내선 칸 검출로 (결구 가이드, 사용자 글자) 영역 찾기
+        
+        왼쪽 열의 가장 아래 칸 = 결구 가이드, 오른쪽 열의 첫 칸 = 사용자 글자.
+        칸을 찾지 못하면 기존의 대략적인 비율 좌표 사용
+        """
+        columns = column_groups(detect_grid_cells(img))
+        if len(columns) >= 2:
+            guide_cell = columns[0][-1]
+            user_cell = columns[-1][0]
+            return tuple(crop_cells(img, [guide_cell, user_cell]))
+        
+        h, w = img.shape[:2]
+        mid_x = w // 2
+        mid_y = h // 2
+        
+        # 왼쪽 아래 결구 가이드 추출 (빨간 선이 있는 부분)
+        guide_img = img[mid_y:h-50, 50:mid_x-20]
+        
+        # 오른쪽 사용자 글자 추출
+        user_img = img[80:mid_y+100, mid_x+50:w-50]
+        
+        return guide_img, user_img
+    
     def create_overlay(self, guide_img, user_img, user_mask):
         """
         가이드와 사용자 글자 오버레이 생성
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+축소 해상도 디코딩 이미지 로더
+- 분석에 필요한 해상도(target_size: 긴 변 픽셀)만큼만 디코딩 → 시간/메모리 4~16배 절약
+- JPEG: Pillow draft() (DCT 단계에서 1/2, 1/4, 1/8 축소)
+- HEIC: pillow-heif draft() (충분히 큰 내장 썸네일이 있으면 그것을 디코딩)
+- 그 밖의 형식: cv2.IMREAD_REDUCED_*_2/4/8
+- 경로와 업로드 바이트 모두 지원
+- ImageCache: 같은 업로드(교본 등)를 반복 디코딩하지 않도록 내용 해시로 LRU 캐시
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+from stage_timing import stage
+
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except ImportError:  # HEIC 없이도 나머지 형식은 동작
+    pillow_heif = None
+
+
+REDUCTION_FACTORS = (1, 2, 4, 8)
+
+_CV2_REDUCED_FLAGS = {
+    (1, False): cv2.IMREAD_COLOR,
+    (2, False): cv2.IMREAD_REDUCED_COLOR_2,
+    (4, False): cv2.IMREAD_REDUCED_COLOR_4,
+    (8, False): cv2.IMREAD_REDUCED_COLOR_8,
+    (1, True): cv2.IMREAD_GRAYSCALE,
+    (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8
+}
+
+# Pillow draft()로 축소 디코딩이 되는 형식
+_DRAFT_FORMATS = {'JPEG', 'MPO', 'HEIF'}
+
+
+def choose_reduction(size, target_size):
+    """긴 변이 target_size 이상으로 남는 가장 큰 축소 배율 (1, 2, 4, 8)"""
+    if not target_size:
+        return 1
+    longest = max(size)
+    factor = 1
+    for candidate in REDUCTION_FACTORS:
+        if longest / candidate >= target_size:
+            factor = candidate
+    return factor
+
+
+def _open(source):
+    """경로 또는 바이트로 Pillow 이미지 열기 (헤더만 읽음)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+
+def image_size(source):
+    """디코딩 없이 (너비, 높이)"""
+    with _open(source) as im:
+        return im.size
+
+
+def _load_with_pillow(im, target_size, grayscale):
+    """draft()로 축소 디코딩 후 배열로 (EXIF 회전 반영)"""
+    mode = 'L' if grayscale else 'RGB'
+    if target_size:
+        factor = choose_reduction(im.size, target_size)
+        if factor > 1:
+            im.draft(mode, (im.size[0] // factor, im.size[1] // factor))
+        # 썸네일이 없는 HEIC 등 draft로 못 줄인 만큼은 정수 배율 박스 축소
+        remaining = choose_reduction(im.size, target_size)
+        if remaining > 1:
+            im = im.reduce(remaining)
+    im = ImageOps.exif_transpose(im)
+    img = np.array(im.convert(mode))
+    if grayscale:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
+def _load_with_cv2(source, factor, grayscale):
+    flag = _CV2_REDUCED_FLAGS[(factor, grayscale)]
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return cv2.imdecode(np.frombuffer(source, dtype=np.uint8), flag)
+    return cv2.imread(source, flag)
+
+
+def load_image(source, target_size=None, grayscale=False):
+    """
+    이미지 로드 (필요한 해상도만큼만 디코딩)
+
+    Args:
+        source: 파일 경로 또는 이미지 바이트
+        target_size: 분석에 필요한 긴 변 픽셀 수 (None이면 원본 해상도)
+        grayscale: True면 그레이스케일, 아니면 BGR
+
+    Returns:
+        numpy 배열 - 긴 변은 target_size 이상 (최대 2배 미만 여유)
+    """
+    with stage('decode') as timing:
+        img = _decode(source, target_size, grayscale)
+        timing.add(img)
+    return img
+
+
+def _decode(source, target_size, grayscale):
+    try:
+        im = _open(source)
+    except Exception:
+        im = None  # Pillow가 모르는 형식은 OpenCV에 맡김
+
+    if im is not None:
+        with im:
+            if im.format in _DRAFT_FORMATS:
+                return _load_with_pillow(im, target_size, grayscale)
+            factor = choose_reduction(im.size, target_size)
+    else:
+        factor = 1
+
+    img = _load_with_cv2(source, factor, grayscale)
+    if img is None:
+        name = source if isinstance(source, str) else '업로드 데이터'
+        raise ValueError(f"이미지를 로드할 수 없습니다: {name}")
+    return img
+
+
+class ImageCache:
+    """업로드 바이트의 디코딩 결과 LRU 캐시 (내용 해시 기준, 스레드 안전)
+
+    반환 배열은 캐시와 공유하므로 읽기 전용으로 표시됨
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, data, target_size=None, grayscale=False):
+        """load_image와 같음 - 같은 바이트/옵션이면 캐시된 배열 반환"""
+        key = (hashlib.sha1(data).hexdigest(), target_size, grayscale)
+        with self._lock:
+            img = self._entries.get(key)
+            if img is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return img
+            self.misses += 1
+
+        img = load_image(data, target_size, grayscale)
+        img.setflags(write=False)
+        with self._lock:
+            self._entries[key] = img
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return img
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -10,6 +10,7 @@ import numpy as np
 from scipy import ndimage
 from scipy.signal import find_peaks, savgol_filter
 from skimage.morphology import skeletonize, thin
+from skeleton_backend import medial_axis_transform
 from skimage.measure import label, regionprops
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
@@ -22,6 +23,46 @@ warnings.filterwarnings('ignore')
 plt.rcParams['font.family'] = 'AppleGothic'
 plt.rcParams['axes.unicode_minus'] = False
 
+class StrokeRegion:
+    """연결 컴포넌트 하나를 바운딩 박스 크기로만 보관하는 획 객체
+    
+    전체 크기 마스크를 획마다 할당하지 않고 라벨 맵의 bbox 영역만 참조한다.
+    """
+    
+    def __init__(self, label_id, labels, stat, centroid):
+        self.label = label_id
+        x, y, w, h = (int(v) for v in stat[:4])
+        self.bbox = (x, y, w, h)
+        self.area = int(stat[cv2.CC_STAT_AREA])
+        self.centroid = (float(centroid[0]), float(centroid[1]))
+        self.image_shape = labels.shape[:2]
+        # 라벨 맵의 bbox 뷰 (복사 없음)
+        self._labels_view = labels[y:y+h, x:x+w]
+    
+    @property
+    def mask(self):
+        """bbox 크기의 획 마스크 (획=255, 배경=0)"""
+        return (self._labels_view == self.label).astype(np.uint8) * 255
+    
+    @property
+    def slices(self):
+        """원본 이미지에서 bbox 영역을 가리키는 슬라이스 (행, 열)"""
+        x, y, w, h = self.bbox
+        return slice(y, y + h), slice(x, x + w)
+    
+    def to_stroke_image(self, pad=16):
+        """중봉 분석용 획 이미지 (흰 배경 위 검은 획, 가장자리 여백 포함)"""
+        stroke_img = 255 - self.mask
+        return cv2.copyMakeBorder(stroke_img, pad, pad, pad, pad,
+                                  cv2.BORDER_CONSTANT, value=255)
+    
+    def to_full_mask(self):
+        """원본 크기 마스크로 복원 (호환용 - 필요할 때만 사용)"""
+        full = np.zeros(self.image_shape, dtype=np.uint8)
+        full[self.slices] = self.mask
+        return full
+
+
 class IntegratedZhongAnalyzer:
     def __init__(self):
         self.character = "中"
@@ -80,21 +121,24 @@ class IntegratedZhongAnalyzer:
         
         return img
     
-    def extract_strokes(self, img):
-        """획 분리 및 추출"""
+    def extract_strokes(self, img, min_area=20, max_area=None):
+        """획 분리 및 추출 (바운딩 박스 단위로 잘라낸 StrokeRegion 목록)"""
         _, binary = cv2.threshold(img, 127, 255, cv2.THRESH_BINARY_INV)
         
         # 형태학적 연산으로 획 분리
         kernel = np.ones((3, 3), np.uint8)
         opened = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
         
-        # 연결된 컴포넌트 찾기
-        num_labels, labels = cv2.connectedComponents(opened)
+        # 연결된 컴포넌트 + 통계 (bbox, 면적, 무게중심)를 한 번에 계산
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(opened)
         
         strokes = []
         for i in range(1, num_labels):
-            stroke_mask = (labels == i).astype(np.uint8) * 255
-            strokes.append(stroke_mask)
+            area = stats[i, cv2.CC_STAT_AREA]
+            # 크기 필터: 잡티(점)와 비정상적으로 큰 영역 제외
+            if area < min_area or (max_area is not None and area > max_area):
+                continue
+            strokes.append(StrokeRegion(i, labels, stats[i], centroids[i]))
         
         return strokes
     
@@ -102,11 +146,8 @@ class IntegratedZhongAnalyzer:
         """붓 움직임 궤적 분석"""
         _, binary = cv2.threshold(img, 127, 255, cv2.THRESH_BINARY_INV)
         
-        # 스켈레톤 추출
-        skeleton = skeletonize(binary > 0)
-        
-        # 거리 변환
-        dist_transform = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+        # 스켈레톤과 거리 변환을 함께 계산
+        skeleton, dist_transform = medial_axis_transform(binary)
         
         # 궤적 포인트 수집
         skel_points = np.argwhere(skeleton)
@@ -166,7 +207,9 @@ class IntegratedZhongAnalyzer:
         ref_strokes = self.extract_strokes(reference)
         user_strokes = self.extract_strokes(user)
         
-        stroke_ratio = min(len(user_strokes), len(ref_strokes)) / max(len(user_strokes), len(ref_strokes))
+        # 획 객체는 bbox 크롭만 보관하므로 개수 비교에 전체 마스크가 필요 없음
+        max_strokes = max(len(user_strokes), len(ref_strokes))
+        stroke_ratio = min(len(user_strokes), len(ref_strokes)) / max_strokes if max_strokes else 0
         scores['구조_완성도'] = stroke_ratio * 100
         
         # 2. 획 균형 (각 획의 길이 비율)
@@ -297,8 +340,9 @@ class IntegratedZhongAnalyzer:
         colors = [[1,0,0], [0,1,0], [0,0,1], [1,1,0]]  # 빨강, 초록, 파랑, 노랑
         
         for i, stroke in enumerate(user_strokes[:4]):
+            stroke_mask = stroke.mask / 255
             for c in range(3):
-                colored_strokes[:,:,c] += stroke/255 * colors[i%4][c]
+                colored_strokes[stroke.slices + (c,)] += stroke_mask * colors[i%4][c]
         
         ax8.imshow(colored_strokes)
         ax8.set_title('획 분리 분석')
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+여러 교본(서가/교재)과 한 번에 비교하는 배치 채점
+- K개의 정렬된 교본 마스크를 (K, H, W) 텐서로 쌓아 벡터 연산으로 채점
+- 사용자 글자의 특징(면적, 무게중심)은 한 번만 계산
+- 가장 가까운 교본을 찾아 보고
+"""
+
+import cv2
+import numpy as np
+
+
+# 최종 점수 가중치 (합 = 1.0)
+SCORE_WEIGHTS = {
+    'overlap': 0.3,
+    'fill_rate': 0.2,
+    'accuracy': 0.2,
+    'center': 0.15,
+    'size': 0.15
+}
+
+
+def stack_reference_masks(reference_masks):
+    """정렬된 교본 마스크 목록을 (K, H, W) bool 텐서로 변환"""
+    if not reference_masks:
+        raise ValueError("교본 마스크가 하나 이상 필요합니다.")
+
+    shape = reference_masks[0].shape[:2]
+    for mask in reference_masks:
+        if mask.shape[:2] != shape:
+            raise ValueError(f"교본 마스크 크기가 다릅니다: {mask.shape[:2]} != {shape}")
+
+    return np.stack([mask > 0 for mask in reference_masks])
+
+
+def compute_user_features(user_char):
+    """사용자 글자 특징 (면적, 무게중심) - 교본 수와 관계없이 한 번만 계산"""
+    user = user_char > 0
+    h, w = user.shape
+    area = np.count_nonzero(user)
+
+    if area > 0:
+        cy = user.sum(axis=1) @ np.arange(h) / area
+        cx = user.sum(axis=0) @ np.arange(w) / area
+    else:
+        cy, cx = h / 2, w / 2
+
+    return {
+        'mask': user,
+        'area': area,
+        'center': (cx, cy)
+    }
+
+
+def calculate_batch_scores(user_char, reference_stack, user_features=None):
+    """사용자 글자를 K개 교본과 동시에 채점
+
+    Args:
+        user_char: (H, W) 사용자 글자 마스크 (글자 > 0)
+        reference_stack: stack_reference_masks()의 (K, H, W) bool 텐서
+        user_features: compute_user_features() 결과 (재사용 시)
+
+    Returns:
+        항목별 길이 K 배열 딕셔너리 (overlap, fill_rate, accuracy, center, size, final)
+    """
+    if user_features is None:
+        user_features = compute_user_features(user_char)
+
+    user = user_features['mask']
+    k, h, w = reference_stack.shape
+    if user.shape != (h, w):
+        raise ValueError(f"사용자 마스크 크기가 교본과 다릅니다: {user.shape} != {(h, w)}")
+
+    # 교본별 면적과 교집합 - 축소 연산 두 번
+    ref_areas = np.count_nonzero(reference_stack.reshape(k, -1), axis=1)
+    intersections = np.count_nonzero((reference_stack & user).reshape(k, -1), axis=1)
+
+    # 행/열 투영으로 K개 무게중심을 한 번에 계산
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ref_cy = reference_stack.sum(axis=2) @ np.arange(h) / ref_areas
+        ref_cx = reference_stack.sum(axis=1) @ np.arange(w) / ref_areas
+
+    return scores_from_counts(intersections, ref_areas, (ref_cx, ref_cy),
+                              user_features, (h, w))
+
+
+def scores_from_counts(intersections, ref_areas, ref_centers, user_features, shape):
+    """교집합/면적/무게중심 집계값에서 K개 교본 점수 계산
+
+    bool 스택(calculate_batch_scores)과 비트 압축 스택(ReferenceStore)이 공유한다.
+    """
+    h, w = shape
+    k = len(ref_areas)
+    user_area = user_features['area']
+    unions = ref_areas + user_area - intersections
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. 겹침도 (IoU)
+        overlap = np.where(unions > 0, intersections / unions * 100, 0.0)
+
+        # 2. 채움도 (교본 영역을 얼마나 채웠는지)
+        fill_rate = np.where(ref_areas > 0, intersections / ref_areas * 100, 0.0)
+
+        # 3. 정확도 (사용자 획 중 교본 안에 있는 비율)
+        if user_area > 0:
+            accuracy = intersections / user_area * 100
+        else:
+            accuracy = np.zeros(k)
+
+        # 4. 중심 정렬도
+        ref_cx, ref_cy = ref_centers
+        ucx, ucy = user_features['center']
+        max_dist = np.sqrt(w**2 + h**2)
+        dist = np.sqrt((ref_cx - ucx)**2 + (ref_cy - ucy)**2)
+        center = np.where((ref_areas > 0) & (user_area > 0),
+                          np.maximum(0, 100 * (1 - dist / max_dist)), 0.0)
+
+        # 5. 크기 비율
+        size = np.where(ref_areas > 0,
+                        np.minimum(ref_areas, user_area) / np.maximum(ref_areas, user_area) * 100,
+                        0.0)
+
+    scores = {
+        'overlap': overlap,
+        'fill_rate': fill_rate,
+        'accuracy': accuracy,
+        'center': center,
+        'size': size
+    }
+    scores['final'] = sum(scores[name] * weight for name, weight in SCORE_WEIGHTS.items())
+
+    return scores
+
+
+def rank_results(reference_names, batch):
+    """교본별 점수 딕셔너리 목록을 종합 점수 순으로 정렬"""
+    results = []
+    for i, name in enumerate(reference_names):
+        results.append({
+            'reference': name,
+            **{key: float(values[i]) for key, values in batch.items()}
+        })
+
+    # 종합 점수 내림차순
+    ranked = sorted(results, key=lambda r: r['final'], reverse=True)
+
+    return {
+        'best': ranked[0],
+        'ranking': ranked
+    }
+
+
+def score_against_references(user_char, reference_masks, reference_names=None):
+    """여러 교본과 비교하여 교본별 점수와 가장 가까운 교본을 반환"""
+    if reference_names is None:
+        reference_names = [f'reference_{i+1}' for i in range(len(reference_masks))]
+
+    reference_stack = stack_reference_masks(reference_masks)
+    batch = calculate_batch_scores(user_char, reference_stack)
+
+    return rank_results(reference_names, batch)
+
+
+def main():
+    from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+
+    analyzer = IntegratedZhongAnalyzer()
+
+    # 교본 여러 개 (변형 정도가 다른 "서가"를 시뮬레이션)
+    references = {
+        '표준 교본': analyzer.create_reference_zhong(),
+        '교본 A': analyzer.create_user_zhong(variation_level=0.1),
+        '교본 B': analyzer.create_user_zhong(variation_level=0.5),
+    }
+    user = analyzer.create_user_zhong(variation_level=0.3)
+
+    # 흰 배경/검은 글씨 → 글자 마스크
+    ref_masks = [cv2.threshold(img, 127, 255, cv2.THRESH_BINARY_INV)[1]
+                 for img in references.values()]
+    user_mask = cv2.threshold(user, 127, 255, cv2.THRESH_BINARY_INV)[1]
+
+    result = score_against_references(user_mask, ref_masks, list(references.keys()))
+
+    print("="*60)
+    print("📚 다중 교본 비교 결과")
+    print("="*60)
+    for r in result['ranking']:
+        print(f"{r['reference']:10s}: {r['final']:5.1f}점 "
+              f"(겹침 {r['overlap']:.1f}, 채움 {r['fill_rate']:.1f}, "
+              f"정확 {r['accuracy']:.1f}, 중심 {r['center']:.1f}, 크기 {r['size']:.1f})")
+    print("-"*60)
+    print(f"🎯 가장 가까운 교본: {result['best']['reference']}")
+
+
+if __name__ == "__main__":
+    main()
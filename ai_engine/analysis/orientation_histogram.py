@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+기울기 방향 히스토그램 (획 방향 분포)
+- Sobel 기울기의 방향을 크기 가중치로 누적 (0~180° 축 방향, 이웃 구간에 선형 분배)
+- 원형 통계: 각도를 두 배로 펴서 평균 → 0°/180° 경계에서도 평균이 깨지지 않음
+- 히스토그램끼리는 원형 EMD(도 단위)로 비교 → 작은 회전은 작은 거리
+"""
+
+import cv2
+import numpy as np
+
+
+def orientation_histogram(mask, bins=36, blur_sigma=1.0):
+    """마스크 (글자 > 0)의 획 방향 히스토그램 (합 = 1, 길이 bins)
+
+    구간 k는 [k, k+1) × (180 / bins)도 방향 (0° = 가로획, 90° = 세로획)
+    """
+    img = (mask > 0).astype(np.float32)
+    if blur_sigma > 0:
+        img = cv2.GaussianBlur(img, (0, 0), blur_sigma)
+
+    gx = cv2.Sobel(img, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(img, cv2.CV_32F, 0, 1, ksize=3)
+    magnitude = cv2.magnitude(gx, gy).ravel()
+    active = magnitude > 1e-3
+    if not active.any():
+        return np.zeros(bins)
+
+    # 획 진행 방향 = 기울기 방향 + 90° (축 방향이므로 0 ~ 180°) → 구간 좌표
+    theta = (np.degrees(np.arctan2(gy.ravel()[active], gx.ravel()[active])) + 90) % 180
+    position = theta / (180 / bins)
+    lower = np.floor(position).astype(np.int64)
+    frac = position - lower
+    weight = magnitude[active]
+
+    hist = (np.bincount(lower % bins, weight * (1 - frac), minlength=bins) +
+            np.bincount((lower + 1) % bins, weight * frac, minlength=bins))
+    return hist / hist.sum()
+
+
+def dominant_orientation(hist):
+    """원형 평균 방향 (도, 0~180)과 집중도 (0~1, 1이면 한 방향)"""
+    bins = len(hist)
+    # 구간 위치 (구간 시작 기준, orientation_histogram과 같은 좌표)
+    doubled = np.radians(np.arange(bins) * (360 / bins))
+    c = np.sum(hist * np.cos(doubled))
+    s = np.sum(hist * np.sin(doubled))
+    angle = np.degrees(np.arctan2(s, c)) / 2 % 180
+    return float(angle), float(np.hypot(c, s))
+
+
+def circular_emd(hist_a, hist_b):
+    """두 원형 히스토그램 사이의 EMD (도 단위, 0 ~ 90 - 180° 원에서 가장 먼 거리가 90°)"""
+    bins = len(hist_a)
+    cumulative = np.cumsum(np.asarray(hist_a) - np.asarray(hist_b))
+    # 원형에서는 누적 차이에서 중앙값을 빼면 최소 이동량
+    return float(np.sum(np.abs(cumulative - np.median(cumulative))) * (180 / bins))
+
+
+def orientation_score(hist_a, hist_b):
+    """방향 분포 유사도 점수 (0 ~ 100) - EMD 1°당 2점 감점"""
+    if hist_a.sum() == 0 or hist_b.sum() == 0:
+        return 0.0
+    return max(0.0, 100 - circular_emd(hist_a, hist_b) * 2)
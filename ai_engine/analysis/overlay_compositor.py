@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+라벨 맵 기반 오버레이 합성
+- 가이드/사용자 마스크를 2비트 코드 맵(0: 없음, 1: 가이드만, 2: 사용자만, 3: 둘 다)으로 한 번만 인코딩
+- 오버레이 종류마다 코드별 연산 하나 (유지, 색 덮기, 반투명 혼합, 채널 더하기)
+- 연산은 배경 값 256단계에 대한 uint8 표(LUT)로 미리 계산 → cv2.LUT 후 그 코드 영역에만 복사
+  (배경 유지 코드는 건너뜀, 큰 중간 배열이나 픽셀별 정수 연산 없음)
+- 필요하면 PNG/WebP 바이트로 바로 인코딩
+"""
+
+import cv2
+import numpy as np
+
+from stage_timing import stage
+
+
+NONE, GUIDE_ONLY, USER_ONLY, BOTH = 0, 1, 2, 3
+
+def encode(guide_char=None, user_char=None):
+    """가이드/사용자 마스크 → 2비트 코드 맵 (uint8)"""
+    reference = guide_char if guide_char is not None else user_char
+    codes = np.zeros(reference.shape[:2], dtype=np.uint8)
+    if guide_char is not None:
+        codes |= (guide_char > 0).astype(np.uint8)
+    if user_char is not None:
+        codes |= (user_char > 0).astype(np.uint8) << 1
+    return codes
+
+
+def keep():
+    """배경 유지"""
+    return ('keep', None)
+
+
+def replace(color):
+    """색 덮기 (BGR)"""
+    return ('replace', color)
+
+
+def blend(color, alpha):
+    """배경과 반투명 혼합 (cv2.addWeighted(bg, 1-alpha, color, alpha)와 같음)"""
+    return ('blend', (color, alpha))
+
+
+def add(delta):
+    """채널별로 더하기 (0~255에서 포화)"""
+    return ('add', delta)
+
+
+_LEVELS = np.repeat(np.arange(256, dtype=np.uint8)[None, :, None], 3, axis=2)  # (1, 256, 3)
+
+
+def build_lut(operation):
+    """연산 → 배경 값별 결과 표 (1, 256, 3) uint8, 배경 유지면 None
+
+    표는 원래 연산(cv2.addWeighted 등)을 0~255 전체에 한 번 적용해 만들므로
+    픽셀마다 직접 계산한 결과와 바이트 단위로 같음
+    """
+    kind, value = operation
+    if kind == 'keep':
+        return None
+    if kind == 'replace':
+        return np.broadcast_to(np.asarray(value, dtype=np.uint8), _LEVELS.shape).copy()
+    if kind == 'blend':
+        color, alpha = value
+        color_levels = np.broadcast_to(np.asarray(color, dtype=np.uint8), _LEVELS.shape).copy()
+        return cv2.addWeighted(_LEVELS, 1.0 - alpha, color_levels, alpha, 0)
+    if kind == 'add':
+        table = _LEVELS.astype(np.int16) + np.asarray(value, dtype=np.int16)
+        return np.clip(table, 0, 255).astype(np.uint8)
+    raise ValueError(f"알 수 없는 연산: {kind}")
+
+
+def render(codes, style, background=None):
+    """코드 맵을 한 번 훑어 오버레이 한 장 렌더링
+
+    Args:
+        codes: encode() 결과
+        style: {코드: keep()/replace()/blend()/add()}
+        background: BGR 배경 이미지 (None이면 흰 바탕)
+    """
+    with stage('render', codes):
+        return _render(codes, style, background)
+
+
+def _render(codes, style, background):
+    tables = {code: build_lut(operation) for code, operation in style.items()}
+    if background is None:
+        # 배경이 상수면 코드별 최종 색을 미리 골라 코드 맵에 LUT로 적용 (style에 없는 코드는 흰색)
+        colors = np.full((1, 256, 3), 255, dtype=np.uint8)
+        for code, table in tables.items():
+            if table is not None:
+                colors[0, code] = table[0, 255]
+        return cv2.LUT(cv2.merge([codes] * 3), colors)
+
+    result = background.copy()
+    for code, table in tables.items():
+        if table is None:
+            continue
+        mask = (codes == code).view(np.uint8)
+        if not mask.any():
+            continue
+        # 채널별 LUT를 한 번에 적용 후 이 코드 영역에만 복사
+        cv2.copyTo(cv2.LUT(background, table), mask, result)
+    return result
+
+
+def to_bytes(img, fmt='png', quality=90):
+    """이미지를 PNG/WebP 바이트로 인코딩"""
+    with stage('encode', img):
+        return _to_bytes(img, fmt, quality)
+
+
+def _to_bytes(img, fmt, quality):
+    fmt = fmt.lower().lstrip('.')
+    if fmt == 'png':
+        params = [cv2.IMWRITE_PNG_COMPRESSION, 3]
+    elif fmt == 'webp':
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    else:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (png 또는 webp)")
+
+    ok, buffer = cv2.imencode('.' + fmt, img, params)
+    if not ok:
+        raise ValueError(f"{fmt} 인코딩 실패")
+    return buffer.tobytes()
+
+
+def finalize(overlays, encode_format=None):
+    """encode_format이 있으면 오버레이 딕셔너리를 바이트로 변환"""
+    if encode_format is None:
+        return overlays
+    return {name: to_bytes(img, encode_format) for name, img in overlays.items()}
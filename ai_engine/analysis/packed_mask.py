@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+비트 압축 마스크 (PackedMask)
+- np.packbits로 행 단위 8픽셀 = 1바이트 저장 (uint8/bool 대비 메모리 1/8)
+- AND/OR/popcount 연산으로 교집합, 합집합, 면적 계산
+- 교본 캐시와 다중 교본 순위 계산용
+"""
+
+import numpy as np
+
+
+# 바이트별 1비트 개수 테이블 (popcount)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(packed, axis=None):
+    """압축된 바이트 배열의 1비트 개수 합"""
+    return _POPCOUNT_TABLE[packed].sum(axis=axis, dtype=np.int64)
+
+
+class PackedMask:
+    """행 단위로 비트 압축한 이진 마스크"""
+
+    def __init__(self, bits, shape):
+        self.bits = bits
+        self.shape = tuple(shape)
+        self._area = None
+
+    @classmethod
+    def from_mask(cls, mask):
+        """uint8/bool 마스크 (글자 > 0)에서 생성"""
+        mask = np.asarray(mask)
+        return cls(np.packbits(mask > 0, axis=1), mask.shape[:2])
+
+    def to_mask(self):
+        """uint8 마스크로 복원 (글자=255, 배경=0)"""
+        unpacked = np.unpackbits(self.bits, axis=1, count=self.shape[1])
+        return unpacked * np.uint8(255)
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    @property
+    def area(self):
+        """글자 픽셀 수 (캐시)"""
+        if self._area is None:
+            self._area = int(popcount(self.bits))
+        return self._area
+
+    def _check_shape(self, other):
+        if self.shape != other.shape:
+            raise ValueError(f"마스크 크기가 다릅니다: {self.shape} != {other.shape}")
+
+    def __and__(self, other):
+        self._check_shape(other)
+        return PackedMask(self.bits & other.bits, self.shape)
+
+    def __or__(self, other):
+        self._check_shape(other)
+        return PackedMask(self.bits | other.bits, self.shape)
+
+    def intersection(self, other):
+        """교집합 픽셀 수"""
+        self._check_shape(other)
+        return int(popcount(self.bits & other.bits))
+
+    def union(self, other):
+        """합집합 픽셀 수 (면적 캐시를 이용해 popcount 한 번으로 계산)"""
+        return self.area + other.area - self.intersection(other)
+
+    def iou(self, other):
+        """겹침도 (0~1)"""
+        inter = self.intersection(other)
+        union = self.area + other.area - inter
+        return inter / union if union > 0 else 0.0
+
+
+def stack_packed(masks):
+    """PackedMask 목록을 (K, H, ceil(W/8)) 배열로 쌓기"""
+    shape = masks[0].shape
+    for mask in masks:
+        if mask.shape != shape:
+            raise ValueError(f"마스크 크기가 다릅니다: {mask.shape} != {shape}")
+    return np.stack([mask.bits for mask in masks])
+
+
+def batch_intersections(user, packed_stack):
+    """사용자 PackedMask와 (K, H, Wb) 압축 스택의 교집합 픽셀 수 (길이 K)"""
+    k = packed_stack.shape[0]
+    return popcount((packed_stack & user.bits).reshape(k, -1), axis=1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+위상 상관(phase correlation) 기반 글자 이동 추정
+- 창 함수를 적용한 마스크에 cv2.phaseCorrelate → 서브픽셀 이동 + 신뢰도
+- 신뢰도가 낮으면 (실수) 무게중심 정렬로 대체
+- 변환은 마스크에만 한 번 적용 (컬러 이미지 재추출 불필요)
+- FFT 정규화 상호상관: 제한된 이동 범위 안에서 가장 잘 맞는 위치와 점수
+"""
+
+import cv2
+import numpy as np
+
+
+def find_center_subpixel(char_binary):
+    """글자의 무게중심 (정수 절삭 없이)"""
+    M = cv2.moments(char_binary, binaryImage=True)
+    if M["m00"] > 0:
+        return (M["m10"] / M["m00"], M["m01"] / M["m00"])
+    h, w = char_binary.shape[:2]
+    return (w / 2, h / 2)
+
+
+def _prepare_for_correlation(mask, shape, blur_sigma):
+    """공통 크기 캔버스에 배치하고 부드럽게 만든 float32 마스크"""
+    canvas = np.zeros(shape, dtype=np.float32)
+    h, w = mask.shape[:2]
+    canvas[:h, :w] = mask > 0
+    if blur_sigma > 0:
+        # 가장자리를 부드럽게 하면 상관 피크가 안정되어 서브픽셀 추정이 정확해짐
+        canvas = cv2.GaussianBlur(canvas, (0, 0), blur_sigma)
+    return canvas
+
+
+def estimate_translation(moving_char, fixed_char, min_confidence=0.05, blur_sigma=1.5):
+    """moving 글자를 fixed 글자에 맞추는 이동량 (dx, dy) 추정
+
+    Args:
+        moving_char: 이동시킬 글자 마스크 (사용자, 글자 > 0)
+        fixed_char: 기준 글자 마스크 (가이드, 글자 > 0)
+        min_confidence: 이보다 낮은 위상 상관 응답이면 무게중심 정렬로 대체
+
+    Returns:
+        {'dx', 'dy', 'confidence', 'method'} - method는 'phase' 또는 'centroid'
+    """
+    shape = (max(moving_char.shape[0], fixed_char.shape[0]),
+             max(moving_char.shape[1], fixed_char.shape[1]))
+
+    moving = _prepare_for_correlation(moving_char, shape, blur_sigma)
+    fixed = _prepare_for_correlation(fixed_char, shape, blur_sigma)
+
+    confidence = 0.0
+    if moving.any() and fixed.any():
+        window = cv2.createHanningWindow((shape[1], shape[0]), cv2.CV_32F)
+        # fixed가 moving을 (dx, dy)만큼 이동한 것으로 추정
+        (dx, dy), confidence = cv2.phaseCorrelate(moving, fixed, window)
+
+    if confidence >= min_confidence:
+        return {'dx': dx, 'dy': dy, 'confidence': confidence, 'method': 'phase'}
+
+    # 신뢰도 부족 → 무게중심 정렬
+    mx, my = find_center_subpixel(moving_char)
+    fx, fy = find_center_subpixel(fixed_char)
+    return {'dx': fx - mx, 'dy': fy - my, 'confidence': confidence, 'method': 'centroid'}
+
+
+def shift_mask(mask, dx, dy, target_shape):
+    """마스크를 서브픽셀 이동 후 다시 이진화 (글자=255)"""
+    M = np.array([[1, 0, dx],
+                  [0, 1, dy]], dtype=np.float32)
+    shifted = cv2.warpAffine(mask, M, (target_shape[1], target_shape[0]),
+                             flags=cv2.INTER_LINEAR, borderValue=0)
+    return np.where(shifted >= 128, 255, 0).astype(np.uint8)
+
+
+def _log_polar_spectrum(img, window):
+    """창 함수 적용 후 진폭 스펙트럼의 로그-극좌표 변환 (이동 불변)"""
+    spectrum = np.fft.fftshift(np.abs(np.fft.fft2(img * window)))
+    spectrum = np.log1p(spectrum).astype(np.float32)
+    h, w = spectrum.shape
+    max_radius = min(h, w) / 2
+    log_polar = cv2.warpPolar(spectrum, (w, h), (w / 2, h / 2), max_radius,
+                              cv2.INTER_LINEAR + cv2.WARP_POLAR_LOG)
+    return log_polar, max_radius
+
+
+def estimate_similarity(moving_char, fixed_char, max_rotation=90.0, blur_sigma=1.5):
+    """Fourier-Mellin 정합: moving 글자를 fixed 글자에 맞추는 회전/크기/이동 추정
+
+    진폭 스펙트럼의 로그-극좌표 상관으로 회전과 크기를 구하고,
+    회전·크기를 보정한 뒤 위상 상관으로 이동을 구한다.
+    스펙트럼은 180° 주기이므로 θ와 θ+180° 중 max_rotation 이내인 후보만 보고,
+    둘 다 해당하면 이동 상관 응답이 큰 쪽을 선택한다.
+
+    Returns:
+        {'angle', 'scale', 'dx', 'dy', 'confidence', 'matrix'} -
+        matrix는 moving 좌표 → fixed 좌표 2x3 아핀 행렬 (한 번의 warpAffine용)
+    """
+    shape = (max(moving_char.shape[0], fixed_char.shape[0]),
+             max(moving_char.shape[1], fixed_char.shape[1]))
+    h, w = shape
+
+    moving = _prepare_for_correlation(moving_char, shape, blur_sigma)
+    fixed = _prepare_for_correlation(fixed_char, shape, blur_sigma)
+    window = cv2.createHanningWindow((w, h), cv2.CV_32F)
+
+    # 1. 회전/크기: 로그-극좌표 스펙트럼의 위상 상관
+    lp_moving, max_radius = _log_polar_spectrum(moving, window)
+    lp_fixed, _ = _log_polar_spectrum(fixed, window)
+    (shift_rho, shift_theta), _ = cv2.phaseCorrelate(lp_moving, lp_fixed)
+
+    base_angle = -shift_theta * 360.0 / h
+    scale = float(np.exp(-shift_rho * np.log(max_radius) / w))
+
+    # 2. 180° 모호성 해소 + 이동 추정
+    center = (w / 2, h / 2)
+    best = None
+    candidates = [(a + 180.0) % 360.0 - 180.0 for a in (base_angle, base_angle + 180.0)]
+    candidates = [a for a in candidates if abs(a) <= max_rotation] or candidates
+    for angle in candidates:
+        M_rs = cv2.getRotationMatrix2D(center, angle, scale)
+        rotated = cv2.warpAffine(moving, M_rs, (w, h), flags=cv2.INTER_LINEAR)
+        (dx, dy), response = cv2.phaseCorrelate(rotated, fixed, window)
+        if best is None or response > best[0]:
+            best = (response, angle, M_rs, dx, dy)
+
+    response, angle, M_rs, dx, dy = best
+
+    # 이동을 회전/크기 행렬에 합성 → 단일 행렬
+    matrix = M_rs.copy()
+    matrix[0, 2] += dx
+    matrix[1, 2] += dy
+
+    return {
+        'angle': angle,
+        'scale': scale,
+        'dx': float(matrix[0, 2]),
+        'dy': float(matrix[1, 2]),
+        'confidence': response,
+        'matrix': matrix.astype(np.float32)
+    }
+
+
+def normalized_cross_correlation(moving_char, fixed_char, max_shift=None, max_shift_ratio=0.1):
+    """제한된 이동 범위에서의 FFT 정규화 상호상관 (ZNCC)
+
+    평균/분산은 h×w 프레임(fixed 위치) 안에서 계산 - 이동마다 프레임 안에 남은
+    moving 잉크 양도 FFT로 함께 구하므로 모든 이동의 ZNCC를 정확히 계산하고,
+    FFT 여백 크기와 무관 (이동 0에서 cv2.matchTemplate TM_CCOEFF_NORMED와 같음)
+
+    Returns:
+        {'score': 최대 상관계수 (-1 ~ 1), 'dx', 'dy': moving을 fixed에 맞추는 이동 (픽셀)}
+    """
+    h = max(moving_char.shape[0], fixed_char.shape[0])
+    w = max(moving_char.shape[1], fixed_char.shape[1])
+    if max_shift is None:
+        max_shift = int(round(max_shift_ratio * max(h, w)))
+
+    shape = (cv2.getOptimalDFTSize(h + 2 * max_shift), cv2.getOptimalDFTSize(w + 2 * max_shift))
+    a = np.zeros(shape, dtype=np.float64)
+    b = np.zeros(shape, dtype=np.float64)
+    frame = np.zeros(shape, dtype=np.float64)
+    a[max_shift:max_shift + fixed_char.shape[0], max_shift:max_shift + fixed_char.shape[1]] = fixed_char > 0
+    b[max_shift:max_shift + moving_char.shape[0], max_shift:max_shift + moving_char.shape[1]] = moving_char > 0
+    frame[max_shift:max_shift + h, max_shift:max_shift + w] = 1
+
+    n = h * w
+    sa = a.sum()
+    if sa == 0 or sa == n or b.sum() == 0:
+        return {'score': 0.0, 'dx': 0, 'dy': 0}
+
+    # corr[s] = Σ a(x) b(x - s) → moving을 s만큼 옮겼을 때의 겹침
+    # sb[s]   = Σ frame(x) b(x - s) → 그때 프레임 안에 있는 moving 잉크 (이진 마스크: 제곱합 = 합)
+    fb = np.conj(np.fft.rfft2(b))
+    corr = np.fft.irfft2(np.fft.rfft2(a) * fb, s=shape)
+    sb = np.fft.irfft2(np.fft.rfft2(frame) * fb, s=shape)
+    sb = np.clip(np.rint(sb), 0, n)  # 정수 개수 (FFT 반올림 오차 제거)
+
+    variance = (sa - sa * sa / n) * (sb - sb * sb / n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ncc = np.where(variance > 0, (corr - sa * sb / n) / np.sqrt(variance), 0.0)
+
+    # 이동 범위 [-max_shift, max_shift]만 탐색 (음수 이동은 끝에서 감싸짐)
+    offsets = np.arange(-max_shift, max_shift + 1)
+    window = ncc[np.ix_(offsets % shape[0], offsets % shape[1])]
+    iy, ix = np.unravel_index(np.argmax(window), window.shape)
+
+    return {
+        'score': float(window[iy, ix]),
+        'dx': int(offsets[ix]),
+        'dy': int(offsets[iy])
+    }
@@ -2,13 +2,21 @@
 """
 한글 서예 교본 이미지 처리 및 비교
 교본과 작성본이 나란히 있는 이미지를 분리하여 비교
+- 배치 처리: 프로세스 풀, 결과를 JSONL로 즉시 기록, 재실행 시 완료된 이미지 건너뜀
+- 고해상도 스캔은 띠 단위로 칸을 검출하고 필요한 칸만 읽음 (메모리 상한 유지)
 """
 
 import cv2
 import numpy as np
 from char_comparison import CharacterComparator
+from grid_layout import detect_grid_cells, crop_cells, pair_cells_by_row
+from tiled_page import PageSource, detect_grid_cells_tiled, read_cells, page_pixels
+from quality_gate import check_quality, QualityGateError
 import os
 import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 def split_workbook_image(image_path):
@@ -26,6 +34,22 @@ def split_workbook_image(image_path):
     if img is None:
         raise ValueError(f"이미지를 로드할 수 없습니다: {image_path}")
     
+    return split_workbook_array(img)
+
+
+def split_workbook_array(img):
+    """이미 로드된 교본 이미지를 (교본, 작성본) 크롭으로 분리
+    
+    안내선으로 칸을 찾으면 첫 행의 첫 두 칸을, 못 찾으면 좌우 절반을 사용
+    """
+    pairs = split_workbook_page(img)
+    if pairs:
+        return pairs[0]['ref'], pairs[0]['user']
+    return split_workbook_halves(img)
+
+
+def split_workbook_halves(img):
+    """칸 검출 없이 좌우 절반을 (교본, 작성본)으로 분리 (안내선을 못 찾았을 때의 기존 방식)"""
     h, w = img.shape[:2]
     
     # 이미지를 반으로 나누기 (왼쪽: 교본, 오른쪽: 작성본)
@@ -44,6 +68,70 @@ def split_workbook_image(image_path):
     return left_cropped, right_cropped
 
 
+def split_workbook_page(img):
+    """
+    페이지의 모든 칸을 검출해 (교본, 작성본) 쌍으로 분리
+    
+    행마다 첫 칸을 교본, 나머지 칸을 그 교본의 작성본으로 봄
+    
+    Returns:
+        [{'row', 'col', 'ref', 'user'}] - 칸을 찾지 못하면 빈 리스트
+    """
+    cells = detect_grid_cells(img)
+    pairs = []
+    for ref_cell, user_cells in pair_cells_by_row(cells):
+        ref_crop = crop_character_area(crop_cells(img, [ref_cell])[0])
+        for user_cell, user_crop in zip(user_cells, crop_cells(img, user_cells)):
+            pairs.append({
+                'row': user_cell['row'],
+                'col': user_cell['col'],
+                'ref': ref_crop,
+                'user': crop_character_area(user_crop)
+            })
+    return pairs
+
+
+# 이보다 큰 페이지는 타일 모드로 처리 (픽셀 수)
+TILED_PAGE_PIXELS = 30_000_000
+
+
+def split_workbook_page_tiled(image_path, fallback_halves=False):
+    """
+    고해상도 페이지를 띠 단위로 처리해 (교본, 작성본) 쌍으로 분리
+    
+    페이지 전체를 BGR/HSV로 올리지 않고 칸 크롭만 원본 해상도로 읽음
+    (비압축 TIFF/BMP는 메모리 맵)
+    
+    Args:
+        fallback_halves: 칸을 찾지 못하면 같은 PageSource에서 좌우 절반을 하나씩 읽어
+                         한 쌍으로 사용 (다시 디코딩/검출하지 않음)
+    
+    Returns:
+        [{'row', 'col', 'ref', 'user'}] - 칸을 찾지 못하면 빈 리스트 (fallback_halves면 한 쌍)
+    """
+    source = PageSource(image_path)
+    cells = detect_grid_cells_tiled(source)
+    if not cells and fallback_halves:
+        h, w = source.shape
+        mid_x = w // 2
+        # 크롭만 남기고 절반 영역은 바로 해제
+        ref_crop = crop_character_area(source.read(0, h, 0, mid_x)).copy()
+        user_crop = crop_character_area(source.read(0, h, mid_x, w)).copy()
+        return [{'row': 0, 'col': 1, 'ref': ref_crop, 'user': user_crop}]
+    
+    pairs = []
+    for ref_cell, user_cells in pair_cells_by_row(cells):
+        ref_crop = crop_character_area(read_cells(source, [ref_cell])[0])
+        for user_cell, user_crop in zip(user_cells, read_cells(source, user_cells)):
+            pairs.append({
+                'row': user_cell['row'],
+                'col': user_cell['col'],
+                'ref': ref_crop,
+                'user': crop_character_area(user_crop)
+            })
+    return pairs
+
+
 def crop_character_area(img):
     """
     이미지에서 글자 영역만 자동으로 크롭
@@ -80,6 +168,9 @@ def crop_character_area(img):
         x_max = max(x_max, x + w)
         y_max = max(y_max, y + h)
     
+    if x_max <= x_min or y_max <= y_min:
+        return img  # 잡티뿐인 빈 칸 - 자르지 않음 (품질 검사에서 거부)
+    
     # 여백 추가 (글자가 잘리지 않도록)
     margin = 20
     x_min = max(0, x_min - margin)
@@ -175,6 +266,219 @@ def process_workbook_images(image_paths, output_dir="workbook_output"):
         print(f"\n💾 결과 저장: {result_file}")
 
 
+# 워커 프로세스마다 하나씩 재사용
+_worker_comparator = None
+
+
+def _to_builtin(value):
+    """numpy 스칼라를 JSON 직렬화 가능한 파이썬 값으로"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def process_single_workbook(image_path, visual_dir=None):
+    """이미지 한 장 처리 (워커 프로세스에서 실행) - 단계별 소요 시간 포함 기록 반환"""
+    global _worker_comparator
+    if _worker_comparator is None:
+        _worker_comparator = CharacterComparator()
+    
+    record = {'image': image_path, 'pid': os.getpid(), 'timings': {}}
+    timings = record['timings']
+    try:
+        if page_pixels(image_path) > TILED_PAGE_PIXELS:
+            # 고해상도 스캔: 띠 단위 검출 + 칸만 읽기 (로드와 분리가 한 단계)
+            # 칸을 못 찾아도 전체를 다시 디코딩하지 않고 같은 소스에서 좌우 절반 사용
+            start = time.perf_counter()
+            pairs = split_workbook_page_tiled(image_path, fallback_halves=True)
+            timings['tiled_split'] = time.perf_counter() - start
+            record['tiled'] = True
+        else:
+            start = time.perf_counter()
+            img = cv2.imread(image_path)
+            if img is None:
+                raise ValueError(f"이미지를 로드할 수 없습니다: {image_path}")
+            timings['load'] = time.perf_counter() - start
+            
+            # 페이지의 모든 칸 (칸을 못 찾으면 좌우 절반 한 쌍)
+            start = time.perf_counter()
+            pairs = split_workbook_page(img)
+            if not pairs:
+                ref_img, user_img = split_workbook_halves(img)
+                pairs = [{'row': 0, 'col': 1, 'ref': ref_img, 'user': user_img}]
+            timings['split'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        cells = []
+        for pair in pairs:
+            ref_gray = cv2.cvtColor(pair['ref'], cv2.COLOR_BGR2GRAY)
+            user_gray = cv2.cvtColor(pair['user'], cv2.COLOR_BGR2GRAY)
+            cell = {'row': pair['row'], 'col': pair['col']}
+            # 빈 칸/흐린 칸은 무거운 비교 전에 거부
+            try:
+                role = 'reference'
+                check_quality(ref_gray)
+                role = 'user'
+                check_quality(user_gray)
+            except QualityGateError as e:
+                cell['status'] = 'rejected'
+                cell['quality'] = {**e.to_dict(), 'image': role}
+                cells.append(cell)
+                continue
+            
+            output_dir = None
+            if visual_dir is not None:
+                output_dir = os.path.join(visual_dir, f"{stem}_r{pair['row']}c{pair['col']}")
+            scores = _worker_comparator.compare_images(ref_gray, user_gray, output_dir)
+            cell['status'] = 'ok'
+            cell['scores'] = {k: _to_builtin(v) for k, v in scores.items()}
+            cells.append(cell)
+        timings['compare'] = time.perf_counter() - start
+        
+        scored = [c for c in cells if c['status'] == 'ok']
+        record['rejected_cells'] = len(cells) - len(scored)
+        record['cells'] = cells
+        if scored:
+            record['status'] = 'ok'
+            record['scores'] = scored[0]['scores']  # 첫 칸 (칸이 하나인 기존 교본 형식)
+        else:
+            record['status'] = 'rejected'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    
+    return record
+
+
+def load_checkpoint(results_path):
+    """기존 JSONL 결과에서 끝난 이미지 경로 집합 - 성공 또는 품질 미달 (중간에 끊긴 마지막 줄은 무시)"""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    
+    with open(results_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('status') in ('ok', 'rejected'):
+                done.add(record['image'])
+    return done
+
+
+def trim_partial_line(results_path):
+    """JSONL 끝의 끊긴 줄(마지막 '\n' 뒤)을 잘라냄 - 이어 쓴 첫 기록이 그 줄에 붙지 않도록
+
+    Returns:
+        잘라낸 바이트 수
+    """
+    if not os.path.exists(results_path):
+        return 0
+    with open(results_path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        # 끝에서부터 블록 단위로 마지막 줄바꿈 찾기
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            end = start
+        else:
+            keep = 0
+        if keep < size:
+            f.truncate(keep)
+        return size - keep
+
+
+def summarize_timings(records):
+    """단계별 소요 시간 통계 {단계: {'total', 'mean', 'max'}} (초)"""
+    stages = {}
+    for record in records:
+        for stage, seconds in record['timings'].items():
+            stages.setdefault(stage, []).append(seconds)
+    return {stage: {'total': sum(values),
+                    'mean': sum(values) / len(values),
+                    'max': max(values)}
+            for stage, values in stages.items()}
+
+
+def process_workbook_batch(image_paths, results_path="workbook_output/results.jsonl",
+                           max_workers=None, resume=True, visual_dir=None):
+    """
+    여러 교본 이미지를 프로세스 풀로 처리
+    
+    - 이미지 하나가 끝날 때마다 결과를 JSONL 한 줄로 기록하고 flush
+      (이 파일이 체크포인트 - 중간에 멈춰도 완료된 결과는 남음)
+    - resume=True면 이미 성공한 이미지는 건너뜀 (실패한 이미지는 다시 시도)
+    
+    Args:
+        image_paths: 이미지 경로 리스트
+        results_path: 결과 JSONL 경로
+        max_workers: 프로세스 수 (None이면 CPU 수)
+        visual_dir: 지정하면 이미지별 시각화 결과 저장
+    
+    Returns:
+        dict: 처리/건너뜀/실패 수, 소요 시간, 처리량(장/초), 단계별 시간
+    """
+    os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+    
+    if resume:
+        # 중단으로 끊긴 마지막 줄은 체크포인트를 읽기 전에 버림 (그 이미지는 다시 처리)
+        trim_partial_line(results_path)
+    done = load_checkpoint(results_path) if resume else set()
+    unique_paths = list(dict.fromkeys(image_paths))  # 중복 경로는 한 번만 (건너뜀 수에도 넣지 않음)
+    pending = [p for p in unique_paths if p not in done]
+    skipped = len(unique_paths) - len(pending)
+    
+    records = []
+    start = time.perf_counter()
+    mode = 'a' if resume else 'w'
+    with open(results_path, mode, encoding='utf-8') as out:
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(process_single_workbook, path, visual_dir): path
+                           for path in pending}
+                for future in as_completed(futures):
+                    record = future.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    out.flush()
+                    records.append(record)
+                    
+                    mark = {'ok': '✅', 'rejected': '⚠️'}.get(record['status'], '❌')
+                    print(f"{mark} [{len(records)}/{len(pending)}] {os.path.basename(record['image'])}")
+    elapsed = time.perf_counter() - start
+    
+    succeeded = [r for r in records if r['status'] == 'ok']
+    rejected = [r for r in records if r['status'] == 'rejected']
+    summary = {
+        'processed': len(succeeded),
+        'rejected': len(rejected),
+        'failed': len(records) - len(succeeded) - len(rejected),
+        'rejected_cells': sum(r.get('rejected_cells', 0) for r in records),
+        'skipped': skipped,
+        'elapsed': elapsed,
+        'throughput': len(records) / elapsed if elapsed > 0 else 0.0,
+        'stage_timings': summarize_timings(records)
+    }
+    
+    print(f"\n{'='*60}")
+    print(f"📊 처리 {summary['processed']}장, 거부 {summary['rejected']}장, "
+          f"실패 {summary['failed']}장, 건너뜀 {skipped}장 (품질 미달 칸 {summary['rejected_cells']}개)")
+    print(f"⏱  {elapsed:.1f}초, {summary['throughput']:.2f}장/초")
+    for stage, stats in summary['stage_timings'].items():
+        print(f"   {stage:8s} 평균 {stats['mean']*1000:8.1f}ms  최대 {stats['max']*1000:8.1f}ms")
+    
+    return summary
+
+
 def main():
     """메인 실행 함수"""
     # Downloads 폴더의 이미지들
@@ -185,6 +489,10 @@ def main():
         "/Users/m4_macbook/Downloads/IMG_2275.png"
     ]
     
+    # 명령행 인자로 이미지 경로를 주면 그것을 사용
+    if len(sys.argv) > 1:
+        image_files = sys.argv[1:]
+    
     # 존재하는 파일만 필터링
     existing_files = [f for f in image_files if os.path.exists(f)]
     
@@ -194,8 +502,8 @@ def main():
     
     print(f"🎯 {len(existing_files)}개의 이미지를 처리합니다.")
     
-    # 처리 실행
-    process_workbook_images(existing_files)
+    # 처리 실행 (프로세스 풀 + JSONL 체크포인트)
+    process_workbook_batch(existing_files)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+밴드 제한 동적 시간 정합 (Sakoe-Chiba banded DTW)
+- 두께, 방향, 속도 같은 1차원 프로파일을 시작 위치/속도 차이에 관계없이 정합
+- 행마다 누적 최소(cumulative-min)로 벡터화: 비용은 길이 × 밴드 폭에 비례
+- 밴드 영역만 저장하여 메모리도 길이 × 밴드 폭
+"""
+
+import numpy as np
+
+
+def _local_cost(x_value, y_values, metric):
+    """한 점과 여러 점 사이의 국소 비용"""
+    d = np.abs(y_values - x_value)
+    if metric == 'angle':
+        # 각도 (도) - 360° 주기
+        d = d % 360
+        d = np.minimum(d, 360 - d)
+    return d
+
+
+def banded_dtw(x, y, band=None, band_ratio=0.1, metric='abs'):
+    """두 1차원 프로파일의 밴드 제한 DTW
+
+    Args:
+        x: 기준(교본) 프로파일, 길이 n
+        y: 비교(작성본) 프로파일, 길이 m
+        band: 대각선 주변 밴드 반경 (None이면 band_ratio × max(n, m))
+        metric: 'abs' (절대 차이) 또는 'angle' (도 단위 원형 차이)
+
+    Returns:
+        {'distance': 누적 비용, 'normalized_distance': 경로 평균 비용,
+         'path': (L, 2) 정합 인덱스 쌍 (x 인덱스, y 인덱스)}
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, m = len(x), len(y)
+    if n == 0 or m == 0:
+        raise ValueError("빈 프로파일은 정합할 수 없습니다.")
+
+    if band is None:
+        band = int(np.ceil(band_ratio * max(n, m)))
+    # 행 사이 밴드가 끊기지 않도록 기울기만큼은 최소 보장
+    band = max(int(band), int(np.ceil(m / n)), 1)
+
+    # 행 i(1..n)의 밴드 범위 [lo, hi] (1-based j)
+    lows = np.zeros(n + 1, dtype=np.int64)
+    highs = np.zeros(n + 1, dtype=np.int64)
+    rows = [np.array([0.0])]  # 행 0: D[0, 0] = 0
+
+    for i in range(1, n + 1):
+        center = int(round(i * m / n))
+        lo = max(1, center - band)
+        hi = min(m, center + band)
+        lows[i], highs[i] = lo, hi
+        js = np.arange(lo, hi + 1)
+
+        # 이전 행에서 대각/수직 이동 비용 a[j] = min(D[i-1, j-1], D[i-1, j])
+        prev = rows[i - 1]
+        p_lo, p_hi = lows[i - 1], highs[i - 1]
+        a = np.full(len(js), np.inf)
+        for shift in (1, 0):
+            idx = js - shift - p_lo
+            valid = (idx >= 0) & (idx <= p_hi - p_lo)
+            a[valid] = np.minimum(a[valid], prev[idx[valid]])
+
+        # 같은 행 수평 이동: D[j] = c[j] + min(a[j], D[j-1])
+        # → D[j] = S[j] + min_{k<=j}(a[k] - S[k-1]),  S = cumsum(c)
+        c = _local_cost(x[i - 1], y[js - 1], metric)
+        s = np.cumsum(c)
+        rows.append(s + np.minimum.accumulate(a - (s - c)))
+
+    def cell(i, j):
+        if i < 0 or j < 0:
+            return np.inf
+        if i == 0:
+            return 0.0 if j == 0 else np.inf
+        if j < lows[i] or j > highs[i]:
+            return np.inf
+        return rows[i][j - lows[i]]
+
+    distance = cell(n, m)
+    if not np.isfinite(distance):
+        raise ValueError("밴드가 너무 좁아 끝점에 도달할 수 없습니다.")
+
+    # 역추적
+    path = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        candidates = ((cell(i - 1, j - 1), i - 1, j - 1),
+                      (cell(i - 1, j), i - 1, j),
+                      (cell(i, j - 1), i, j - 1))
+        _, i, j = min(candidates, key=lambda t: t[0])
+    path = np.array(path[::-1], dtype=np.int64)
+
+    return {
+        'distance': float(distance),
+        'normalized_distance': float(distance / len(path)),
+        'path': path
+    }
+
+
+def segment_differences(x, y, path, num_segments=5, metric='abs'):
+    """정합 경로를 기준 프로파일 구간별로 나누어 평균 차이 계산
+
+    Returns:
+        [{'segment', 'start', 'end', 'mean_diff', 'mean_abs_diff'}] -
+        mean_diff는 (y - x) 부호 있는 평균 (작성본이 더 크면 양수)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    xi, yi = path[:, 0], path[:, 1]
+
+    diff = y[yi] - x[xi]
+    if metric == 'angle':
+        diff = (diff + 180) % 360 - 180
+
+    # 기준 인덱스로 구간 나누기
+    edges = np.linspace(0, len(x), num_segments + 1)
+    seg_ids = np.clip(np.searchsorted(edges, xi, side='right') - 1, 0, num_segments - 1)
+
+    segments = []
+    for s in range(num_segments):
+        in_seg = seg_ids == s
+        if not in_seg.any():
+            continue
+        segments.append({
+            'segment': s + 1,
+            'start': int(np.ceil(edges[s])),
+            'end': int(np.ceil(edges[s + 1])) - 1,
+            'mean_diff': float(diff[in_seg].mean()),
+            'mean_abs_diff': float(np.abs(diff[in_seg]).mean())
+        })
+
+    return segments
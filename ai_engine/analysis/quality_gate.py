@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+분석 전 이미지 품질 검사 (빈 이미지/흐림/잘못된 크롭 조기 거부)
+- 긴 변 128픽셀로 줄인 이미지에서 몇 ms 안에 계산
+- 잉크 비율, 라플라시안 분산(흐림), 가장자리 잉크(잘린 획/어두운 배경), 글자 영역 크기
+- 칸 테두리/안내선 같은 가늘고 긴 직선은 잉크 비율, 가장자리, 글자 영역 측정에서 제외
+  (칸에 맞춰 자른 사진은 통과, 선만 있는 빈 칸은 거부)
+- 통과하지 못하면 QualityGateError (사유 코드 + 측정값) → 무거운 분석 생략
+- 검사/거부 횟수는 프로세스 단위 카운터로 집계
+"""
+
+import threading
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from grid_layout import extract_line_masks
+from stage_timing import stage
+
+
+GATE_SIZE = 128
+
+# 글자 잉크에서 뺄 직선: 한 변의 절반 이상 길이, 이 두께(GATE_SIZE 기준 픽셀) 이하
+FRAME_LINE_MIN_LENGTH = 0.5
+FRAME_LINE_MAX_THICKNESS = 4
+
+# 기본 기준값 (긴 변 GATE_SIZE 기준으로 측정)
+DEFAULT_THRESHOLDS = {
+    'min_contrast': 20.0,      # 축소 이미지의 밝기 최대 - 최소 - 이보다 작으면 빈 이미지
+    'min_ink_ratio': 0.005,    # 잉크 픽셀 비율
+    'max_ink_ratio': 0.6,
+    'min_sharpness': 1000.0,   # 획 경계의 라플라시안 제곱 평균 (대비 정규화)
+    'max_edge_coverage': 0.6,  # 한 변을 잉크가 덮는 비율 (직선 테두리 제외 - 잘린 획/어두운 배경)
+    'min_bbox_ratio': 0.15     # 글자 영역 긴 변 / 이미지 긴 변
+}
+
+REASON_MESSAGES = {
+    'blank': '빈 이미지입니다',
+    'too_little_ink': '글자가 거의 없습니다',
+    'too_much_ink': '잉크 영역이 너무 많습니다 (노출/크롭 확인)',
+    'blurry': '이미지가 흐립니다',
+    'border': '가장자리에 잘린 획이나 어두운 배경이 있습니다 (크롭 확인)',
+    'bbox': '글자 영역이 너무 작습니다'
+}
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+class QualityGateError(ValueError):
+    """품질 검사 불통과 - reasons(사유 코드 목록)와 metrics(측정값) 포함"""
+
+    def __init__(self, reasons, metrics):
+        self.reasons = list(reasons)
+        self.metrics = metrics
+        super().__init__(', '.join(REASON_MESSAGES[r] for r in self.reasons))
+
+    def to_dict(self):
+        return {
+            'error': 'quality_gate',
+            'reasons': self.reasons,
+            'messages': [REASON_MESSAGES[r] for r in self.reasons],
+            'metrics': self.metrics
+        }
+
+
+def _downsample(gray, size=GATE_SIZE):
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    scale = size / max(h, w)
+    if scale < 1:
+        gray = cv2.resize(gray, (max(1, round(w * scale)), max(1, round(h * scale))),
+                          interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _remove_frame_lines(ink):
+    """잉크 마스크에서 칸 테두리/안내선 같은 가늘고 긴 가로·세로 직선을 지움
+
+    조금 기울어진 선도 잡히도록 3×3 팽창 후 직선을 찾고, 찾은 선 주변 잉크를 제거
+    (굵은 획과 어두운 배경은 두께 조건으로 남음)
+    """
+    min_length = max(3, int(FRAME_LINE_MIN_LENGTH * min(ink.shape)))
+    widened = cv2.dilate(ink * 255, np.ones((3, 3), np.uint8))
+    horizontal, vertical = extract_line_masks(widened, min_length, FRAME_LINE_MAX_THICKNESS)
+    lines = cv2.dilate(horizontal | vertical, np.ones((3, 3), np.uint8))
+    return ink & (lines == 0)
+
+
+def measure_quality(img):
+    """품질 지표 계산 (흰 바탕 검은 글씨 기준)
+
+    Args:
+        img: 그레이스케일 또는 BGR 이미지
+
+    Returns:
+        {'contrast', 'ink_ratio', 'sharpness', 'edge_coverage', 'bbox_ratio'}
+    """
+    small = _downsample(img)
+    # INTER_AREA 축소가 잡음을 평균내므로 최소/최대로 대비 측정 (작은 글자도 놓치지 않음)
+    low, high = float(small.min()), float(small.max())
+    contrast = high - low
+    metrics = {'contrast': contrast, 'ink_ratio': 0.0, 'sharpness': 0.0,
+               'edge_coverage': 0.0, 'bbox_ratio': 0.0}
+    if contrast < 1:
+        return metrics
+
+    # 대비를 0~255로 늘린 뒤 측정 (노출과 무관)
+    stretched = ((small - low) * (255.0 / contrast)).astype(np.float32)
+    _, ink = cv2.threshold(stretched.astype(np.uint8), 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    # 흐림: 획 경계 띠에서의 라플라시안 제곱 평균 (획 양과 무관한 선명도)
+    boundary = cv2.morphologyEx(ink, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8)) > 0
+    if boundary.any():
+        laplacian = cv2.Laplacian(stretched, cv2.CV_32F)
+        metrics['sharpness'] = float(np.mean(laplacian[boundary] ** 2))
+
+    # 칸 테두리/안내선은 글자가 아니므로 잉크 비율, 가장자리, 글자 영역은 직선을 뺀 잉크로 측정
+    # (선만 있는 빈 칸은 too_little_ink, 테두리에 맞춰 자른 칸은 border가 아님)
+    character = _remove_frame_lines(ink)
+    metrics['ink_ratio'] = float(character.mean())
+    metrics['edge_coverage'] = float(max(character[0].mean(), character[-1].mean(),
+                                         character[:, 0].mean(), character[:, -1].mean()))
+
+    ys, xs = np.nonzero(character)
+    if len(ys):
+        # 잡티에 흔들리지 않도록 1~99 백분위 범위
+        y0, y1 = np.percentile(ys, (1, 99))
+        x0, x1 = np.percentile(xs, (1, 99))
+        metrics['bbox_ratio'] = float(max(y1 - y0 + 1, x1 - x0 + 1) / max(character.shape))
+    return metrics
+
+
+def evaluate(metrics, thresholds=None):
+    """측정값 → 불통과 사유 코드 목록 (빈 리스트면 통과)"""
+    t = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    if metrics['contrast'] < t['min_contrast']:
+        return ['blank']
+
+    reasons = []
+    if metrics['ink_ratio'] < t['min_ink_ratio']:
+        reasons.append('too_little_ink')
+    elif metrics['ink_ratio'] > t['max_ink_ratio']:
+        reasons.append('too_much_ink')
+    if metrics['sharpness'] < t['min_sharpness']:
+        reasons.append('blurry')
+    if metrics['edge_coverage'] > t['max_edge_coverage']:
+        reasons.append('border')
+    if metrics['ink_ratio'] > 0 and metrics['bbox_ratio'] < t['min_bbox_ratio']:
+        reasons.append('bbox')
+    return reasons
+
+
+def check_quality(img, thresholds=None):
+    """품질 검사 - 통과하면 측정값 반환, 아니면 QualityGateError
+
+    카운터: 'checked', 'passed', 'rejected', 'reason:<코드>'
+    """
+    with stage('quality_gate', img):
+        metrics = measure_quality(img)
+        reasons = evaluate(metrics, thresholds)
+
+    with _counters_lock:
+        _counters['checked'] += 1
+        if reasons:
+            _counters['rejected'] += 1
+            for reason in reasons:
+                _counters[f'reason:{reason}'] += 1
+        else:
+            _counters['passed'] += 1
+
+    if reasons:
+        raise QualityGateError(reasons, metrics)
+    return metrics
+
+
+def gate_counters():
+    """지금까지의 검사/거부 횟수 (이 프로세스 기준)"""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reset_gate_counters():
+    with _counters_lock:
+        _counters.clear()
+
+
+def _synthetic_cases(size=1024):
+    """검증용 합성 사진 {이름: (그레이스케일 이미지, 기대 사유 목록)}"""
+    from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+    strokes = IntegratedZhongAnalyzer().create_reference_zhong() < 128
+
+    def photo(frame=0, guides=False, angle=0.0, char_scale=0.7, dark_edge=0.0, blur=0.0):
+        img = np.full((size, size, 3), (235, 240, 245), dtype=np.uint8)  # 종이
+        red = (40, 40, 210)
+        if guides:
+            # 田자 점선 안내선
+            for t in range(0, size, 24):
+                cv2.line(img, (size // 2, t), (size // 2, t + 12), red, 3)
+                cv2.line(img, (t, size // 2), (t + 12, size // 2), red, 3)
+        if char_scale:
+            side = int(size * char_scale)
+            mask = cv2.resize(strokes.astype(np.uint8), (side, side)) > 0
+            o = (size - side) // 2
+            img[o:o + side, o:o + side][mask] = (30, 30, 30)
+        if frame:
+            # 칸에 맞춰 자른 사진: 빨간 테두리가 이미지 가장자리에 붙음
+            cv2.rectangle(img, (0, 0), (size - 1, size - 1), red, frame)
+        if dark_edge:
+            img[:, :int(size * dark_edge)] = 20  # 칸 밖 어두운 책상
+        if angle:
+            M = cv2.getRotationMatrix2D((size / 2, size / 2), angle, 1.0)
+            img = cv2.warpAffine(img, M, (size, size), borderValue=(235, 240, 245))
+        if blur:
+            img = cv2.GaussianBlur(img, (0, 0), blur)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    return {
+        'clean': (photo(), []),
+        'framed cell (tight crop)': (photo(frame=8), []),
+        'framed cell (thick frame)': (photo(frame=16), []),
+        'framed cell (tilted 1.5°)': (photo(frame=8, angle=1.5), []),
+        'framed cell with guide lines': (photo(frame=8, guides=True), []),
+        'empty framed cell': (photo(frame=8, char_scale=0), ['too_little_ink']),
+        'empty framed cell with guides': (photo(frame=8, guides=True, char_scale=0), ['too_little_ink']),
+        'framed tiny character': (photo(frame=8, char_scale=0.1), ['too_little_ink', 'bbox']),
+        'blank': (np.full((size, size), 240, dtype=np.uint8), ['blank']),
+        'blurry': (photo(blur=14), ['blurry']),
+        'dark table edge': (photo(dark_edge=0.15), ['border']),
+        'tiny character': (photo(char_scale=0.1), ['too_little_ink', 'bbox'])
+    }
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name, (img, expected) in _synthetic_cases().items():
+        metrics = measure_quality(img)
+        reasons = evaluate(metrics)
+        ok = reasons == expected
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {name:32s} 기대 {expected or '통과'} → {reasons or '통과'}  "
+              f"(가장자리 {metrics['edge_coverage']:.2f}, 잉크 {metrics['ink_ratio']:.3f}, "
+              f"선명도 {metrics['sharpness']:.0f})")
+    raise SystemExit(1 if failures else 0)
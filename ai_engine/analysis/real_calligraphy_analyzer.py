@@ -8,11 +8,9 @@
 
 import cv2
 import numpy as np
-from PIL import Image
-import pillow_heif
 from scipy import ndimage
 from scipy.signal import find_peaks
-from skimage.morphology import skeletonize, thin, medial_axis
+from skeleton_backend import medial_axis_transform
 from skimage.measure import label, regionprops
 from skimage.filters import gaussian
 import matplotlib.pyplot as plt
@@ -20,11 +18,11 @@ import matplotlib.patches as patches
 from matplotlib.patches import FancyArrowPatch, Circle
 from matplotlib import font_manager
 import warnings
+from stroke_correspondence import match_strokes
+from profile_dtw import banded_dtw, segment_differences
+from image_loader import load_image
 warnings.filterwarnings('ignore')
 
-# HEIC 지원 등록
-pillow_heif.register_heif_opener()
-
 # 한글 폰트 설정
 plt.rcParams['font.family'] = 'AppleGothic'
 plt.rcParams['axes.unicode_minus'] = False
@@ -41,35 +39,21 @@ class RealCalligraphyAnalyzer:
             ]
         }
     
-    def load_and_preprocess(self, image_path):
-        """이미지 로드 및 전처리"""
-        # HEIC 형식 처리
-        if image_path.lower().endswith('.heic'):
-            img = Image.open(image_path)
-            img_array = np.array(img)
-        else:
-            img_array = cv2.imread(image_path)
-            if img_array is None:
-                raise ValueError(f"이미지를 로드할 수 없습니다: {image_path}")
-        
-        # 그레이스케일 변환
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
-        
-        return gray
+    def load_and_preprocess(self, image_path, target_size=None):
+        """이미지 로드 및 전처리 (HEIC 포함)
+
+        target_size: 분석에 필요한 긴 변 픽셀 수 - 주면 JPEG/HEIC/PNG를
+        1/2, 1/4, 1/8 축소 디코딩 (휴대폰 원본 사진의 디코딩 시간/메모리 절약)
+        """
+        return load_image(image_path, target_size=target_size, grayscale=True)
     
     def extract_brush_trajectory(self, img):
         """붓 움직임 궤적 추출"""
         # 이진화
         _, binary = cv2.threshold(img, 127, 255, cv2.THRESH_BINARY_INV)
         
-        # 스켈레톤 추출
-        skeleton = skeletonize(binary > 0)
-        
-        # 거리 변환으로 두께 정보 획득
-        dist_transform = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+        # 스켈레톤과 거리 변환(두께 정보)을 함께 계산
+        skeleton, dist_transform = medial_axis_transform(binary)
         
         # 스켈레톤 포인트들을 순서대로 연결
         skel_points = np.argwhere(skeleton)
@@ -93,8 +77,8 @@ class RealCalligraphyAnalyzer:
                 start_point = stroke_points[start_idx]
                 
                 # 최근접 이웃으로 순서 정렬
-                ordered_points = [start_point]
-                remaining = list(stroke_points)
+                ordered_points = [tuple(start_point)]
+                remaining = [tuple(p) for p in stroke_points]
                 remaining.remove(tuple(start_point))
                 
                 while remaining:
@@ -137,8 +121,14 @@ class RealCalligraphyAnalyzer:
         
         return trajectories
     
-    def compare_strokes(self, reference_img, user_img):
-        """교본과 작성본 획 비교"""
+    def compare_strokes(self, reference_img, user_img, num_points=32):
+        """교본과 작성본 획 비교
+        
+        라벨 순서가 아니라 획 기술자(위치, 방향, 길이, 형태) 비용의 최적 대응으로
+        짝을 지은 뒤, 호 길이 기준으로 재표본화한 두께/방향 프로파일을
+        밴드 제한 DTW로 정합하여 비교한다 (늦게 시작한 획도 전 구간 감점되지 않음).
+        대응되는 작성본 획이 없는 교본 획은 정확도 0의 'missing' 항목으로 포함된다.
+        """
         # 궤적 추출
         ref_trajectories = self.extract_brush_trajectory(reference_img)
         user_trajectories = self.extract_brush_trajectory(user_img)
@@ -146,46 +136,67 @@ class RealCalligraphyAnalyzer:
         if not ref_trajectories or not user_trajectories:
             return None
         
+        # 획 대응 (헝가리안 알고리즘)
+        char_size = np.hypot(*reference_img.shape[:2])
+        matching = match_strokes(ref_trajectories, user_trajectories, char_size, num_points)
+        
         comparisons = []
         
-        # 각 획별 비교
-        for i, (ref_traj, user_traj) in enumerate(zip(ref_trajectories, user_trajectories)):
-            # 길이 정규화
-            min_len = min(len(ref_traj), len(user_traj))
-            
-            # 두께 비교
-            ref_thickness = [p['thickness'] for p in ref_traj[:min_len]]
-            user_thickness = [p['thickness'] for p in user_traj[:min_len]]
-            
-            thickness_diff = np.mean(np.abs(np.array(ref_thickness) - np.array(user_thickness)))
+        # 대응된 획별 비교
+        for ref_idx, user_idx, match_cost, reversed_match in matching['pairs']:
+            ref_res = matching['ref'][ref_idx]
+            user_res = matching['user'][user_idx]
             
-            # 각도 비교
-            ref_angles = [p['angle'] for p in ref_traj[:min_len]]
-            user_angles = [p['angle'] for p in user_traj[:min_len]]
+            user_thickness = user_res['thickness']
+            user_angles = user_res['angle']
+            user_positions = user_res['positions']
+            if reversed_match:
+                # 반대 방향으로 그은 획은 순서와 진행 방향을 뒤집어 비교
+                user_thickness = user_thickness[::-1]
+                user_angles = user_angles[::-1] + 180
+                user_positions = user_positions[::-1]
             
-            angle_diff = np.mean(np.abs(np.array(ref_angles) - np.array(user_angles)))
+            # 두께 비교 (DTW 정합 후 평균 차이)
+            thickness_dtw = banded_dtw(ref_res['thickness'], user_thickness, band_ratio=0.2)
+            thickness_diff = thickness_dtw['normalized_distance']
             
-            # 위치 비교 (정규화 후)
-            ref_positions = np.array([p['position'] for p in ref_traj[:min_len]])
-            user_positions = np.array([p['position'] for p in user_traj[:min_len]])
+            # 각도 비교 (원형 차이, 0~180°)
+            angle_dtw = banded_dtw(ref_res['angle'], user_angles, band_ratio=0.2, metric='angle')
+            angle_diff = angle_dtw['normalized_distance']
             
-            # 중심 정렬
-            ref_center = ref_positions.mean(axis=0)
-            user_center = user_positions.mean(axis=0)
-            
-            ref_normalized = ref_positions - ref_center
-            user_normalized = user_positions - user_center
+            # 위치 비교 (중심 정렬 후)
+            ref_normalized = ref_res['positions'] - ref_res['positions'].mean(axis=0)
+            user_normalized = user_positions - user_positions.mean(axis=0)
             
             position_diff = np.mean(np.linalg.norm(ref_normalized - user_normalized, axis=1))
             
             comparisons.append({
-                'stroke_num': i + 1,
+                'stroke_num': ref_idx + 1,
+                'user_stroke_num': user_idx + 1,
+                'match_cost': match_cost,
                 'thickness_diff': thickness_diff,
                 'angle_diff': angle_diff,
                 'position_diff': position_diff,
+                'thickness_segments': segment_differences(ref_res['thickness'], user_thickness,
+                                                          thickness_dtw['path']),
                 'accuracy': max(0, 100 - thickness_diff * 5 - angle_diff * 0.5 - position_diff * 0.2)
             })
         
+        # 누락된 획
+        for ref_idx in matching['missing']:
+            comparisons.append({
+                'stroke_num': ref_idx + 1,
+                'user_stroke_num': None,
+                'missing': True,
+                'match_cost': np.nan,
+                'thickness_diff': np.nan,
+                'angle_diff': np.nan,
+                'position_diff': np.nan,
+                'accuracy': 0
+            })
+        
+        comparisons.sort(key=lambda c: c['stroke_num'])
+        
         return comparisons
     
     def visualize_brush_movement(self, img, trajectories, title="붓 움직임 분석"):
@@ -251,11 +262,11 @@ class RealCalligraphyAnalyzer:
         
         return fig
     
-    def analyze_complete(self, reference_path, user_path, output_dir):
+    def analyze_complete(self, reference_path, user_path, output_dir, target_size=None):
         """완전한 분석 수행"""
         # 이미지 로드
-        ref_img = self.load_and_preprocess(reference_path)
-        user_img = self.load_and_preprocess(user_path)
+        ref_img = self.load_and_preprocess(reference_path, target_size)
+        user_img = self.load_and_preprocess(user_path, target_size)
         
         # 궤적 추출
         ref_trajectories = self.extract_brush_trajectory(ref_img)
@@ -376,9 +387,9 @@ class RealCalligraphyAnalyzer:
             
             # 세부 점수
             details = f"\n획별 평균:\n"
-            details += f"두께 차이: {np.mean([c['thickness_diff'] for c in comparisons]):.1f}\n"
-            details += f"각도 차이: {np.mean([c['angle_diff'] for c in comparisons]):.1f}°\n"
-            details += f"위치 차이: {np.mean([c['position_diff'] for c in comparisons]):.1f}px"
+            details += f"두께 차이: {np.nanmean([c['thickness_diff'] for c in comparisons]):.1f}\n"
+            details += f"각도 차이: {np.nanmean([c['angle_diff'] for c in comparisons]):.1f}°\n"
+            details += f"위치 차이: {np.nanmean([c['position_diff'] for c in comparisons]):.1f}px"
             
             ax8.text(0.5, 0.1, details, fontsize=10,
                     ha='center', va='center',
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+교본 저장소 (ReferenceStore)
+- 정렬된 교본 마스크를 비트 압축(PackedMask)으로 캐시
+- 교본별 특징(면적, 무게중심)은 등록 시 한 번만 계산
+- 사용자 글자 하나를 전체 교본과 popcount로 빠르게 순위 매김
+- 교본 스켈레톤 거리 맵을 uint8(1/4 픽셀 단위, 최대 DISTANCE_CAP)로 캐시하여 챔퍼 점수는 좌표 조회로 계산
+- 교본 획 방향 히스토그램도 캐시 (사용자 쪽만 한 번 계산)
+"""
+
+import numpy as np
+
+from packed_mask import PackedMask, stack_packed, batch_intersections
+from multi_reference_scorer import compute_user_features, scores_from_counts, rank_results
+from chamfer_scoring import skeleton_of, skeleton_distance_map, chamfer_from_distances
+from orientation_histogram import orientation_histogram, orientation_score
+
+
+# 거리 맵 저장 단위 (1/4 픽셀)와 상한 - 챔퍼 점수는 3 × tolerance 이후 0점이므로
+# tolerance가 DISTANCE_CAP / 3 이하이면 점수는 잘림의 영향을 받지 않음
+DISTANCE_STEPS_PER_PIXEL = 4
+DISTANCE_CAP = 255 / DISTANCE_STEPS_PER_PIXEL
+
+
+def quantize_distances(distance_map):
+    """거리 맵 (float) → uint8 (1/4 픽셀 단위, DISTANCE_CAP에서 잘림)"""
+    steps = np.minimum(distance_map, DISTANCE_CAP) * DISTANCE_STEPS_PER_PIXEL
+    return np.rint(steps).astype(np.uint8)
+
+
+def dequantize_distances(steps):
+    return steps.astype(np.float32) / DISTANCE_STEPS_PER_PIXEL
+
+
+class ReferenceStore:
+    def __init__(self):
+        self.names = []
+        self.masks = []
+        self.features = []
+        self.shape = None
+        self._packed_stack = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, reference_char):
+        """교본 글자 마스크 (글자 > 0) 등록"""
+        mask = reference_char > 0
+        if self.shape is None:
+            self.shape = mask.shape
+        elif mask.shape != self.shape:
+            raise ValueError(f"교본 마스크 크기가 다릅니다: {mask.shape} != {self.shape}")
+
+        h, w = mask.shape
+        area = np.count_nonzero(mask)
+        if area > 0:
+            center = (mask.sum(axis=0) @ np.arange(w) / area,
+                      mask.sum(axis=1) @ np.arange(h) / area)
+        else:
+            center = (np.nan, np.nan)
+
+        self.names.append(name)
+        self.masks.append(PackedMask.from_mask(mask))
+        self.features.append({
+            'area': area,
+            'center': center,
+            'skeleton_distance': quantize_distances(skeleton_distance_map(mask)),
+            'orientation_hist': orientation_histogram(mask)
+        })
+        self._packed_stack = None
+
+    def get_mask(self, name):
+        """등록된 교본 마스크 복원 (uint8)"""
+        return self.masks[self.names.index(name)].to_mask()
+
+    @property
+    def nbytes(self):
+        """캐시된 압축 마스크와 거리 맵의 총 메모리 (바이트)"""
+        return (sum(mask.nbytes for mask in self.masks) +
+                sum(f['skeleton_distance'].nbytes for f in self.features))
+
+    def _check_query(self, user_char):
+        if not self.names:
+            raise ValueError("등록된 교본이 없습니다.")
+        if user_char.shape[:2] != self.shape:
+            raise ValueError(f"사용자 마스크 크기가 교본과 다릅니다: {user_char.shape[:2]} != {self.shape}")
+
+    def _stack(self):
+        if self._packed_stack is None:
+            self._packed_stack = stack_packed(self.masks)
+        return self._packed_stack
+
+    def score(self, user_char):
+        """전체 교본에 대한 항목별 점수 (길이 K 배열 딕셔너리)"""
+        self._check_query(user_char)
+
+        user_features = compute_user_features(user_char)
+        user_packed = PackedMask.from_mask(user_features['mask'])
+
+        intersections = batch_intersections(user_packed, self._stack())
+        ref_areas = np.array([f['area'] for f in self.features])
+        ref_centers = np.array([f['center'] for f in self.features]).T
+
+        return scores_from_counts(intersections, ref_areas, (ref_centers[0], ref_centers[1]),
+                                  user_features, self.shape)
+
+    def chamfer_scores(self, user_char, tolerance=3.0):
+        """전체 교본에 대한 챔퍼 점수 - 사용자 스켈레톤 좌표를 교본별 거리 맵에서 조회
+
+        거리는 DISTANCE_CAP에서 잘리므로 mean_distance도 그 이하
+
+        Returns:
+            교본 이름 → {'mean_distance', 'within_tolerance', 'score'}
+        """
+        self._check_query(user_char)
+
+        ys, xs = np.nonzero(skeleton_of(user_char))
+        return {name: chamfer_from_distances(dequantize_distances(f['skeleton_distance'][ys, xs]),
+                                             tolerance)
+                for name, f in zip(self.names, self.features)}
+
+    def orientation_scores(self, user_char):
+        """전체 교본에 대한 획 방향 분포 점수 (교본 이름 → 0~100)"""
+        if not self.names:
+            raise ValueError("등록된 교본이 없습니다.")
+        user_hist = orientation_histogram(user_char)
+        return {name: orientation_score(f['orientation_hist'], user_hist)
+                for name, f in zip(self.names, self.features)}
+
+    def rank(self, user_char):
+        """종합 점수 순위와 가장 가까운 교본"""
+        return rank_results(self.names, self.score(user_char))
@@ -12,6 +12,8 @@ import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import os
 import platform
+from chamfer_scoring import symmetric_chamfer_score
+import overlay_compositor as oc
 
 # 한글 폰트 설정
 def setup_korean_font():
@@ -65,25 +67,19 @@ def process_scaled_comparison():
     user_char = extract_character(user_img)
     guide_char = extract_character(guide_img)
     
-    # 글자 영역 찾기 (바운딩 박스)
-    user_bbox = find_character_bbox(user_char)
-    guide_bbox = find_character_bbox(guide_char)
+    # 크기/위치 탐색 (피라미드 + FFT 상호상관 + 챔퍼 비용)
+    transform = search_best_alignment(user_char, guide_char)
+    scale = transform['scale']
     
-    # 크기 조정 비율 계산
-    scale_x = guide_bbox[2] / user_bbox[2] if user_bbox[2] > 0 else 1
-    scale_y = guide_bbox[3] / user_bbox[3] if user_bbox[3] > 0 else 1
-    scale = min(scale_x, scale_y) * 0.9  # 90% 크기로 조정 (약간 여유)
+    print(f"📏 크기 조정 비율: {scale:.2f}배 "
+          f"(이동 {transform['tx']:.0f}, {transform['ty']:.0f}px, "
+          f"후보 {transform['evaluated']}개 평가)")
     
-    print(f"📏 크기 조정 비율: {scale:.2f}배")
-    
-    # 사용자 이미지 크기 조정
+    # 표시용 크기 조정 이미지
     scaled_user = scale_image(user_img, scale)
-    scaled_user_char = extract_character(scaled_user)
     
-    # 중심 정렬
-    user_center = find_center(scaled_user_char)
-    guide_center = find_center(guide_char)
-    aligned_user = align_by_center(scaled_user, user_center, guide_center, guide_img.shape[:2])
+    # 찾은 변환을 한 번의 warpAffine으로 적용
+    aligned_user = apply_alignment(user_img, transform, guide_img.shape[:2])
     aligned_user_char = extract_character(aligned_user)
     
     # 오버레이 생성
@@ -199,41 +195,210 @@ def align_by_center(img, img_center, target_center, target_shape):
     return aligned
 
 
-def create_overlays(guide_img, aligned_user, user_char, guide_char):
-    """오버레이 생성"""
+def _resize_mask(mask, factor):
+    """마스크 크기 조정 (축소는 INTER_AREA)"""
+    h, w = mask.shape[:2]
+    new_w = max(1, int(round(w * factor)))
+    new_h = max(1, int(round(h * factor)))
+    interpolation = cv2.INTER_AREA if factor < 1 else cv2.INTER_LINEAR
+    resized = cv2.resize(mask, (new_w, new_h), interpolation=interpolation)
+    return (resized > 127).astype(np.uint8) * 255
+
+
+def _evaluate_scale(user_crop, crop_origin, guide_mask, guide_fft, fft_shape, guide_dist, scale):
+    """주어진 크기에서 FFT 상호상관으로 최적 이동을 찾고 대칭 챔퍼 비용 계산"""
+    patch = _resize_mask(user_crop, scale)
+    ph, pw = patch.shape
+    fh, fw = fft_shape
+    gh, gw = guide_mask.shape
+    if ph >= fh or pw >= fw or not patch.any():
+        return None
+    
+    # 원형 상관의 겹침을 피하려고 (H+ph, W+pw)로 패딩된 FFT 사용
+    patch_fft = np.fft.rfft2(patch > 0, s=(fh, fw))
+    corr = np.fft.irfft2(guide_fft * np.conj(patch_fft), s=(fh, fw))
+    dy, dx = np.unravel_index(np.argmax(corr), corr.shape)
+    # 음수 이동은 배열 뒤쪽에 감겨 있음
+    if dy > fh - ph:
+        dy -= fh
+    if dx > fw - pw:
+        dx -= fw
+    
+    # 배치된 사용자 마스크
+    placed = np.zeros((gh, gw), dtype=np.uint8)
+    y0, x0 = max(dy, 0), max(dx, 0)
+    y1, x1 = min(dy + ph, gh), min(dx + pw, gw)
+    if y1 <= y0 or x1 <= x0:
+        return None
+    placed[y0:y1, x0:x1] = patch[y0 - dy:y1 - dy, x0 - dx:x1 - dx]
+    
+    # 대칭 챔퍼: 사용자→가이드, 가이드→사용자 평균 거리
+    user_pts = placed > 0
+    if not user_pts.any():
+        return None
+    user_dist = cv2.distanceTransform(cv2.bitwise_not(placed), cv2.DIST_L2, 3)
+    cost = (guide_dist[user_pts].mean() + user_dist[guide_mask > 0].mean()) / 2
+    # 잘려 나간 사용자 픽셀만큼 벌점
+    cost += (1 - np.count_nonzero(user_pts) / np.count_nonzero(patch)) * max(gh, gw)
+    
+    # 원본 좌표계 변환: x' = s*x + tx
+    tx = dx - scale * crop_origin[0]
+    ty = dy - scale * crop_origin[1]
+    return cost, tx, ty
+
+
+def search_best_alignment(user_char, guide_char, budget=24, scale_range=(0.3, 3.0),
+                          coarse_size=128):
+    """사용자 글자를 가이드에 맞추는 크기/이동을 coarse-to-fine으로 탐색
+    
+    Args:
+        user_char, guide_char: 글자 마스크 (글자 > 0)
+        budget: 평가할 (크기) 후보 총 개수 상한 - 남은 개수를 남은 피라미드 단계에 나누어 사용
+                (단계마다 가능하면 3개 이상, 다 쓰면 그 단계까지의 결과 사용)
+        scale_range: 탐색할 크기 비율의 최소/최대
+        coarse_size: 가장 거친 단계의 긴 변 크기 (픽셀)
+    
+    Returns:
+        {'scale', 'tx', 'ty', 'cost', 'matrix', 'evaluated'} - 
+        matrix는 사용자 좌표 → 가이드 좌표 2x3 아핀 행렬
+    """
+    gh, gw = guide_char.shape[:2]
+    
+    # 바운딩 박스 기반 초기 추정 (잡티가 있어도 탐색 범위 중심으로만 사용)
+    user_bbox = find_character_bbox(user_char)
+    guide_bbox = find_character_bbox(guide_char)
+    if user_bbox[2] > 0 and user_bbox[3] > 0:
+        s0 = min(guide_bbox[2] / user_bbox[2], guide_bbox[3] / user_bbox[3])
+    else:
+        s0 = 1.0
+    s0 = float(np.clip(s0, *scale_range))
+    lo = max(scale_range[0], s0 / 2)
+    hi = min(scale_range[1], s0 * 2)
+    
+    # 피라미드 단계 (거친 → 원본)
+    factors = []
+    factor = 1.0
+    while True:
+        factors.insert(0, factor)
+        if max(gh, gw) * factor <= coarse_size or len(factors) == 3:
+            break
+        factor /= 2
+    factors[0] = min(factors[0], coarse_size / max(gh, gw, 1))
+    
+    remaining = max(1, int(budget))
+    best = None
+    evaluated = 0
+    
+    for level, factor in enumerate(factors):
+        if remaining <= 0:
+            break
+        per_level = min(remaining, max(3, remaining // (len(factors) - level)))
+        if best is not None and per_level % 2 == 0:
+            per_level -= 1  # 홀수 개로 - 가운데(이전 단계 최적 크기)가 항상 후보에 포함
+        remaining -= per_level
+        
+        guide_small = _resize_mask(guide_char, factor) if factor < 1 else ((guide_char > 0) * 255).astype(np.uint8)
+        user_small = _resize_mask(user_char, factor) if factor < 1 else ((user_char > 0) * 255).astype(np.uint8)
+        
+        # 사용자 글자 영역만 잘라서 사용 (빈 배경 연산 제거)
+        ys, xs = np.nonzero(user_small)
+        if len(xs) == 0:
+            break
+        crop_origin = (xs.min(), ys.min())
+        user_crop = user_small[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+        
+        # 가이드 쪽 FFT와 거리 변환은 단계마다 한 번만
+        sh, sw = guide_small.shape
+        crop_h, crop_w = user_crop.shape
+        pad_h = sh + int(crop_h * hi) + 1
+        pad_w = sw + int(crop_w * hi) + 1
+        guide_fft = np.fft.rfft2(guide_small > 0, s=(pad_h, pad_w))
+        guide_dist = cv2.distanceTransform(cv2.bitwise_not(guide_small), cv2.DIST_L2, 3)
+        
+        if per_level > 1:
+            candidates = np.geomspace(lo, hi, per_level)
+        else:
+            candidates = [best[1] if best is not None else s0]
+        level_best = None
+        for scale in candidates:
+            evaluated += 1
+            result = _evaluate_scale(user_crop, crop_origin, guide_small,
+                                     guide_fft, (pad_h, pad_w), guide_dist, scale)
+            if result is None:
+                continue
+            cost, tx, ty = result
+            if level_best is None or cost < level_best[0]:
+                level_best = (cost / factor, scale, tx / factor, ty / factor)
+        
+        if level_best is None:
+            continue
+        best = level_best
+        
+        # 다음 단계는 최적 크기 주변 한 칸 범위만 탐색
+        ratio = (hi / lo) ** (1 / max(per_level - 1, 1))
+        lo = max(scale_range[0], best[1] / ratio)
+        hi = min(scale_range[1], best[1] * ratio)
+    
+    if best is None:
+        # 탐색 실패 시 바운딩 박스 추정 + 중심 정렬과 동일
+        user_center = find_center(user_char)
+        guide_center = find_center(guide_char)
+        best = (np.inf, s0,
+                guide_center[0] - s0 * user_center[0],
+                guide_center[1] - s0 * user_center[1])
+    
+    cost, scale, tx, ty = best
+    matrix = np.array([[scale, 0, tx],
+                       [0, scale, ty]], dtype=np.float32)
+    
+    return {
+        'scale': float(scale),
+        'tx': float(tx),
+        'ty': float(ty),
+        'cost': float(cost),
+        'matrix': matrix,
+        'evaluated': evaluated
+    }
+
+
+def apply_alignment(img, transform, target_shape):
+    """search_best_alignment 결과를 한 번의 warpAffine으로 적용"""
+    border = (255, 255, 255) if img.ndim == 3 else 255
+    return cv2.warpAffine(img, transform['matrix'], (target_shape[1], target_shape[0]),
+                          flags=cv2.INTER_LINEAR, borderValue=border)
+
+
+def create_overlays(guide_img, aligned_user, user_char, guide_char, encode_format=None):
+    """오버레이 생성 (코드 맵 한 번 + 종류별 색상표 렌더링)
+    
+    encode_format: 'png' 또는 'webp'이면 이미지 대신 인코딩된 바이트 반환
+    """
     overlays = {}
+    codes = oc.encode(guide_char, user_char)
     
     # 1. 기본 오버레이
-    basic = guide_img.copy()
-    mask = user_char > 0
-    color_overlay = np.zeros_like(basic)
-    color_overlay[:] = [255, 100, 100]
-    basic[mask] = cv2.addWeighted(basic[mask], 0.5, color_overlay[mask], 0.5, 0)
-    overlays['basic'] = basic
+    user_blend = oc.blend([255, 100, 100], 0.5)
+    overlays['basic'] = oc.render(codes, {oc.USER_ONLY: user_blend, oc.BOTH: user_blend}, guide_img)
     
     # 2. 투명 오버레이
-    transparent = cv2.addWeighted(guide_img, 0.5, aligned_user, 0.5, 0)
-    overlays['transparent'] = transparent
-    
-    # 3. 차이 분석
-    diff = np.ones_like(guide_img) * 255
+    overlays['transparent'] = cv2.addWeighted(guide_img, 0.5, aligned_user, 0.5, 0)
     
-    common = cv2.bitwise_and(guide_char, user_char)
-    diff[common > 0] = [200, 100, 200]  # 보라색
+    # 3. 차이 분석 (흰 바탕, 공통: 보라, 가이드만: 빨강, 사용자만: 파랑)
+    overlays['difference'] = oc.render(codes, {
+        oc.BOTH: oc.replace([200, 100, 200]),
+        oc.GUIDE_ONLY: oc.replace([100, 100, 255]),
+        oc.USER_ONLY: oc.replace([255, 100, 100])
+    })
     
-    guide_only = cv2.bitwise_and(guide_char, cv2.bitwise_not(user_char))
-    diff[guide_only > 0] = [100, 100, 255]  # 빨간색
-    
-    user_only = cv2.bitwise_and(user_char, cv2.bitwise_not(guide_char))
-    diff[user_only > 0] = [255, 100, 100]  # 파란색
-    
-    overlays['difference'] = diff
-    
-    return overlays
+    return oc.finalize(overlays, encode_format)
 
 
-def calculate_scores(user_char, guide_char):
-    """점수 계산"""
+def calculate_scores(user_char, guide_char, stroke_mode='chamfer', tolerance=3.0):
+    """점수 계산
+    
+    stroke_mode: 'chamfer' - 스켈레톤 거리 기반 (tolerance 픽셀 이내 어긋남 허용)
+                 'edge'    - Canny 엣지가 정확히 겹치는 비율 (기존 방식)
+    """
     scores = {}
     
     # 1. 겹침도 (IoU)
@@ -258,14 +423,17 @@ def calculate_scores(user_char, guide_char):
         scores['accuracy'] = 0
     
     # 4. 획 매칭
-    user_edges = cv2.Canny(user_char.astype(np.uint8), 50, 150)
-    guide_edges = cv2.Canny(guide_char.astype(np.uint8), 50, 150)
-    
-    edge_match = np.logical_and(user_edges > 0, guide_edges > 0)
-    if np.sum(guide_edges > 0) > 0:
-        scores['stroke_match'] = (np.sum(edge_match) / np.sum(guide_edges > 0)) * 100
+    if stroke_mode == 'chamfer':
+        scores['stroke_match'] = symmetric_chamfer_score(user_char, guide_char, tolerance)['score']
     else:
-        scores['stroke_match'] = 0
+        user_edges = cv2.Canny(user_char.astype(np.uint8), 50, 150)
+        guide_edges = cv2.Canny(guide_char.astype(np.uint8), 50, 150)
+        
+        edge_match = np.logical_and(user_edges > 0, guide_edges > 0)
+        if np.sum(guide_edges > 0) > 0:
+            scores['stroke_match'] = (np.sum(edge_match) / np.sum(guide_edges > 0)) * 100
+        else:
+            scores['stroke_match'] = 0
     
     # 최종 점수 (가중 평균)
     scores['final'] = (
@@ -13,8 +13,8 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from scipy import ndimage
-from skimage.morphology import skeletonize
 from skimage import measure
+from skeleton_backend import thin, available_backends
 import math
 import os
 import platform
@@ -51,16 +51,18 @@ class SkeletonAnalyzer:
         self.setup_korean_font = setup_korean_font
         
     def extract_skeleton(self, binary_img):
-        """스켈레톤 추출"""
-        # scikit-image의 skeletonize 사용
-        skeleton = skeletonize(binary_img > 0)
+        """스켈레톤 추출 (기본 세선화 백엔드 - skeleton_backend.get_backend())"""
+        skeleton = thin(binary_img)
         return skeleton.astype(np.uint8) * 255
     
     def extract_skeleton_cv2(self, binary_img):
-        """OpenCV를 사용한 스켈레톤 추출 (Zhang-Suen thinning)"""
-        # OpenCV의 thinning 알고리즘
-        skeleton = cv2.ximgproc.thinning(binary_img, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN)
-        return skeleton
+        """Zhang-Suen 세선화 스켈레톤 추출
+        
+        opencv-contrib(ximgproc)가 있으면 사용하고, 없으면 NumPy 구현으로 대체
+        """
+        backend = 'ximgproc' if 'ximgproc' in available_backends() else 'numpy'
+        skeleton = thin(binary_img, backend=backend)
+        return skeleton.astype(np.uint8) * 255
     
     def analyze_stroke_angles(self, skeleton):
         """스켈레톤에서 획의 기울기 분석"""
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+스켈레톤(세선화) 백엔드와 중심축 변환
+- medial_axis_transform: thin()과 cv2.distanceTransform 두 호출을 묶은 편의 함수
+  (한 번에 계산하는 융합 구현이 아님 - 호출부에서 반복하던 두 단계를 한곳에 모음)
+- 세선화 백엔드: scikit-image, OpenCV ximgproc (contrib 설치 시), 순수 NumPy Zhang-Suen
+- 백엔드마다 스켈레톤 픽셀이 조금씩 달라 점수도 달라지므로 기본값은 고정 (skimage)
+  다른 백엔드는 환경 변수 CALLIGRAPHY_SKELETON_BACKEND 또는 set_backend()로 명시적으로 선택
+- benchmark_backends(): 백엔드별 속도 비교 (선택에는 영향 없음)
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+from skimage.morphology import skeletonize
+
+from stage_timing import stage
+
+
+def _thin_skimage(binary):
+    return skeletonize(binary > 0)
+
+
+def _thin_ximgproc(binary):
+    img = np.where(binary > 0, 255, 0).astype(np.uint8)
+    return cv2.ximgproc.thinning(img, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN) > 0
+
+
+def _zhang_suen_step(img, first):
+    """Zhang-Suen 부분 반복 한 번 - 지울 픽셀 마스크"""
+    p = np.pad(img, 1)
+    # 이웃 P2..P9 (북쪽부터 시계 방향)
+    p2, p3, p4 = p[:-2, 1:-1], p[:-2, 2:], p[1:-1, 2:]
+    p5, p6, p7 = p[2:, 2:], p[2:, 1:-1], p[2:, :-2]
+    p8, p9 = p[1:-1, :-2], p[:-2, :-2]
+    neighbors = (p2, p3, p4, p5, p6, p7, p8, p9)
+
+    count = sum(n.astype(np.uint8) for n in neighbors)
+    transitions = sum((~a & b).astype(np.uint8)
+                      for a, b in zip(neighbors, neighbors[1:] + neighbors[:1]))
+
+    if first:
+        c1, c2 = p2 & p4 & p6, p4 & p6 & p8
+    else:
+        c1, c2 = p2 & p4 & p8, p2 & p6 & p8
+
+    return img & (count >= 2) & (count <= 6) & (transitions == 1) & ~c1 & ~c2
+
+
+def _thin_numpy(binary):
+    """벡터화한 Zhang-Suen 세선화 (추가 의존성 없음)"""
+    img = binary > 0
+    while True:
+        changed = False
+        for first in (True, False):
+            remove = _zhang_suen_step(img, first)
+            if remove.any():
+                img = img & ~remove
+                changed = True
+        if not changed:
+            return img
+
+
+THINNING_BACKENDS = {
+    'skimage': _thin_skimage,
+    'ximgproc': _thin_ximgproc,
+    'numpy': _thin_numpy
+}
+
+DEFAULT_BACKEND = 'skimage'
+
+_selected_backend = os.environ.get('CALLIGRAPHY_SKELETON_BACKEND') or DEFAULT_BACKEND
+
+
+def available_backends():
+    """현재 환경에서 쓸 수 있는 세선화 백엔드 이름"""
+    names = ['skimage']
+    if hasattr(cv2, 'ximgproc'):
+        names.append('ximgproc')
+    names.append('numpy')
+    return names
+
+
+def _benchmark_image(size=256):
+    """굵기가 다른 가로/세로/사선 획이 있는 측정용 이미지"""
+    img = np.zeros((size, size), dtype=np.uint8)
+    cv2.line(img, (size // 2, size // 8), (size // 2, size * 7 // 8), 255, size // 16)
+    cv2.line(img, (size // 8, size // 3), (size * 7 // 8, size // 3), 255, size // 20)
+    cv2.line(img, (size // 5, size * 4 // 5), (size * 4 // 5, size // 2), 255, size // 24)
+    return img
+
+
+def benchmark_backends(repeats=3, verbose=False):
+    """백엔드별 평균 소요 시간 {이름: 초} - 선택된 백엔드는 바꾸지 않음"""
+    sample = _benchmark_image()
+    timings = {}
+    for name in available_backends():
+        fn = THINNING_BACKENDS[name]
+        try:
+            fn(sample)  # 준비 실행 (지연 초기화 비용 제외)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                fn(sample)
+            timings[name] = (time.perf_counter() - start) / repeats
+        except (cv2.error, AttributeError):
+            continue
+
+    if verbose:
+        for name, t in sorted(timings.items(), key=lambda kv: kv[1]):
+            print(f"  {name:10s} {t * 1000:7.2f} ms")
+        print(f"현재 세선화 백엔드: {get_backend()}")
+    return timings
+
+
+def set_backend(name):
+    """기본 세선화 백엔드 변경 (프로세스 전체에 적용)"""
+    global _selected_backend
+    if name not in available_backends():
+        raise ValueError(f"사용할 수 없는 세선화 백엔드: {name} (가능: {available_backends()})")
+    _selected_backend = name
+
+
+def get_backend():
+    """현재 선택된 백엔드 이름"""
+    return _selected_backend
+
+
+def thin(binary, backend=None):
+    """세선화 - 글자(> 0)의 스켈레톤 (bool)
+
+    backend: 'skimage' | 'ximgproc' | 'numpy' | None (get_backend())
+    """
+    if backend is None:
+        backend = get_backend()
+    if backend not in available_backends():
+        raise ValueError(f"사용할 수 없는 세선화 백엔드: {backend} (가능: {available_backends()})")
+    with stage('skeletonize', binary):
+        return THINNING_BACKENDS[backend](binary)
+
+
+def medial_axis_transform(binary, backend=None):
+    """세선화(thin)와 거리 변환(cv2.distanceTransform)을 차례로 호출해 함께 반환
+
+    두 계산은 별도의 두 단계이며, 공유하는 것은 이진화 결과뿐
+
+    Returns:
+        (skeleton: bool 배열, radius: 각 픽셀에서 배경까지 거리 float32)
+        스켈레톤 위의 radius × 2가 획 굵기
+    """
+    binary = np.where(binary > 0, 255, 0).astype(np.uint8)
+    with stage('distance_transform', binary):
+        radius = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+    return thin(binary, backend), radius
+
+
+if __name__ == "__main__":
+    benchmark_backends(verbose=True)
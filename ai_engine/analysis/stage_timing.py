@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+분석 단계별 시간 측정
+- with stage('skeletonize', binary) as s: ... / @timed('decode')
+- 벽시계 시간(perf_counter), CPU 시간(thread_time - 이 스레드 기준), 입출력 배열 크기 기록
+- 켜져 있으면 프로세스 안에서 단계별 히스토그램 누적 (/metrics에서 사용)
+- collect() 안에서 실행된 단계는 요청별 내역으로도 모음 (API 디버그 헤더)
+- 꺼져 있고 수집 중인 요청도 없으면 공유 no-op 객체만 돌려줌 (거의 비용 없음)
+- 환경 변수 CALLIGRAPHY_TIMING=1 이면 시작부터 켜짐
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# 히스토그램 경계 (초) - Prometheus 기본값과 같은 간격
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = os.environ.get('CALLIGRAPHY_TIMING', '') not in ('', '0')
+_collector = ContextVar('stage_timing_collector', default=None)
+_histograms = {}
+_lock = threading.Lock()
+
+
+class StageHistogram:
+    """단계 하나의 누적 히스토그램 (벽시계 시간 기준, CPU 시간은 합계만)"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.wall_sum = 0.0
+        self.cpu_sum = 0.0
+        self.wall_max = 0.0
+
+    def observe(self, wall, cpu):
+        for i, bound in enumerate(BUCKETS):
+            if wall <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.wall_sum += wall
+        self.cpu_sum += cpu
+        self.wall_max = max(self.wall_max, wall)
+
+    def snapshot(self):
+        """{'buckets': [(경계, 누적 개수)], 'count', 'wall_sum', 'cpu_sum', 'wall_max'}"""
+        cumulative, total = [], 0
+        for bound, n in zip(BUCKETS, self.bucket_counts):
+            total += n
+            cumulative.append((bound, total))
+        return {'buckets': cumulative, 'count': self.count, 'wall_sum': self.wall_sum,
+                'cpu_sum': self.cpu_sum, 'wall_max': self.wall_max}
+
+
+def _shape_of(array):
+    shape = getattr(array, 'shape', None)
+    return list(shape) if shape is not None else None
+
+
+class _Stage:
+    """측정 중인 단계 하나"""
+
+    __slots__ = ('name', 'arrays', '_wall', '_cpu')
+
+    def __init__(self, name, arrays):
+        self.name = name
+        self.arrays = [_shape_of(a) for a in arrays]
+
+    def add(self, *arrays):
+        """출력 배열 등 크기를 기록할 배열 추가"""
+        self.arrays.extend(_shape_of(a) for a in arrays)
+
+    def __enter__(self):
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        if _enabled:
+            with _lock:
+                histogram = _histograms.get(self.name)
+                if histogram is None:
+                    histogram = _histograms[self.name] = StageHistogram()
+                histogram.observe(wall, cpu)
+        records = _collector.get()
+        if records is not None:
+            records.append({'stage': self.name, 'wall': wall, 'cpu': cpu, 'arrays': self.arrays})
+        return False
+
+
+class _NoOpStage:
+    """꺼져 있을 때 쓰는 공유 객체"""
+
+    __slots__ = ()
+
+    def add(self, *arrays):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoOpStage()
+
+
+def stage(name, *arrays):
+    """단계 측정 컨텍스트 매니저
+
+    Args:
+        name: 단계 이름 (decode, preprocess, skeletonize, distance_transform, score.*, render...)
+        arrays: 크기를 기록할 입력 배열
+    """
+    if not _enabled and _collector.get() is None:
+        return _NOOP
+    return _Stage(name, arrays)
+
+
+def timed(name):
+    """함수 전체를 한 단계로 측정하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled and _collector.get() is None:
+                return func(*args, **kwargs)
+            with _Stage(name, ()):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect():
+    """이 블록 안에서 측정된 단계를 리스트로 모음 (전역으로 꺼져 있어도 측정, 히스토그램에는 미반영)
+
+    with collect() as records:
+        ...
+    summarize(records)
+    """
+    records = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def summarize(records):
+    """요청별 내역 → {'stages': [...], 'totals': {단계: {'wall', 'cpu', 'calls'}}} (ms)"""
+    totals = {}
+    for record in records:
+        total = totals.setdefault(record['stage'], {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+        total['wall'] += record['wall'] * 1000
+        total['cpu'] += record['cpu'] * 1000
+        total['calls'] += 1
+    stages = [{'stage': r['stage'], 'wall_ms': round(r['wall'] * 1000, 3),
+               'cpu_ms': round(r['cpu'] * 1000, 3), 'arrays': r['arrays']} for r in records]
+    return {'stages': stages,
+            'totals': {name: {'wall_ms': round(t['wall'], 3), 'cpu_ms': round(t['cpu'], 3),
+                              'calls': t['calls']} for name, t in totals.items()}}
+
+
+def server_timing(summary):
+    """summarize() 결과 → HTTP Server-Timing 헤더 값"""
+    return ', '.join(f"{name};dur={t['wall_ms']}" for name, t in summary['totals'].items())
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def stage_histograms():
+    """단계별 누적 히스토그램 스냅샷 {단계: StageHistogram.snapshot()}"""
+    with _lock:
+        return {name: h.snapshot() for name, h in _histograms.items()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
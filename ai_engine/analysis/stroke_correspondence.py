@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+교본-작성본 획 대응 (헝가리안 알고리즘)
+- 궤적을 호 길이 기준으로 같은 점 개수로 재표본화
+- 획 기술자: 무게중심, 방향, 길이, 정규화된 형태
+- 기술자 비용 행렬을 브로드캐스팅으로 한 번에 계산 후 linear_sum_assignment
+"""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+# 비용 항목 가중치
+COST_WEIGHTS = {
+    'centroid': 1.0,
+    'orientation': 0.5,
+    'length': 0.5,
+    'shape': 1.0
+}
+
+
+def resample_trajectory(trajectory, num_points=32):
+    """궤적(점 목록)을 호 길이 기준 num_points개로 재표본화
+
+    trajectory: [{'position': (x, y), 'thickness', 'angle'}, ...]
+
+    Returns:
+        {'positions': (n, 2), 'thickness': (n,), 'angle': (n,), 'length': float}
+    """
+    positions = np.array([p['position'] for p in trajectory], dtype=np.float64)
+    thickness = np.array([p['thickness'] for p in trajectory], dtype=np.float64)
+    angle = np.radians([p['angle'] for p in trajectory])
+
+    # 누적 호 길이
+    steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+    arc = np.concatenate([[0], np.cumsum(steps)])
+    length = arc[-1]
+
+    if length == 0:
+        targets = np.zeros(num_points)
+        arc = np.arange(len(positions), dtype=np.float64)
+    else:
+        targets = np.linspace(0, length, num_points)
+
+    # 각도는 단위벡터로 보간 (0°/360° 경계 처리)
+    resampled_angle = np.degrees(np.arctan2(np.interp(targets, arc, np.sin(angle)),
+                                            np.interp(targets, arc, np.cos(angle))))
+
+    return {
+        'positions': np.stack([np.interp(targets, arc, positions[:, 0]),
+                               np.interp(targets, arc, positions[:, 1])], axis=1),
+        'thickness': np.interp(targets, arc, thickness),
+        'angle': resampled_angle,
+        'length': length
+    }
+
+
+def stroke_descriptors(resampled):
+    """재표본화된 획 목록 → 기술자 배열 딕셔너리 (획 축이 첫 번째 축)"""
+    positions = np.stack([r['positions'] for r in resampled])          # (S, n, 2)
+    lengths = np.array([r['length'] for r in resampled])                # (S,)
+    centroids = positions.mean(axis=1)                                  # (S, 2)
+    centered = positions - centroids[:, None, :]
+
+    # 주축 방향 (공분산 고유벡터) - 0~180° 범위
+    cov = np.einsum('sni,snj->sij', centered, centered) / positions.shape[1]
+    _, eigvecs = np.linalg.eigh(cov)
+    main_axis = eigvecs[:, :, -1]
+    orientation = np.degrees(np.arctan2(main_axis[:, 1], main_axis[:, 0])) % 180
+
+    # 크기 정규화된 형태 (길이로 나눔)
+    shape = centered / np.maximum(lengths, 1)[:, None, None]
+
+    return {
+        'centroid': centroids,
+        'orientation': orientation,
+        'length': lengths,
+        'shape': shape
+    }
+
+
+def build_cost_matrix(ref_desc, user_desc, char_size):
+    """(R, U) 비용 행렬과 형태 매칭 방향(역방향 여부) 행렬"""
+    # 무게중심 거리 (글자 크기로 정규화)
+    centroid_cost = np.linalg.norm(ref_desc['centroid'][:, None, :] -
+                                   user_desc['centroid'][None, :, :], axis=2) / char_size
+
+    # 방향 차이 (180° 주기, 0~1)
+    d = np.abs(ref_desc['orientation'][:, None] - user_desc['orientation'][None, :]) % 180
+    orientation_cost = np.minimum(d, 180 - d) / 90
+
+    # 길이 비율 (로그)
+    length_cost = np.abs(np.log((ref_desc['length'][:, None] + 1) /
+                                (user_desc['length'][None, :] + 1)))
+
+    # 형태 거리 - 정방향/역방향 중 작은 쪽 (획을 반대로 그어도 같은 획)
+    ref_shape = ref_desc['shape'][:, None]                              # (R, 1, n, 2)
+    forward = np.linalg.norm(ref_shape - user_desc['shape'][None], axis=3).mean(axis=2)
+    backward = np.linalg.norm(ref_shape - user_desc['shape'][None, :, ::-1], axis=3).mean(axis=2)
+    reversed_match = backward < forward
+    shape_cost = np.minimum(forward, backward)
+
+    cost = (COST_WEIGHTS['centroid'] * centroid_cost +
+            COST_WEIGHTS['orientation'] * orientation_cost +
+            COST_WEIGHTS['length'] * length_cost +
+            COST_WEIGHTS['shape'] * shape_cost)
+
+    return cost, reversed_match
+
+
+def match_strokes(ref_trajectories, user_trajectories, char_size, num_points=32, max_cost=None):
+    """교본 획과 작성본 획의 최적 대응
+
+    Returns:
+        {'pairs': [(ref_idx, user_idx, cost, reversed)], 'missing': [ref_idx...],
+         'extra': [user_idx...], 'ref': 재표본화 목록, 'user': 재표본화 목록}
+    """
+    ref_resampled = [resample_trajectory(t, num_points) for t in ref_trajectories]
+    user_resampled = [resample_trajectory(t, num_points) for t in user_trajectories]
+
+    cost, reversed_match = build_cost_matrix(stroke_descriptors(ref_resampled),
+                                             stroke_descriptors(user_resampled),
+                                             char_size)
+
+    # 직사각형 행렬도 처리 (획 수가 달라도 됨)
+    rows, cols = linear_sum_assignment(cost)
+
+    pairs = []
+    for r, c in zip(rows, cols):
+        if max_cost is not None and cost[r, c] > max_cost:
+            continue
+        pairs.append((int(r), int(c), float(cost[r, c]), bool(reversed_match[r, c])))
+
+    matched_ref = {p[0] for p in pairs}
+    matched_user = {p[1] for p in pairs}
+
+    return {
+        'pairs': pairs,
+        'missing': [i for i in range(len(ref_trajectories)) if i not in matched_ref],
+        'extra': [j for j in range(len(user_trajectories)) if j not in matched_user],
+        'ref': ref_resampled,
+        'user': user_resampled
+    }
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+업로드 품질 검사 테스트
+- 합성 사진 사례마다 기대한 거부 사유가 나오는지 확인
+- 칸 테두리/안내선만 있는 빈 칸은 잉크 부족으로 거부되어야 함
+- python test_quality_gate.py 또는 pytest로 실행
+"""
+
+from quality_gate import _synthetic_cases, evaluate, measure_quality
+
+
+def test_synthetic_cases():
+    """모든 합성 사례의 거부 사유가 기대와 같음"""
+    for name, (img, expected) in _synthetic_cases().items():
+        assert evaluate(measure_quality(img)) == expected, name
+
+
+def test_empty_framed_cell():
+    """테두리만 있는 빈 칸은 직선을 뺀 잉크가 없으므로 too_little_ink"""
+    cases = _synthetic_cases()
+    for name in ('empty framed cell', 'empty framed cell with guides'):
+        metrics = measure_quality(cases[name][0])
+        assert metrics['ink_ratio'] < 0.001, name
+        assert 'too_little_ink' in evaluate(metrics), name
+
+
+if __name__ == "__main__":
+    test_synthetic_cases()
+    test_empty_framed_cell()
+    print("✅ 품질 검사 테스트 통과")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+교본 배치 처리 체크포인트(JSONL) 이어하기 테스트
+- 중단으로 마지막 줄이 끊긴 결과 파일에서 이어 써도 기록이 서로 붙지 않는지 확인
+- python test_workbook_checkpoint.py 또는 pytest로 실행
+"""
+
+import json
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+from process_workbook import load_checkpoint, process_workbook_batch, trim_partial_line
+
+
+def _write_page(path, variation):
+    """좌우에 교본/작성본 中자가 있는 안내선 없는 페이지"""
+    analyzer = IntegratedZhongAnalyzer()
+    reference = analyzer.create_reference_zhong()
+    user = analyzer.create_user_zhong(variation_level=variation)
+    page = cv2.cvtColor(np.hstack([reference, user]), cv2.COLOR_GRAY2BGR)
+    cv2.imwrite(path, page)
+
+
+def test_trim_partial_line():
+    """마지막 '\\n' 뒤의 끊긴 줄만 잘라냄"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.jsonl')
+        complete = json.dumps({'image': 'a.png', 'status': 'ok'}) + '\n'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(complete + '{"image": "b.png", "sta')
+
+        assert trim_partial_line(path) == len('{"image": "b.png", "sta')
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == complete
+        assert trim_partial_line(path) == 0  # 이미 줄바꿈으로 끝나면 그대로
+
+
+def test_resume_from_truncated_line():
+    """끊긴 마지막 줄이 있는 체크포인트에서 이어 처리하면 모든 이미지가 체크포인트에 남음"""
+    with tempfile.TemporaryDirectory() as tmp:
+        images = [os.path.join(tmp, f'page_{i}.png') for i in range(2)]
+        for i, image in enumerate(images):
+            _write_page(image, 0.1 + 0.2 * i)
+        results_path = os.path.join(tmp, 'results.jsonl')
+
+        # 첫 이미지만 끝난 뒤 두 번째 이미지 기록 중에 중단된 상황
+        process_workbook_batch(images[:1], results_path, max_workers=1, resume=False)
+        with open(results_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'image': images[1], 'status': 'ok'})[:25])
+
+        summary = process_workbook_batch(images, results_path, max_workers=1)
+        assert summary['skipped'] == 1
+        assert summary['processed'] + summary['rejected'] == 1
+
+        assert load_checkpoint(results_path) == set(images)
+        with open(results_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 2
+        assert all(json.loads(line)['image'] in images for line in lines)
+
+
+if __name__ == "__main__":
+    test_trim_partial_line()
+    test_resume_from_truncated_line()
+    print("✅ 체크포인트 이어하기 테스트 통과")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+고해상도 페이지 스캔의 타일 처리 (메모리 상한 유지)
+- PageSource: 비압축 TIFF/BMP와 .npy는 메모리 맵으로 열어 필요한 영역만 읽음
+  (압축 형식은 임의 접근이 불가능하므로 한 번 디코딩)
+- 안내선 검출을 가로 띠(strip) 단위로 수행: 띠마다 HSV/임계값/열림 연산,
+  형태학 커널 길이만큼 겹쳐 읽어 경계에서도 결과가 전체 처리와 같음
+- 선 마스크는 행 단위 비트 압축으로만 보관, 투영 프로파일은 띠마다 누적
+- 필요한 칸만 원본 해상도로 잘라 읽음
+"""
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from grid_layout import guide_line_mask, extract_line_masks, cells_from_lines
+
+
+# 띠 하나가 가질 최대 픽셀 수 (BGR + HSV + 마스크 몇 장 → 약 100MB 이하)
+DEFAULT_TILE_PIXELS = 8_000_000
+
+# 메모리 맵으로 읽을 수 있는 원시 픽셀 배치 → (채널 수, BGR로 바꾸는 채널 순서)
+_RAW_LAYOUTS = {
+    'BGR': (3, [0, 1, 2]),
+    'RGB': (3, [2, 1, 0]),
+    'BGRX': (4, [0, 1, 2]),
+    'BGRA': (4, [0, 1, 2]),
+    'RGBX': (4, [2, 1, 0]),
+    'RGBA': (4, [2, 1, 0]),
+    'L': (1, None)
+}
+
+
+def _raw_memmap(path):
+    """비압축 이미지 파일을 (H, W, C) 메모리 맵으로 (불가능하면 None)"""
+    with Image.open(path) as im:
+        tiles = im.tile
+        width, height = im.size
+
+    if not tiles or any(t[0] != 'raw' for t in tiles):
+        return None
+    rawmode, stride, orientation = (tuple(tiles[0][3]) + (0, 1))[:3]
+    if rawmode not in _RAW_LAYOUTS or any(t[3][0] != rawmode for t in tiles):
+        return None
+
+    channels, order = _RAW_LAYOUTS[rawmode]
+    row_bytes = width * channels
+    stride = stride or row_bytes
+
+    # 여러 스트립이면 전체 폭이고 파일 안에서 연속이어야 함
+    base = tiles[0][2]
+    for t in tiles:
+        x0, y0, x1, _ = t[1]
+        if x0 != 0 or x1 != width or t[2] != base + y0 * stride:
+            return None
+
+    rows = np.memmap(path, dtype=np.uint8, mode='r', offset=base, shape=(height, stride))
+    pixels = rows[:, :row_bytes].reshape(height, width, channels)
+    if orientation == -1:  # BMP처럼 아래에서 위로 저장된 경우
+        pixels = pixels[::-1]
+    return pixels, order
+
+
+class PageSource:
+    """페이지 이미지의 영역 읽기 (가능하면 메모리 맵)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.memory_mapped = False
+        self._order = None
+
+        if path.lower().endswith('.npy'):
+            self._pixels = np.load(path, mmap_mode='r')
+            self.memory_mapped = True
+        else:
+            mapped = _raw_memmap(path)
+            if mapped is not None:
+                self._pixels, self._order = mapped
+                self.memory_mapped = True
+            else:
+                self._pixels = cv2.imread(path)
+                if self._pixels is None:
+                    raise ValueError(f"이미지를 로드할 수 없습니다: {path}")
+
+    @property
+    def shape(self):
+        return self._pixels.shape[:2]
+
+    def read(self, y0, y1, x0=0, x1=None):
+        """[y0, y1) × [x0, x1) 영역을 BGR uint8 배열로 읽기 (이 영역만 메모리에 올라옴)"""
+        region = np.asarray(self._pixels[y0:y1, x0:x1])
+        if region.ndim == 2 or region.shape[2] == 1:
+            return cv2.cvtColor(region.reshape(region.shape[:2]), cv2.COLOR_GRAY2BGR)
+        if self._order is not None:
+            region = region[:, :, self._order]
+        return np.ascontiguousarray(region[:, :, :3])
+
+
+class PackedLines:
+    """행 단위 비트 압축 선 마스크 - grid_layout의 변 검사용 2차원 슬라이싱 지원"""
+
+    def __init__(self, height, width):
+        self.width = width
+        self.bits = np.zeros((height, (width + 7) // 8), dtype=np.uint8)
+
+    def store(self, y0, mask):
+        self.bits[y0:y0 + mask.shape[0]] = np.packbits(mask > 0, axis=1)
+
+    def __getitem__(self, key):
+        rows, cols = key
+        start, stop, _ = cols.indices(self.width)
+        # 필요한 바이트 열만 풀기
+        byte_start = start // 8
+        unpacked = np.unpackbits(self.bits[rows, byte_start:(stop + 7) // 8], axis=1)
+        return unpacked[:, start - byte_start * 8:stop - byte_start * 8]
+
+
+def detect_grid_cells_tiled(source, min_cell_size=40, peak_ratio=0.3, min_coverage=0.6,
+                            max_line_thickness=6, colors=('red', 'dark'),
+                            tile_pixels=DEFAULT_TILE_PIXELS):
+    """가로 띠 단위로 안내선을 검출해 칸 목록 반환 (grid_layout.detect_grid_cells와 같은 결과)"""
+    height, width = source.shape
+    min_line_length = max(min_cell_size // 2, 5)
+    # 세로 열림 커널 + 굵기 열림/팽창이 띠 경계에서 잘리지 않도록 겹침
+    overlap = min_line_length + max_line_thickness + 2
+    tile_rows = max(tile_pixels // max(width, 1), 2 * overlap)
+
+    horizontal = PackedLines(height, width)
+    vertical = PackedLines(height, width)
+    row_profile = np.zeros(height, dtype=np.int64)
+    col_profile = np.zeros(width, dtype=np.int64)
+
+    for y0 in range(0, height, tile_rows):
+        y1 = min(height, y0 + tile_rows)
+        top, bottom = max(0, y0 - overlap), min(height, y1 + overlap)
+
+        strip = source.read(top, bottom)
+        h_mask, v_mask = extract_line_masks(guide_line_mask(strip, colors),
+                                     min_line_length, max_line_thickness)
+        core = slice(y0 - top, y1 - top)
+        h_core, v_core = h_mask[core], v_mask[core]
+
+        horizontal.store(y0, h_core)
+        vertical.store(y0, v_core)
+        row_profile[y0:y1] = np.count_nonzero(h_core, axis=1)
+        col_profile += np.count_nonzero(v_core, axis=0)
+
+    return cells_from_lines(row_profile, col_profile, horizontal, vertical,
+                            min_cell_size, peak_ratio, min_coverage)
+
+
+def read_cells(source, cells, inset=4):
+    """칸 영역만 원본 해상도로 읽기"""
+    crops = []
+    for cell in cells:
+        x, y, w, h = cell['bbox']
+        crops.append(source.read(y + inset, y + h - inset, x + inset, x + w - inset))
+    return crops
+
+
+def page_pixels(path):
+    """헤더만 읽어 페이지 픽셀 수 확인 (디코딩 없음)"""
+    if path.lower().endswith('.npy'):
+        shape = np.load(path, mmap_mode='r').shape
+        return int(shape[0] * shape[1])
+    with Image.open(path) as im:
+        return im.size[0] * im.size[1]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+구역(구궁격 / 米字格) 분석
+- 사용자/교본/겹침 마스크의 적분 영상(summed-area table)을 한 번만 계산
+- N×M 격자의 칸별 잉크 밀도, 겹침(IoU), 밀도 차이를 칸 수에 비례하는 비용으로 계산
+- 米字格 대각선 구역(상/우/하/좌 삼각형)은 45° 회전 적분 영상(cv2.integral3의 tilted)으로 계산
+"""
+
+import cv2
+import numpy as np
+
+
+ZONE_LABELS_3X3 = (['좌', '중', '우'], ['상', '중', '하'])
+
+
+def grid_edges(length, cells):
+    """길이를 cells칸으로 나누는 경계 (cells + 1개 정수)"""
+    return np.round(np.linspace(0, length, cells + 1)).astype(np.int64)
+
+
+def box_sums(integral, y0, y1, x0, x1):
+    """적분 영상에서 [y0, y1) × [x0, x1) 합 (배열 인자는 브로드캐스팅)"""
+    return integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+
+
+def _cell_scores(user, ref, overlap):
+    """칸별 IoU (%) - 둘 다 비어 있으면 100"""
+    union = user + ref - overlap
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = np.where(union > 0, overlap / union * 100, 100.0)
+    return iou
+
+
+class ZoneAnalyzer:
+    """사용자(및 교본) 마스크 구역 분석 - 적분 영상은 생성 시 한 번만 계산"""
+
+    def __init__(self, user_mask, ref_mask=None):
+        user = (user_mask > 0).astype(np.uint8)
+        self.shape = user.shape
+        self.has_reference = ref_mask is not None
+
+        self._masks = {'user': user}
+        if self.has_reference:
+            if ref_mask.shape[:2] != self.shape:
+                raise ValueError(f"마스크 크기가 다릅니다: {ref_mask.shape[:2]} != {self.shape}")
+            ref = (ref_mask > 0).astype(np.uint8)
+            self._masks['ref'] = ref
+            self._masks['overlap'] = user & ref
+
+        self._integrals = {key: cv2.integral(mask) for key, mask in self._masks.items()}
+        self._tilted = None
+
+    def grid(self, rows=3, cols=3):
+        """N×M 격자 칸별 분석
+
+        Returns:
+            {'row_edges', 'col_edges', 'user_count', 'user_density'} +
+            교본이 있으면 {'ref_count', 'ref_density', 'overlap', 'difference', 'accuracy'}
+            (칸별 값은 (rows, cols) 배열, 밀도/겹침/정확도는 %)
+        """
+        h, w = self.shape
+        row_edges = grid_edges(h, rows)
+        col_edges = grid_edges(w, cols)
+        y0, y1 = row_edges[:-1, None], row_edges[1:, None]
+        x0, x1 = col_edges[None, :-1], col_edges[None, 1:]
+        cell_area = np.maximum((y1 - y0) * (x1 - x0), 1)
+
+        counts = {key: box_sums(integral, y0, y1, x0, x1)
+                  for key, integral in self._integrals.items()}
+
+        result = {
+            'row_edges': row_edges,
+            'col_edges': col_edges,
+            'user_count': counts['user'],
+            'user_density': counts['user'] / cell_area * 100
+        }
+        if self.has_reference:
+            result['ref_count'] = counts['ref']
+            result['ref_density'] = counts['ref'] / cell_area * 100
+            result['difference'] = result['user_density'] - result['ref_density']
+            result['overlap'] = _cell_scores(counts['user'], counts['ref'], counts['overlap'])
+            result['accuracy'] = result['overlap']
+        return result
+
+    def balance(self, rows=2, cols=2):
+        """칸별 사용자 잉크 분포의 균등도 (0 ~ 100)"""
+        counts = self.grid(rows, cols)['user_count'].astype(np.float64)
+        mean = counts.mean()
+        if mean == 0:
+            return 0.0
+        return max(0.0, 100 * (1 - counts.std() / mean))
+
+    def _tilted_integrals(self):
+        """방향별 (상/하/좌/우) 45° 회전 적분 영상 - 처음 호출할 때 한 번 계산
+
+        cv2.integral3의 tilted[Y, X]는 (X-1, Y-1)을 꼭짓점으로 위로 열린 45° 삼각형의 합.
+        상하 뒤집기/전치한 영상에 같은 연산을 하면 나머지 방향 삼각형이 된다.
+        """
+        if self._tilted is None:
+            views = {
+                'top': lambda m: m,
+                'bottom': lambda m: m[::-1],
+                'left': lambda m: m.T,
+                'right': lambda m: m.T[::-1]
+            }
+            self._tilted = {
+                direction: {key: cv2.integral3(np.ascontiguousarray(view(mask)))[2]
+                            for key, mask in self._masks.items()}
+                for direction, view in views.items()
+            }
+        return self._tilted
+
+    def diagonal_zones(self):
+        """米字格 대각선으로 나눈 상/우/하/좌 삼각형 구역 분석
+
+        대각선은 중심을 지나는 45° 선 (정사각형 칸에서는 모서리를 잇는 대각선과 같음)
+
+        Returns:
+            방향 → {'user_density', ...} (grid()와 같은 항목, 스칼라)
+        """
+        h, w = self.shape
+        cy, cx = (h - 1) // 2, (w - 1) // 2
+        # 각 방향 영상에서 꼭짓점(중심)의 좌표 (행, 열)
+        apexes = {
+            'top': (cy, cx),
+            'bottom': (h - 1 - cy, cx),
+            'left': (cx, cy),
+            'right': (w - 1 - cx, cy)
+        }
+
+        zones = {}
+        for direction, tilted in self._tilted_integrals().items():
+            ay, ax = apexes[direction]
+            counts = {key: int(t[ay + 1, ax + 1]) for key, t in tilted.items()}
+            # 삼각형 넓이 (영상 경계 안쪽만) = 1의 영상과 같은 공식으로 계산
+            area = max(self._triangle_area(direction, ay, ax), 1)
+
+            zone = {'user_density': counts['user'] / area * 100}
+            if self.has_reference:
+                zone['ref_density'] = counts['ref'] / area * 100
+                zone['difference'] = zone['user_density'] - zone['ref_density']
+                zone['overlap'] = float(_cell_scores(counts['user'], counts['ref'], counts['overlap']))
+            zones[direction] = zone
+        return zones
+
+    def _triangle_area(self, direction, ay, ax):
+        """꼭짓점 (ay, ax)에서 위로 열린 삼각형 중 영상 안에 있는 픽셀 수"""
+        w = self.shape[0] if direction in ('left', 'right') else self.shape[1]
+        rows = np.arange(ay + 1)
+        half = ay - rows
+        return int(np.sum(np.minimum(ax + half, w - 1) - np.maximum(ax - half, 0) + 1))
@@ -0,0 +1,234 @@
+"""
+API 부하 테스트
+- 앱을 프로세스 안에서 직접 호출(ASGI transport, 네트워크 없음)하거나 실행 중인 uvicorn에 요청
+- 동시 요청 수를 바꿔 가며(sweep) 단계마다 처리량, 지연 시간 p50/p95/p99, 오류율 측정
+- 이미지 쌍: 합성 中자(변형 정도별) 또는 디렉터리의 ref_<id>.* / user_<id>.* 파일
+- 결과를 표로 출력하고 JSON으로 저장 (워커 풀/캐시 변경 전후 비교용)
+
+사용법:
+    python load_test.py                                  # 프로세스 안, 동시 1/2/4/8
+    python load_test.py --concurrency 1 4 16 --requests 200
+    python load_test.py --images ../workbook_output      # 실제 이미지 쌍
+    python load_test.py --url http://127.0.0.1:8000      # 실행 중인 서버
+    python load_test.py --serve                          # uvicorn을 띄워서 측정
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BACKEND_DIR.parent / "ai_engine" / "analysis"))
+from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+
+
+DEFAULT_CONCURRENCY = (1, 2, 4, 8)
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".heic", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def synthetic_pairs(count=8, size=512, seed=0):
+    """합성 (교본, 작성본) PNG 바이트 쌍 - 변형 정도를 바꿔 가며 count개"""
+    analyzer = IntegratedZhongAnalyzer()
+    rng = np.random.default_rng(seed)
+    reference = cv2.resize(analyzer.create_reference_zhong(), (size, size))
+    ref_bytes = cv2.imencode(".png", reference)[1].tobytes()
+
+    pairs = []
+    for variation in np.linspace(0.0, 0.6, count):
+        user = cv2.resize(analyzer.create_user_zhong(variation_level=variation), (size, size))
+        noisy = np.clip(user + rng.normal(0, 6, user.shape), 0, 255).astype(np.uint8)
+        pairs.append((f"synthetic_v{variation:.2f}", ref_bytes, cv2.imencode(".png", noisy)[1].tobytes()))
+    return pairs
+
+
+def directory_pairs(directory):
+    """디렉터리의 ref_<id>.* 와 user_<id>.* 를 id로 짝지음 (process_workbook 출력 형식)"""
+    files = {}
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        for role in ("ref", "user"):
+            if path.stem.startswith(role + "_"):
+                files.setdefault(path.stem[len(role) + 1:], {})[role] = path
+
+    pairs = [(pair_id, paths["ref"].read_bytes(), paths["user"].read_bytes())
+             for pair_id, paths in sorted(files.items()) if len(paths) == 2]
+    if not pairs:
+        raise ValueError(f"ref_<id> / user_<id> 이미지 쌍이 없습니다: {directory}")
+    return pairs
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+async def run_level(client, pairs, concurrency, total_requests, timeout):
+    """동시 concurrency개로 total_requests개 요청 - 단계 결과 반환"""
+    latencies, statuses, errors = [], {}, []
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total_requests:
+            index = next_index
+            next_index += 1
+            name, ref_bytes, user_bytes = pairs[index % len(pairs)]
+            files = {"reference_image": ("reference.png", ref_bytes),
+                     "user_image": ("user.png", user_bytes)}
+            start = time.perf_counter()
+            try:
+                response = await client.post("/analyze/upload", files=files, timeout=timeout)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors.append(f"{name}: {status}")
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    failed = sum(n for status, n in statuses.items() if status != "200")
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {"mean": float(np.mean(ms)) if ms else None,
+                       "p50": percentile(ms, 50), "p95": percentile(ms, 95),
+                       "p99": percentile(ms, 99), "max": max(ms) if ms else None},
+        "error_rate": failed / len(latencies) if latencies else 0.0,
+        "status_counts": statuses,
+        "errors": errors[:10]
+    }
+
+
+def in_process_client():
+    """앱을 네트워크 없이 직접 호출하는 클라이언트"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    import main as backend_main
+    transport = httpx.ASGITransport(app=backend_main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest")
+
+
+async def run_sweep(client, pairs, concurrency_levels, requests_per_level, timeout=120.0, warmup=2):
+    """동시 요청 수별 측정 (처음 warmup개 요청은 결과에서 제외)"""
+    async with client:
+        if warmup:
+            await run_level(client, pairs, 1, warmup, timeout)
+        levels = []
+        for concurrency in concurrency_levels:
+            level = await run_level(client, pairs, concurrency,
+                                    max(requests_per_level, concurrency), timeout)
+            levels.append(level)
+            print_level(level)
+        return levels
+
+
+def print_header():
+    print(f"{'동시':>5s} {'요청':>6s} {'처리량(rps)':>12s} {'p50(ms)':>9s} {'p95(ms)':>9s} "
+          f"{'p99(ms)':>9s} {'최대(ms)':>9s} {'오류율':>7s}")
+    print("-" * 72)
+
+
+def print_level(level):
+    latency = level["latency_ms"]
+    print(f"{level['concurrency']:5d} {level['requests']:6d} {level['throughput_rps']:12.2f} "
+          f"{latency['p50']:9.1f} {latency['p95']:9.1f} {latency['p99']:9.1f} "
+          f"{latency['max']:9.1f} {level['error_rate']*100:6.1f}%")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(port, workers=1, startup_timeout=60):
+    """uvicorn 서버를 하위 프로세스로 띄우고 응답할 때까지 대기"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn이 종료되었습니다 (코드 {process.returncode})")
+        try:
+            if httpx.get(url + "/", timeout=1.0).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError("uvicorn이 제시간에 시작되지 않았습니다")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서예 분석 API 부하 테스트")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--requests", type=int, default=50, help="동시 요청 수 단계마다 요청 수")
+    parser.add_argument("--images", help="ref_<id> / user_<id> 이미지가 있는 디렉터리 (기본: 합성)")
+    parser.add_argument("--size", type=int, default=512, help="합성 이미지 크기 (px)")
+    parser.add_argument("--pairs", type=int, default=8, help="합성 이미지 쌍 수")
+    parser.add_argument("--url", help="실행 중인 서버 주소 (기본: 프로세스 안에서 호출)")
+    parser.add_argument("--serve", action="store_true", help="uvicorn을 띄워서 측정")
+    parser.add_argument("--server-workers", type=int, default=1, help="--serve의 uvicorn 프로세스 수")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default="load_test_output/results.json")
+    args = parser.parse_args()
+
+    pairs = directory_pairs(args.images) if args.images else synthetic_pairs(args.pairs, args.size)
+
+    server = None
+    if args.serve:
+        server, url = start_uvicorn(_free_port(), args.server_workers)
+        mode = f"uvicorn ({url}, 프로세스 {args.server_workers}개)"
+    elif args.url:
+        url = args.url.rstrip("/")
+        mode = url
+    else:
+        url = None
+        mode = "in-process (ASGI)"
+
+    print("=" * 72)
+    print(f"🚦 API 부하 테스트 - {mode}, 이미지 쌍 {len(pairs)}개, 단계별 요청 {args.requests}개")
+    print("=" * 72)
+    print_header()
+
+    try:
+        client = in_process_client() if url is None else httpx.AsyncClient(base_url=url)
+        levels = asyncio.run(run_sweep(client, pairs, args.concurrency, args.requests, args.timeout))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "mode": "in_process" if url is None else "http",
+        "url": url,
+        "image_source": args.images or f"synthetic ({args.pairs} pairs, {args.size}px)",
+        "requests_per_level": args.requests,
+        "cpu_count": os.cpu_count(),
+        "levels": levels
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
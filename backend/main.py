@@ -3,17 +3,30 @@ Calligraphy Coach Backend Server
 FastAPI 기반 서예 학습 앱 백엔드
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import nullcontext
+from typing import Optional
 import sys
-import os
+import threading
+import time
 from pathlib import Path
 
-# AI 엔진 경로 추가
-sys.path.append(str(Path(__file__).parent.parent))
-from ai_engine.analysis.integrated_zhong_analyzer import IntegratedZhongAnalyzer
-from ai_engine.analysis.char_comparison import CharComparison
+# AI 엔진 경로 추가 (분석 모듈은 서로 평면 import를 사용)
+sys.path.append(str(Path(__file__).parent.parent / "ai_engine" / "analysis"))
+from integrated_zhong_analyzer import IntegratedZhongAnalyzer
+from char_comparison import CharacterComparator
+from image_loader import load_image, ImageCache
+from quality_gate import check_quality, QualityGateError, gate_counters
+import stage_timing
+from stage_timing import collect, summarize, server_timing
+
+from metrics import Registry, Counter, Gauge, Histogram
+from worker_pool import AnalysisPool
+
+# 업로드 이미지를 디코딩할 긴 변 해상도 (휴대폰 원본은 1/2~1/8로 축소 디코딩)
+ANALYSIS_SIZE = 1024
 
 app = FastAPI(
     title="Calligraphy Coach API",
@@ -32,7 +45,90 @@ app.add_middleware(
 
 # AI 분석기 초기화
 zhong_analyzer = IntegratedZhongAnalyzer()
-char_comparison = CharComparison()
+
+# 분석은 스레드 풀에서 실행 - CharacterComparator는 결과를 인스턴스에 저장하므로 스레드마다 하나
+analysis_pool = AnalysisPool()
+_thread_local = threading.local()
+
+# 같은 교본을 반복해서 올리는 경우가 많아 디코딩 결과를 캐시
+reference_cache = ImageCache(max_entries=64)
+
+
+def get_comparator():
+    comparator = getattr(_thread_local, "comparator", None)
+    if comparator is None:
+        comparator = _thread_local.comparator = CharacterComparator()
+    return comparator
+
+
+# 메트릭 (/metrics) - 단계별 시간 히스토그램도 누적
+stage_timing.enable()
+registry = Registry()
+request_latency = registry.register(Histogram(
+    "calligraphy_http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "endpoint")))
+request_count = registry.register(Counter(
+    "calligraphy_http_requests_total", "HTTP 요청 수", ("method", "endpoint", "status")))
+requests_in_progress = registry.register(Gauge(
+    "calligraphy_http_requests_in_progress", "처리 중인 HTTP 요청 수"))
+rejected_requests = registry.register(Counter(
+    "calligraphy_rejected_requests_total", "분석 전에 거부된 요청 수", ("reason",)))
+registry.register(Histogram(
+    "calligraphy_stage_duration_seconds", "분석 단계별 소요 시간", ("stage",),
+    function=lambda: {(name, ): (h["buckets"], h["count"], h["wall_sum"])
+                      for name, h in stage_timing.stage_histograms().items()}))
+registry.register(Counter(
+    "calligraphy_stage_cpu_seconds_total", "분석 단계별 CPU 시간", ("stage",),
+    function=lambda: {(name, ): h["cpu_sum"] for name, h in stage_timing.stage_histograms().items()}))
+registry.register(Gauge(
+    "calligraphy_analysis_queue_depth", "분석 풀 대기 작업 수", function=lambda: analysis_pool.queued))
+registry.register(Gauge(
+    "calligraphy_analysis_active", "분석 풀 실행 중 작업 수", function=lambda: analysis_pool.active))
+registry.register(Gauge(
+    "calligraphy_analysis_workers", "분석 풀 워커 수", function=lambda: analysis_pool.max_workers))
+registry.register(Gauge(
+    "calligraphy_analysis_utilization", "분석 풀 사용률 (실행 중 / 워커 수)",
+    function=lambda: analysis_pool.utilization))
+registry.register(Counter(
+    "calligraphy_analysis_busy_seconds_total", "분석 워커 누적 작업 시간 (rate / 워커 수 = 평균 사용률)",
+    function=lambda: analysis_pool.busy_seconds))
+registry.register(Counter(
+    "calligraphy_analysis_completed_total", "분석 풀 완료 작업 수", function=lambda: analysis_pool.completed))
+registry.register(Counter(
+    "calligraphy_cache_requests_total", "캐시 조회 수", ("cache", "result"),
+    function=lambda: {("reference_image", "hit"): reference_cache.hits,
+                      ("reference_image", "miss"): reference_cache.misses}))
+registry.register(Gauge(
+    "calligraphy_cache_hit_ratio", "캐시 적중률", ("cache",),
+    function=lambda: {("reference_image", ): reference_cache.hit_rate}))
+registry.register(Gauge(
+    "calligraphy_cache_entries", "캐시 항목 수", ("cache",),
+    function=lambda: {("reference_image", ): len(reference_cache)}))
+registry.register(Counter(
+    "calligraphy_quality_gate_total", "품질 검사 결과별 횟수", ("result",),
+    function=lambda: {(key, ): n for key, n in gate_counters().items() if ":" not in key}))
+registry.register(Counter(
+    "calligraphy_quality_gate_rejections_total", "품질 검사 거부 사유별 횟수", ("reason",),
+    function=lambda: {(key.split(":", 1)[1], ): n for key, n in gate_counters().items()
+                      if key.startswith("reason:")}))
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """엔드포인트별 지연 시간/상태 코드 집계 (경로 템플릿 기준, 매칭 안 된 경로는 하나로)"""
+    requests_in_progress.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        request_latency.observe(time.perf_counter() - start, request.method, endpoint)
+        request_count.inc(request.method, endpoint, str(status))
+        requests_in_progress.dec()
+
 
 @app.get("/")
 async def root():
@@ -42,7 +138,8 @@ async def root():
 @app.post("/analyze/upload")
 async def analyze_calligraphy(
     reference_image: UploadFile = File(...),
-    user_image: UploadFile = File(...)
+    user_image: UploadFile = File(...),
+    x_debug_timing: Optional[str] = Header(None)
 ):
     """
     서예 이미지 분석 API
@@ -50,41 +147,62 @@ async def analyze_calligraphy(
     Args:
         reference_image: 교본 이미지
         user_image: 사용자 작성 이미지
+        x_debug_timing: X-Debug-Timing 헤더 - 주면 단계별 소요 시간을 응답에 포함
     
     Returns:
         분석 결과 (점수, 피드백, 개선점)
     """
+    ref_bytes = await reference_image.read()
+    user_bytes = await user_image.read()
+    
+    debug = x_debug_timing not in (None, "", "0")
+    with (collect() if debug else nullcontext()) as records:
+        content = await analysis_pool.run(analyze_uploaded_images, ref_bytes, user_bytes)
+    
+    headers = {}
+    if debug:
+        content["timings"] = summarize(records)
+        headers["Server-Timing"] = server_timing(content["timings"])
+    return JSONResponse(content=content, headers=headers)
+
+
+def analyze_uploaded_images(ref_bytes, user_bytes):
+    """업로드 바이트 → 분석 결과 (실패는 HTTPException)"""
     try:
-        # 이미지 저장
-        ref_path = f"temp/reference_{reference_image.filename}"
-        user_path = f"temp/user_{user_image.filename}"
-        
-        os.makedirs("temp", exist_ok=True)
+        # 임시 파일 없이 메모리에서 필요한 해상도로만 디코딩
+        try:
+            ref_img = reference_cache.load(ref_bytes, ANALYSIS_SIZE, grayscale=True)
+            user_img = load_image(user_bytes, ANALYSIS_SIZE, grayscale=True)
+        except Exception:
+            rejected_requests.inc("unreadable_image")
+            raise HTTPException(status_code=400, detail="이미지를 읽을 수 없습니다")
         
-        # 파일 저장
-        with open(ref_path, "wb") as f:
-            content = await reference_image.read()
-            f.write(content)
-            
-        with open(user_path, "wb") as f:
-            content = await user_image.read()
-            f.write(content)
+        # 빈/흐린/잘못 크롭된 이미지는 분석 전에 거부
+        for role, img in (("reference", ref_img), ("user", user_img)):
+            try:
+                check_quality(img)
+            except QualityGateError as e:
+                rejected_requests.inc("quality_gate")
+                raise HTTPException(status_code=422, detail={**e.to_dict(), "image": role})
         
         # AI 분석 실행
-        result = char_comparison.compare_characters(ref_path, user_path)
+        result = get_comparator().compare_images(ref_img, user_img, output_dir=None)
         
-        # 임시 파일 삭제
-        os.remove(ref_path)
-        os.remove(user_path)
-        
-        return JSONResponse(content={
+        return {
             "success": True,
             "analysis": result
-        })
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/characters")
 async def get_available_characters():
     """학습 가능한 한자 목록"""
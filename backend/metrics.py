@@ -0,0 +1,145 @@
+"""
+Prometheus 텍스트 형식 메트릭 (외부 라이브러리/서비스 없이)
+- Counter, Gauge, Histogram (라벨 지원)
+- function을 주면 값을 보관하지 않고 출력할 때마다 계산 (다른 모듈의 집계를 그대로 노출)
+- Registry.render()가 /metrics 응답 본문을 만듦
+"""
+
+import threading
+
+from stage_timing import BUCKETS
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=(), function=None):
+        """
+        Args:
+            labels: 라벨 이름들
+            function: 출력할 때 호출 - 라벨이 없으면 값, 있으면 {라벨 값 튜플: 값}
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.function = function
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def items(self):
+        if self.function is not None:
+            values = self.function()
+            return sorted(values.items()) if self.label_names else [((), values)]
+        with self._lock:
+            return sorted(self._values.items())
+
+    def samples(self):
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+                for labels, value in self.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """값: (누적 [(경계, 개수)], 개수, 합) - function은 같은 형식의 스냅샷을 반환"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), function=None, buckets=BUCKETS):
+        super().__init__(name, help_text, labels, function)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += 1
+            entry[2] += value
+
+    def items(self):
+        if self.function is not None:
+            return super().items()
+        with self._lock:
+            snapshot = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        items = []
+        for labels, (bucket_counts, count, total) in snapshot:
+            cumulative, running = [], 0
+            for bound, n in zip(self.buckets, bucket_counts):
+                running += n
+                cumulative.append((bound, running))
+            items.append((labels, (cumulative, count, total)))
+        return items
+
+    def samples(self):
+        lines = []
+        for labels, (cumulative, count, total) in self.items():
+            for bound, n in list(cumulative) + [(float("inf"), count)]:
+                le = _format_labels(self.label_names, labels, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {n}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Registry:
+    """메트릭 모음"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,69 @@
+"""
+분석 작업용 스레드 풀
+- 무거운 분석(OpenCV/NumPy는 GIL을 놓음)을 이벤트 루프 밖에서 실행
+- 대기열 깊이, 실행 중 작업 수, 누적 작업 시간(사용률 계산용) 집계
+- 요청의 contextvars(단계 시간 수집 등)를 작업 스레드로 그대로 전달
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AnalysisPool:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="analysis")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def utilization(self):
+        """지금 일하는 워커 비율 (0~1)"""
+        return self.active / self.max_workers
+
+    def stats(self):
+        with self._lock:
+            return {"queued": self.queued, "active": self.active, "completed": self.completed,
+                    "busy_seconds": self.busy_seconds, "workers": self.max_workers}
+
+    async def run(self, func, *args):
+        """func(*args)를 풀에서 실행하고 결과를 기다림"""
+        context = contextvars.copy_context()
+        state = {"started": False, "cancelled": False}
+        with self._lock:
+            self.queued += 1
+
+        def task():
+            with self._lock:
+                if state["cancelled"]:
+                    return None
+                state["started"] = True
+                self.queued -= 1
+                self.active += 1
+            start = time.perf_counter()
+            try:
+                return context.run(func, *args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.busy_seconds += time.perf_counter() - start
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            # 시작 전에 취소된 요청(클라이언트 연결 끊김 등)은 대기열에서 뺌
+            with self._lock:
+                if not state["started"]:
+                    state["cancelled"] = True
+                    self.queued -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)